@@ -0,0 +1,207 @@
+"""
+Threaded roll-call pipeline for the desktop app (main_Run.py).
+
+capture thread --(bounded queue, newest frame wins)--> recognition worker --> shared results
+      |                                                                          |
+      +------------------------> UI loop (main thread) <-------------------------+
+
+The UI shows every camera frame with the latest recognition boxes, so the display runs at
+camera frame rate while detection + LBPH prediction run at their own pace. The worker skips
+frames whose 32x24 thumbnail barely differs from the last recognized frame (gate_threshold),
+so an empty or static scene costs almost no CPU.
+
+append_attendance_rows() replaces the read-all/concat/rewrite save of Attendance/<Subject>.csv.
+"""
+import csv
+import datetime
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+
+def load_student_names(path):
+    """Read StudentDetails.csv once into {enrollment (int): name}; later rows win."""
+    names = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            enrollment = (row.get("Enrollment") or "").strip()
+            if enrollment.isdigit():
+                names[int(enrollment)] = (row.get("Name") or "").strip()
+    return names
+
+
+def _put_latest(q, item):
+    """Put into a bounded queue, dropping the oldest item when it is full."""
+    try:
+        q.put_nowait(item)
+    except queue.Full:
+        try:
+            q.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            q.put_nowait(item)
+        except queue.Full:
+            pass
+
+
+class RollCallPipeline:
+    def __init__(self, cam, recognizer, face_cascade, names, threshold=70, queue_size=1, gate_threshold=4.0):
+        self.cam = cam
+        self.recognizer = recognizer
+        self.face_cascade = face_cascade
+        self.names = names
+        self.threshold = threshold
+        self.frames = queue.Queue(maxsize=queue_size)  # capture -> recognition
+        self.display = queue.Queue(maxsize=2)  # capture -> UI
+        self.attendance = {}  # enrollment -> [enrollment, name, date, time], first sighting wins
+        self._overlays = []  # latest recognition boxes: (x, y, w, h, label, known)
+        self.gate_threshold = gate_threshold  # mean gray-level change that triggers recognition (0 = always)
+        self._reference = None  # thumbnail of the last recognized frame
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._capture, name="capture", daemon=True),
+            threading.Thread(target=self._recognize, name="recognize", daemon=True),
+        ]
+
+    def start(self):
+        for t in self._threads:
+            t.start()
+
+    def stop(self):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=2)
+
+    def _capture(self):
+        while not self._stop.is_set():
+            ret, frame = self.cam.read()
+            if not ret:
+                time.sleep(0.01)
+                continue
+            _put_latest(self.frames, frame)
+            _put_latest(self.display, frame)
+
+    def _recognize(self):
+        while not self._stop.is_set():
+            try:
+                frame = self.frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if self._unchanged(frame):
+                self.skipped += 1
+                continue  # same scene: keep the current overlays
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            faces = self.face_cascade.detectMultiScale(gray, 1.2, 5)
+            overlays = []
+            for (x, y, w, h) in faces:
+                Id, conf = self.recognizer.predict(gray[y:y + h, x:x + w])
+                if conf < self.threshold:
+                    name = self.names.get(Id, "")
+                    if Id not in self.attendance:
+                        ts = datetime.datetime.now()
+                        self.attendance[Id] = [Id, name, ts.strftime('%Y-%m-%d'), ts.strftime('%H:%M:%S')]
+                    overlays.append((x, y, w, h, f"{Id}-{name}", True))
+                else:
+                    overlays.append((x, y, w, h, "Unknown", False))
+            with self._lock:
+                self._overlays = overlays
+
+    def _unchanged(self, frame):
+        """True if frame matches the last recognized frame; otherwise it becomes the reference."""
+        if self.gate_threshold <= 0:
+            return False
+        thumb = cv2.cvtColor(cv2.resize(frame, (32, 24), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        if self._reference is not None and cv2.absdiff(thumb, self._reference).mean() < self.gate_threshold:
+            return True
+        self._reference = thumb
+        return False
+
+    def run_ui(self, window_name, deadline):
+        """Show frames until deadline (time.time()) or Esc. Call from the main thread."""
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        while time.time() < deadline:
+            try:
+                im = self.display.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            with self._lock:
+                overlays = list(self._overlays)
+            for (x, y, w, h, label, known) in overlays:
+                color = (0, 260, 0) if known else (0, 25, 255)
+                cv2.rectangle(im, (x, y), (x + w, y + h), color, 7)
+                cv2.putText(im, label, (x + h, y), font, 1, (255, 255, 0) if known else color, 4)
+            cv2.imshow(window_name, im)
+            if cv2.waitKey(1) & 0xff == 27:
+                break
+
+    def rows(self):
+        """Attendance rows [Enrollment, Name, Date, Time] in order of first sighting."""
+        return list(self.attendance.values())
+
+
+ATTENDANCE_HEADER = ['Enrollment', 'Name', 'Date', 'Time']
+
+
+def _keys_for_date(path, date, block_size=65536):
+    """
+    Enrollments already recorded on `date`, reading the file backwards from the end.
+    Rows are appended in time order, so this stops at the first older row: the cost is
+    proportional to today's rows, not to the whole history.
+    """
+    keys = set()
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        tail = b''
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+            lines = tail.split(b'\n')
+            tail = lines[0] if pos > 0 else b''  # first line may be partial
+            for line in reversed(lines[1:] if pos > 0 else lines):
+                parts = line.decode('utf-8', 'replace').strip().split(',')
+                if len(parts) < 4 or parts[0] == 'Enrollment':
+                    continue
+                if parts[-2] != date:
+                    return keys
+                keys.add(parts[0])
+    return keys
+
+
+def append_attendance_rows(path, rows):
+    """
+    Append [Enrollment, Name, Date, Time] rows to a subject CSV without rewriting it.
+    Writes the header for a new file and skips students already marked on the same date.
+    Returns the number of rows written.
+    """
+    if not rows:
+        return 0
+    exists = os.path.exists(path) and os.path.getsize(path) > 0
+    seen = {date: (_keys_for_date(path, date) if exists else set()) for date in {r[2] for r in rows}}
+    needs_newline = False
+    if exists:
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) not in (b'\n', b'\r')
+    written = 0
+    with open(path, 'a', newline='') as f:
+        writer = csv.writer(f)
+        if not exists:
+            writer.writerow(ATTENDANCE_HEADER)
+        elif needs_newline:
+            f.write('\r\n')
+        for enrollment, name, date, time_str in rows:
+            if str(enrollment) in seen[date]:
+                continue
+            seen[date].add(str(enrollment))
+            writer.writerow([enrollment, name, date, time_str])
+            written += 1
+    return written
@@ -1,3 +1,6 @@
+import atexit
+import multiprocessing
+
 from flask import Flask
 from flask_cors import CORS
 
@@ -17,6 +20,7 @@ def create_app(config_class=Config):
     from app.routes.auth import auth_bp
     from app.routes.teachers import teachers_bp
     from app.routes.subjects import subjects_bp
+    from app.routes.admin import admin_bp
 
     app.register_blueprint(main_bp)
     app.register_blueprint(students_bp)
@@ -25,5 +29,57 @@ def create_app(config_class=Config):
     app.register_blueprint(auth_bp)
     app.register_blueprint(teachers_bp)
     app.register_blueprint(subjects_bp)
+    app.register_blueprint(admin_bp)
+
+    from app.utils.http_cache import compress_response
+
+    app.after_request(compress_response)
+
+    from app.services.recognition_pool import shutdown_recognition_pool
+
+    atexit.register(shutdown_recognition_pool)
+
+    # Warm up in the serving process only, not in spawned recognition workers
+    if app.config.get("WARMUP_ON_STARTUP") and multiprocessing.parent_process() is None:
+        from app.services.warmup_service import start_warm_up
+
+        start_warm_up(background=app.config.get("WARMUP_IN_BACKGROUND", True))
+
+    return app
+
+
+def create_async_app(config_class=Config):
+    """
+    ASGI app for the async serving mode (run with `hypercorn asgi:app`).
+    I/O-bound read routes (listing, export, login, health) are served by async Quart views
+    on the async Mongo driver; every other route falls through to the Flask app, which
+    runs in a thread pool via Hypercorn's WSGI middleware.
+    """
+    from hypercorn.middleware import AsyncioWSGIMiddleware
+    from quart import Quart
+    from quart_cors import cors
+    from werkzeug.exceptions import HTTPException
+
+    from app.async_database import close_async_db
+    from app.async_routes import async_bp
+    from app.utils.http_cache import compress_response_async
+
+    quart_app = Quart(__name__)
+    quart_app.config.from_object(config_class)
+    quart_app = cors(quart_app, allow_origin=["http://localhost:3000", "http://127.0.0.1:3000"], allow_credentials=True)
+    quart_app.register_blueprint(async_bp)
+    quart_app.after_request(compress_response_async)
+    quart_app.after_serving(close_async_db)
+
+    wsgi_app = AsyncioWSGIMiddleware(create_app(config_class), max_body_size=config_class.MAX_WSGI_BODY_BYTES)
+    async_routes = quart_app.url_map.bind("localhost")
+
+    async def app(scope, receive, send):
+        if scope["type"] == "http":
+            try:
+                async_routes.match(scope["path"], method=scope["method"])
+            except HTTPException:
+                return await wsgi_app(scope, receive, send)
+        return await quart_app(scope, receive, send)
 
     return app
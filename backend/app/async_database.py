@@ -0,0 +1,47 @@
+"""
+Async MongoDB access for the ASGI serving mode (PyMongo's native AsyncMongoClient).
+Uses the same database and pool settings as app.database, with a larger pool
+(MONGO_ASYNC_MAX_POOL_SIZE) since one event loop multiplexes many requests.
+"""
+from pymongo import AsyncMongoClient
+
+from app.config import Config
+from app.database import mongo_client_options
+
+_client = None
+_db = None
+
+
+def get_async_db():
+    global _client, _db
+    if _db is None:
+        _client = AsyncMongoClient(
+            Config.MONGODB_URI,
+            **mongo_client_options(Config.MONGO_ASYNC_MAX_POOL_SIZE),
+        )
+        _db = _client[Config.DATABASE_NAME]
+    return _db
+
+
+async def close_async_db():
+    global _client, _db
+    if _client is not None:
+        await _client.close()
+    _client = None
+    _db = None
+
+
+def get_async_students_collection():
+    return get_async_db()["students"]
+
+
+def get_async_attendance_collection():
+    return get_async_db()["attendance"]
+
+
+def get_async_subjects_collection():
+    return get_async_db()["subjects"]
+
+
+def get_async_teachers_collection():
+    return get_async_db()["teachers"]
@@ -0,0 +1,179 @@
+"""
+Async (Quart) versions of the I/O-bound read routes: listing, export, login and health.
+Responses match the Flask blueprints; every other route is served by the WSGI app
+(see create_async_app).
+"""
+import asyncio
+
+from quart import Blueprint, Response, jsonify, request
+
+from app.async_database import (
+    get_async_db,
+    get_async_students_collection,
+    get_async_attendance_collection,
+    get_async_subjects_collection,
+    get_async_teachers_collection,
+)
+from app.models.attendance import attendance_doc_to_response
+from app.models.student import student_doc_to_response
+from app.models.subject import subject_doc_to_response
+from app.models.teacher import teacher_doc_to_response
+from app.services.attendance_service import build_attendance_query, attendance_records_to_csv
+from app.services.export_service import EXTENSIONS, MIMETYPES, stream_attendance
+from app.services.profiler_service import note_request
+from app.services.auth_service import login_admin, student_session, teacher_session, verify_password
+from app.utils.http_cache import versioned_json_async
+
+async_bp = Blueprint("async_api", __name__)
+
+
+def _arg(name: str):
+    return request.args.get(name, "").strip() or None
+
+
+@async_bp.after_app_request
+async def _count_profiled_request(response):
+    # Request-bounded profiling sessions (POST /api/admin/profile?requests=N) count Quart views too
+    note_request(request.path)
+    return response
+
+
+@async_bp.route("/health", methods=["GET"])
+async def health():
+    try:
+        await get_async_db().command("ping")
+        db_status = "connected"
+    except Exception as e:
+        db_status = f"error: {str(e)}"
+    return {
+        "status": "ok",
+        "message": "Attendance Management System API",
+        "database": db_status,
+        "mode": "async",
+    }
+
+
+@async_bp.route("/api/subjects", methods=["GET"])
+async def list_subjects():
+    async def build():
+        cursor = get_async_subjects_collection().find().sort("name", 1)
+        return {"subjects": [subject_doc_to_response(d) async for d in cursor]}
+
+    return await versioned_json_async("subjects", (), build)
+
+
+@async_bp.route("/api/teachers", methods=["GET"])
+async def list_teachers():
+    async def build():
+        cursor = get_async_teachers_collection().find().sort("createdAt", -1)
+        return {"teachers": [teacher_doc_to_response(d) async for d in cursor]}
+
+    return await versioned_json_async("teachers", (), build)
+
+
+@async_bp.route("/api/students", methods=["GET"])
+async def list_students():
+    skip = max(0, request.args.get("skip", 0, type=int))
+    limit = min(100, max(1, request.args.get("limit", 50, type=int)))
+
+    async def build():
+        coll = get_async_students_collection()
+        cursor = coll.find().sort("createdAt", -1).skip(skip).limit(limit)
+        students, total = await asyncio.gather(
+            cursor.to_list(length=limit),
+            coll.count_documents({}),
+        )
+        return {
+            "students": [student_doc_to_response(d) for d in students],
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+        }
+
+    return await versioned_json_async("students", (skip, limit), build)
+
+
+@async_bp.route("/api/students/<enrollment>", methods=["GET"])
+async def get_student(enrollment):
+    doc = await get_async_students_collection().find_one({"enrollment": enrollment})
+    if not doc:
+        return jsonify({"error": "Student not found"}), 404
+    return jsonify(student_doc_to_response(doc))
+
+
+@async_bp.route("/api/attendance", methods=["GET"])
+async def get_attendance():
+    query = build_attendance_query(_arg("subject"), _arg("date"), _arg("enrollment"), _arg("dateFrom"), _arg("dateTo"))
+    skip = max(0, request.args.get("skip", 0, type=int))
+    limit = min(200, max(1, request.args.get("limit", 100, type=int)))
+
+    coll = get_async_attendance_collection()
+    cursor = coll.find(query).sort("date", -1).sort("createdAt", -1).skip(skip).limit(limit)
+    docs, total = await asyncio.gather(cursor.to_list(length=limit), coll.count_documents(query))
+    return jsonify({
+        "attendance": [attendance_doc_to_response(d) for d in docs],
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+    })
+
+
+@async_bp.route("/api/attendance/export", methods=["GET"])
+async def export_attendance():
+    query = build_attendance_query(_arg("subject"), _arg("date"), _arg("enrollment"), _arg("dateFrom"), _arg("dateTo"))
+    fmt = (request.args.get("format") or "csv").strip().lower()
+    if fmt != "csv":
+        try:
+            chunks = stream_attendance(fmt, query, request.args.get("limit", type=int))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except RuntimeError as e:
+            return jsonify({"error": str(e)}), 500
+
+        async def body():
+            # The export reads the sync cursor and encodes batches: keep both off the event loop
+            while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+                yield chunk
+
+        return Response(
+            body(),
+            mimetype=MIMETYPES[fmt],
+            headers={"Content-Disposition": f"attachment; filename=attendance.{EXTENSIONS[fmt]}"},
+        )
+    limit = min(10000, max(1, request.args.get("limit", 5000, type=int)))
+
+    cursor = get_async_attendance_collection().find(query).sort("date", -1).sort("createdAt", -1).limit(limit)
+    records = [attendance_doc_to_response(d) async for d in cursor]
+    return Response(
+        attendance_records_to_csv(records),
+        mimetype="text/csv",
+        headers={"Content-Disposition": "attachment; filename=attendance.csv"},
+    )
+
+
+@async_bp.route("/api/auth/login", methods=["POST"])
+async def login_route():
+    data = await request.get_json(silent=True) or {}
+    email = (data.get("email") or "").strip()
+    password = data.get("password", "")
+    role = (data.get("role") or "student").strip().lower()
+
+    if not email:
+        return jsonify({"error": "email required"}), 400
+    if not password:
+        return jsonify({"error": "password required"}), 400
+    if role not in ("student", "teacher", "admin"):
+        return jsonify({"error": "role must be student, teacher, or admin"}), 400
+
+    result = None
+    if role == "admin":
+        result = login_admin(email, password)
+    else:
+        coll = get_async_students_collection() if role == "student" else get_async_teachers_collection()
+        doc = await coll.find_one({"email": email.lower()})
+        # bcrypt is CPU-bound: keep it off the event loop
+        if doc and await asyncio.to_thread(verify_password, password, doc["passwordHash"]):
+            result = student_session(doc) if role == "student" else teacher_session(doc)
+    if not result:
+        return jsonify({"error": "Invalid email or password"}), 401
+    return jsonify(result)
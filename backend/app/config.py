@@ -1,9 +1,19 @@
+import json
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+def _load_profile(path: str) -> dict:
+    """Tuned settings file (e.g. scripts/autotune_detector.py output); {} if absent or invalid."""
+    try:
+        with open(path) as f:
+            return json.load(f).get("settings", {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
     MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
@@ -22,6 +32,25 @@ class Config:
         "HAARCASCADE_PATH",
         _haar_in_backend if os.path.exists(_haar_in_backend) else _haar_in_root,
     )
+    _haar_alt_in_backend = os.path.join(BASE_DIR, "haarcascade_frontalface_alt.xml")
+    HAARCASCADE_ALT_PATH = os.getenv(
+        "HAARCASCADE_ALT_PATH",
+        _haar_alt_in_backend if os.path.exists(_haar_alt_in_backend) else os.path.join(_project_root, "haarcascade_frontalface_alt.xml"),
+    )
+    LBP_CASCADE_PATH = os.getenv("LBP_CASCADE_PATH", os.path.join(BASE_DIR, "models", "lbpcascade_frontalface_improved.xml"))
+    YUNET_MODEL_PATH = os.getenv("YUNET_MODEL_PATH", os.path.join(BASE_DIR, "models", "face_detection_yunet_2023mar.onnx"))
+
+    # Face detector backend: haar_default | haar_alt | lbp | yunet (see app/services/detectors.py).
+    # A tuned profile (scripts/autotune_detector.py) supplies defaults; env vars still win.
+    _profile_env = os.getenv("DETECTOR_PROFILE_PATH", "").strip()
+    DETECTOR_PROFILE_PATH = os.path.join(BASE_DIR, _profile_env) if _profile_env and not os.path.isabs(_profile_env) else (_profile_env or os.path.join(BASE_DIR, "detector_profile.json"))
+    _detector_profile = _load_profile(DETECTOR_PROFILE_PATH)
+    FACE_DETECTOR = os.getenv("FACE_DETECTOR", str(_detector_profile.get("detector", "haar_default"))).strip().lower()
+    DETECT_SCALE_FACTOR = float(os.getenv("DETECT_SCALE_FACTOR", _detector_profile.get("scaleFactor", "1.2")))
+    DETECT_MIN_NEIGHBORS = int(os.getenv("DETECT_MIN_NEIGHBORS", _detector_profile.get("minNeighbors", "5")))
+    DETECT_MIN_SIZE = int(os.getenv("DETECT_MIN_SIZE", _detector_profile.get("minSize", "0")))  # full-frame pixels; 0 = no minimum
+    DETECT_DOWNSCALE = float(os.getenv("DETECT_DOWNSCALE", _detector_profile.get("downscale", "1.0")))  # detect on a resized frame (<1)
+    YUNET_SCORE_THRESHOLD = float(os.getenv("YUNET_SCORE_THRESHOLD", "0.8"))
 
     # Auth - Admin credentials (for admin login)
     ADMIN_EMAIL = os.getenv("ADMIN_EMAIL", "admin@attendance.com").strip().lower()
@@ -41,3 +70,111 @@ class Config:
     # Continuous learning: save attendance face crops for model retraining
     SAVE_ATTENDANCE_FACES_FOR_TRAINING = os.getenv("SAVE_ATTENDANCE_FACES_FOR_TRAINING", "true").lower() in ("true", "1", "yes")
     MAX_ATTENDANCE_FACES_PER_STUDENT_PER_DAY = int(os.getenv("MAX_ATTENDANCE_FACES_PER_STUDENT_PER_DAY", "2"))
+
+    # Bulk student import: threads used for bcrypt hashing (0 = one per CPU core)
+    BULK_IMPORT_HASH_WORKERS = int(os.getenv("BULK_IMPORT_HASH_WORKERS", "0"))
+
+    # Recognition worker pool (0 = recognize inline in the request thread)
+    RECOGNITION_WORKERS = int(os.getenv("RECOGNITION_WORKERS", "0"))
+    RECOGNITION_MAX_QUEUE = int(os.getenv("RECOGNITION_MAX_QUEUE", "4"))  # frames waiting beyond busy workers
+    RECOGNITION_TIMEOUT_SECONDS = float(os.getenv("RECOGNITION_TIMEOUT_SECONDS", "30"))
+    RECOGNITION_RETRY_AFTER_SECONDS = int(os.getenv("RECOGNITION_RETRY_AFTER_SECONDS", "2"))
+
+    # MongoDB connection pool (sync client; async serving mode uses MONGO_ASYNC_MAX_POOL_SIZE)
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+    MONGO_ASYNC_MAX_POOL_SIZE = int(os.getenv("MONGO_ASYNC_MAX_POOL_SIZE", "200"))
+    MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+    MONGO_MAX_CONNECTING = int(os.getenv("MONGO_MAX_CONNECTING", "4"))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "0"))  # 0 = wait until serverSelectionTimeout
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "10000"))
+    MAX_WSGI_BODY_BYTES = int(os.getenv("MAX_WSGI_BODY_BYTES", str(64 * 1024 * 1024)))  # async mode: largest body passed to Flask routes
+
+    # Startup warm-up (DB, indexes, cascade, model, recognition pool); see GET /ready
+    WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() in ("true", "1", "yes")
+    WARMUP_IN_BACKGROUND = os.getenv("WARMUP_IN_BACKGROUND", "true").lower() in ("true", "1", "yes")
+
+    # Write-behind persistence for face images (local write + cloud backup off the request path)
+    WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "true").lower() in ("true", "1", "yes")
+    PERSIST_QUEUE_SIZE = int(os.getenv("PERSIST_QUEUE_SIZE", "256"))
+    PERSIST_MAX_RETRIES = int(os.getenv("PERSIST_MAX_RETRIES", "5"))
+    PERSIST_RETRY_BASE_SECONDS = float(os.getenv("PERSIST_RETRY_BASE_SECONDS", "1"))
+    PERSIST_SPOOL_REPLAY_SECONDS = float(os.getenv("PERSIST_SPOOL_REPLAY_SECONDS", "60"))
+    PERSIST_MAX_SPOOL_REPLAYS = int(os.getenv("PERSIST_MAX_SPOOL_REPLAYS", "5"))  # then the spool file becomes *.bad
+    _spool = os.getenv("PERSIST_SPOOL_PATH", "").strip()
+    PERSIST_SPOOL_PATH = os.path.join(BASE_DIR, _spool) if _spool and not os.path.isabs(_spool) else (_spool or os.path.join(BASE_DIR, "PersistSpool"))
+    # Cloud backup target: auto (Cloudinary when configured) | cloudinary | local | none
+    CLOUD_BACKUP_BACKEND = os.getenv("CLOUD_BACKUP_BACKEND", "auto").strip().lower()
+    _backup_dir = os.getenv("CLOUD_BACKUP_LOCAL_PATH", "").strip()
+    CLOUD_BACKUP_LOCAL_PATH = os.path.join(BASE_DIR, _backup_dir) if _backup_dir and not os.path.isabs(_backup_dir) else (_backup_dir or os.path.join(BASE_DIR, "CloudBackup"))
+
+    # Near-duplicate suppression for attendance face crops (dHash Hamming distance, 0-64 bits)
+    FACE_DEDUP_ENABLED = os.getenv("FACE_DEDUP_ENABLED", "true").lower() in ("true", "1", "yes")
+    FACE_DEDUP_MAX_DISTANCE = int(os.getenv("FACE_DEDUP_MAX_DISTANCE", "6"))
+
+    # Per-student training sample budget (0 = unlimited); the most diverse samples are kept
+    MAX_SAMPLES_PER_STUDENT = int(os.getenv("MAX_SAMPLES_PER_STUDENT", "0"))
+    ARCHIVE_EXCESS_SAMPLES = os.getenv("ARCHIVE_EXCESS_SAMPLES", "false").lower() in ("true", "1", "yes")
+    _archive = os.getenv("TRAINING_ARCHIVE_PATH", "").strip()
+    TRAINING_ARCHIVE_PATH = os.path.join(BASE_DIR, _archive) if _archive and not os.path.isabs(_archive) else (_archive or os.path.join(BASE_DIR, "TrainingImageArchive"))
+
+    # Canonical face crop: every stored/predicted face is cropped with this margin and resized
+    FACE_CROP_SIZE = int(os.getenv("FACE_CROP_SIZE", "160"))
+    FACE_CROP_MARGIN = float(os.getenv("FACE_CROP_MARGIN", "0.1"))
+
+    # Face sample storage: directory (TrainingImage/ files) | sqlite (one packed FACE_STORE_DB_PATH file)
+    FACE_STORE_BACKEND = os.getenv("FACE_STORE_BACKEND", "directory").strip().lower()
+    _face_db = os.getenv("FACE_STORE_DB_PATH", "").strip()
+    FACE_STORE_DB_PATH = os.path.join(BASE_DIR, _face_db) if _face_db and not os.path.isabs(_face_db) else (_face_db or os.path.join(BASE_DIR, "FaceStore.sqlite3"))
+
+    # Change gating for auto attendance: skip recognition when a camera's frame is unchanged
+    FRAME_GATE_ENABLED = os.getenv("FRAME_GATE_ENABLED", "true").lower() in ("true", "1", "yes")
+    FRAME_GATE_THRESHOLD = float(os.getenv("FRAME_GATE_THRESHOLD", "4"))  # mean abs gray-level difference (0-255)
+    FRAME_GATE_MAX_AGE_SECONDS = float(os.getenv("FRAME_GATE_MAX_AGE_SECONDS", "30"))
+
+    # Auto attendance retry de-duplication: outcomes cached by Idempotency-Key or subject + payload hash
+    IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "1024"))  # 0 = disabled
+    IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "300"))
+
+    # Conditional GET for /api/students, /api/teachers, /api/subjects (version counters bumped on writes)
+    COLLECTION_VERSION_TTL_SECONDS = float(os.getenv("COLLECTION_VERSION_TTL_SECONDS", "1"))  # 0 = read the counter every request
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))  # serialized list bodies kept per process
+    RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "600"))
+    # gzip JSON / CSV responses of at least this many bytes when the client accepts it (0 = off)
+    COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))
+
+    # Columnar attendance export (GET /api/attendance/export?format=parquet|arrow, needs pyarrow)
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "50000"))  # rows per record batch / Parquet row group
+    EXPORT_MAX_ROWS = int(os.getenv("EXPORT_MAX_ROWS", "5000000"))  # 0 = no cap
+    EXPORT_PARQUET_COMPRESSION = os.getenv("EXPORT_PARQUET_COMPRESSION", "zstd")  # zstd, snappy, gzip, none
+
+    # On-demand sampling profiler (POST /api/admin/profile, admin token); one session per process
+    PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "true").lower() in ("true", "1", "yes")
+    PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "120"))
+    PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+
+    # Recognizer engine: lbph (Trainner.yml) | lbph_compact (uniform LBP, lbph_compact.npz) |
+    # sface (SFace embeddings in a vector index); retrain after switching
+    RECOGNIZER_ENGINE = os.getenv("RECOGNIZER_ENGINE", "lbph").strip().lower()
+    # LBPH parameters (lbph and lbph_compact); histograms have grid_x * grid_y cells. Retrain after changing
+    LBPH_RADIUS = int(os.getenv("LBPH_RADIUS", "1"))
+    LBPH_NEIGHBORS = int(os.getenv("LBPH_NEIGHBORS", "8"))
+    LBPH_GRID_X = int(os.getenv("LBPH_GRID_X", "8"))
+    LBPH_GRID_Y = int(os.getenv("LBPH_GRID_Y", "8"))
+    LBPH_COMPACT_DTYPE = os.getenv("LBPH_COMPACT_DTYPE", "uint16").strip().lower()  # uint16 counts | float16
+    LBPH_COMPACT_THRESHOLD = float(os.getenv("LBPH_COMPACT_THRESHOLD", "80"))  # chi-square distance; lower = stricter
+    # Memory-map LBPH histograms (lbph_histograms.npy) so every worker process shares one read-only copy
+    LBPH_SHARED_MODEL = os.getenv("LBPH_SHARED_MODEL", "false").lower() in ("true", "1", "yes")
+    SFACE_MODEL_PATH = os.getenv("SFACE_MODEL_PATH", os.path.join(BASE_DIR, "models", "face_recognition_sface_2021dec.onnx"))
+    SFACE_MATCH_THRESHOLD = float(os.getenv("SFACE_MATCH_THRESHOLD", "0.363"))  # cosine similarity (OpenCV's recommended value)
+    VECTOR_INDEX = os.getenv("VECTOR_INDEX", "auto").strip().lower()  # flat | ivf | auto
+    VECTOR_INDEX_IVF_MIN_SAMPLES = int(os.getenv("VECTOR_INDEX_IVF_MIN_SAMPLES", "20000"))
+    VECTOR_INDEX_NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", "8"))
+
+    # Offline batch attendance from lecture videos / photo folders (scripts/batch_attendance.py, POST /api/attendance/batch)
+    BATCH_FRAME_STRIDE = int(os.getenv("BATCH_FRAME_STRIDE", "15"))  # recognize every Nth frame
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "0"))  # 0 = one process per CPU core
+    BATCH_MIN_FRAMES = int(os.getenv("BATCH_MIN_FRAMES", "2"))  # sampled frames a student must be seen in
+    _batch_dir = os.getenv("BATCH_UPLOAD_PATH", "").strip()
+    BATCH_UPLOAD_PATH = os.path.join(BASE_DIR, _batch_dir) if _batch_dir and not os.path.isabs(_batch_dir) else (_batch_dir or os.path.join(BASE_DIR, "BatchUploads"))
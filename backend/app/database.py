@@ -5,21 +5,55 @@ from app.config import Config
 
 _client = None
 _db = None
+_indexes_checked = False
+_index_error = None
+
+
+def mongo_client_options(max_pool_size: int = None) -> dict:
+    """Connection-pool settings shared by the sync and async Mongo clients (see Config)."""
+    options = {
+        "tlsCAFile": certifi.where(),
+        "maxPoolSize": max_pool_size if max_pool_size is not None else Config.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": Config.MONGO_MIN_POOL_SIZE,
+        "maxConnecting": Config.MONGO_MAX_CONNECTING,
+        "maxIdleTimeMS": Config.MONGO_MAX_IDLE_TIME_MS,
+        "serverSelectionTimeoutMS": Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    }
+    if Config.MONGO_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = Config.MONGO_WAIT_QUEUE_TIMEOUT_MS
+    return options
+
+
+def connect_db():
+    """Create the shared client and return the database handle (no index setup)."""
+    global _client, _db
+    if _db is None:
+        if Config.MONGODB_URI.startswith("mongomock://"):
+            import mongomock  # in-memory stand-in for load tests (pip install mongomock)
 
+            _client = mongomock.MongoClient()
+        else:
+            _client = MongoClient(Config.MONGODB_URI, **mongo_client_options())
+        _db = _client[Config.DATABASE_NAME]
+    return _db
 
-def get_db():
-    global _db
-    if _db is None:
-        client = MongoClient(
-            Config.MONGODB_URI,
-            tlsCAFile=certifi.where(),
-        )
-        _db = client[Config.DATABASE_NAME]
+
+def ensure_indexes():
+    """Create indexes once per process (first call only). Returns the error message, if any."""
+    global _indexes_checked, _index_error
+    if not _indexes_checked:
+        _indexes_checked = True
         try:
-            init_indexes(_db)
-        except Exception:
-            pass  # indexes may already exist
-    return _db
+            init_indexes(connect_db())
+        except Exception as e:
+            _index_error = str(e)  # indexes may already exist
+    return _index_error
+
+
+def get_db():
+    if not _indexes_checked:
+        ensure_indexes()
+    return connect_db()
 
 
 def get_students_collection():
@@ -12,6 +12,8 @@ Schema:
   - createdAt: datetime
 """
 
+DEFAULT_TYPE = "manual"  # type of records stored without one (e.g. imported rows)
+
 
 def attendance_schema(
     enrollment: str,
@@ -29,7 +31,7 @@ def attendance_schema(
         "subject": str(subject).strip(),
         "date": str(date).strip(),
         "time": str(time).strip(),
-        "type": attendance_type if attendance_type in ("auto", "manual") else "manual",
+        "type": attendance_type if attendance_type in ("auto", "manual") else DEFAULT_TYPE,
         "createdAt": datetime.utcnow(),
     }
 
@@ -45,6 +47,6 @@ def attendance_doc_to_response(doc: dict) -> dict:
         "subject": doc["subject"],
         "date": doc["date"],
         "time": doc["time"],
-        "type": doc.get("type", "manual"),
+        "type": doc.get("type", DEFAULT_TYPE),
         "createdAt": doc["createdAt"].isoformat() if doc.get("createdAt") else None,
     }
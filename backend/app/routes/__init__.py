@@ -1,6 +1,7 @@
 from flask import Blueprint
 
 from app.database import get_db
+from app.services.warmup_service import get_readiness
 
 main_bp = Blueprint("main", __name__)
 
@@ -22,3 +23,10 @@ def health():
         "message": "Attendance Management System API",
         "database": db_status,
     }
+
+
+@main_bp.route("/ready", methods=["GET"])
+def ready():
+    """Readiness probe: cached warm-up state, no database round trip. 503 until ready."""
+    state = get_readiness()
+    return state, 200 if state["ready"] else 503
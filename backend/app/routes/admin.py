@@ -0,0 +1,51 @@
+from flask import Blueprint, Response, jsonify, request
+
+from app.services.profiler_service import ProfilerBusyError, note_request, profile, to_collapsed
+from app.utils.auth import admin_required
+
+admin_bp = Blueprint("admin", __name__, url_prefix="/api/admin")
+
+
+@admin_bp.after_app_request
+def _count_profiled_request(response):
+    note_request(request.path)
+    return response
+
+
+@admin_bp.route("/profile", methods=["POST"])
+@admin_required
+def profile_endpoint():
+    """
+    Sample every thread of this server process and return collapsed stacks (flame graph input).
+    Query: seconds=10 (time limit), requests=0 (stop after N finished requests; 0 = time only),
+    path= (only count requests under this path, e.g. /api/attendance/auto), intervalMs=,
+    idle=false (include threads idling in the server loop), format=collapsed|json.
+    Blocks until the session ends. Admin token required.
+    """
+    try:
+        result = profile(
+            seconds=request.args.get("seconds", 10, type=float),
+            max_requests=request.args.get("requests", 0, type=int),
+            interval_ms=request.args.get("intervalMs", type=float),
+            path_prefix=(request.args.get("path") or "").strip() or None,
+            include_idle=request.args.get("idle", "false").lower() in ("true", "1", "yes"),
+        )
+    except ProfilerBusyError as e:
+        return jsonify({"error": str(e)}), 409
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 500
+
+    if request.args.get("format") == "json":
+        result["stacks"] = [{"stack": stack, "count": count} for stack, count in result["stacks"]]
+        return jsonify(result)
+    return Response(
+        to_collapsed(result["stacks"]),
+        mimetype="text/plain",
+        headers={
+            "X-Profile-Samples": str(result["samples"]),
+            "X-Profile-Requests": str(result["requests"]),
+            "X-Profile-Seconds": str(result["seconds"]),
+        },
+    )
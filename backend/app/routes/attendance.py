@@ -1,23 +1,40 @@
+import os
+import uuid
+
 from flask import Blueprint, request, jsonify
 
 from flask import Response
+from werkzeug.utils import secure_filename
+
+from app.config import Config
 
 from app.services.attendance_service import (
     recognize_face_and_record,
     record_manual,
     list_attendance,
     export_attendance_csv,
+    build_attendance_query,
 )
+from app.services.export_service import EXTENSIONS, MIMETYPES, stream_attendance
+from app.services.recognition_pool import RecognitionBusyError
 
 attendance_bp = Blueprint("attendance", __name__, url_prefix="/api/attendance")
 
 
 @attendance_bp.route("/auto", methods=["POST"])
 def auto_attendance():
-    """Recognize face from image and record attendance. Body: { image: base64, subject: str }"""
+    """
+    Recognize face from image and record attendance. Body: { image: base64, subject: str, cameraId?: str }
+    Frames are change-gated per camera only when the client names it (cameraId or the
+    X-Camera-Id header): kiosks behind one NAT or proxy share an address.
+    Retries with the same Idempotency-Key header (or idempotencyKey field), or the same
+    image + subject, return the original response.
+    """
     data = request.get_json() or {}
     image_b64 = data.get("image")
     subject = (data.get("subject") or "").strip()
+    camera = (data.get("cameraId") or request.headers.get("X-Camera-Id") or "").strip() or None
+    idempotency_key = (request.headers.get("Idempotency-Key") or data.get("idempotencyKey") or "").strip() or None
 
     if not image_b64:
         return jsonify({"error": "image (base64) required in JSON body"}), 400
@@ -25,8 +42,10 @@ def auto_attendance():
         return jsonify({"error": "subject required in JSON body"}), 400
 
     try:
-        result = recognize_face_and_record(image_b64, subject)
+        result = recognize_face_and_record(image_b64, subject, camera=camera, idempotency_key=idempotency_key)
         return jsonify(result), 201
+    except RecognitionBusyError as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": str(e.retry_after)}
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except RuntimeError as e:
@@ -82,12 +101,29 @@ def get_attendance():
 
 @attendance_bp.route("/export", methods=["GET"])
 def export_attendance():
-    """Export attendance as CSV. Query: subject=, date=, dateFrom=, dateTo=, enrollment="""
+    """
+    Export attendance. Query: subject=, date=, dateFrom=, dateTo=, enrollment=, limit=,
+    format=csv (default, at most 10000 rows) | parquet | arrow (streamed, up to EXPORT_MAX_ROWS).
+    """
     subject = request.args.get("subject", "").strip() or None
     date = request.args.get("date", "").strip() or None
     enrollment = request.args.get("enrollment", "").strip() or None
     date_from = request.args.get("dateFrom", "").strip() or None
     date_to = request.args.get("dateTo", "").strip() or None
+    fmt = (request.args.get("format") or "csv").strip().lower()
+    if fmt != "csv":
+        query = build_attendance_query(subject, date, enrollment, date_from, date_to)
+        try:
+            chunks = stream_attendance(fmt, query, request.args.get("limit", type=int))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except RuntimeError as e:
+            return jsonify({"error": str(e)}), 500
+        return Response(
+            chunks,
+            mimetype=MIMETYPES[fmt],
+            headers={"Content-Disposition": f"attachment; filename=attendance.{EXTENSIONS[fmt]}"},
+        )
     limit = min(10000, max(1, request.args.get("limit", 5000, type=int)))
 
     csv_content = export_attendance_csv(
@@ -103,3 +139,53 @@ def export_attendance():
         mimetype="text/csv",
         headers={"Content-Disposition": "attachment; filename=attendance.csv"},
     )
+
+
+@attendance_bp.route("/batch", methods=["POST"])
+def batch_attendance():
+    """
+    Start an offline attendance job. Multipart form: subject, file (one video) or files (images),
+    stride?, date? (YYYY-MM-DD), startTime? (HH:MM:SS, when the recording started), minFrames?
+    Returns 202 { jobId, status }; poll GET /api/attendance/batch/<jobId>.
+    """
+    from app.services.batch_service import VIDEO_EXTENSIONS, start_batch_job  # loads OpenCV
+
+    subject = (request.form.get("subject") or "").strip()
+    if not subject:
+        return jsonify({"error": "subject required"}), 400
+    video = request.files.get("file")
+    images = request.files.getlist("files")
+    if not video and not images:
+        return jsonify({"error": "file (video) or files (images) required"}), 400
+    if video and not video.filename.lower().endswith(VIDEO_EXTENSIONS):
+        return jsonify({"error": f"file must be a video ({', '.join(VIDEO_EXTENSIONS)})"}), 400
+
+    upload_dir = os.path.join(Config.BATCH_UPLOAD_PATH, uuid.uuid4().hex)
+    os.makedirs(upload_dir)
+    if video:
+        source = os.path.join(upload_dir, secure_filename(video.filename) or "recording.mp4")
+        video.save(source)
+    else:
+        source = upload_dir
+        for i, f in enumerate(images):
+            f.save(os.path.join(upload_dir, f"{i:06d}_{secure_filename(f.filename) or 'frame.jpg'}"))
+
+    options = {
+        "stride": request.form.get("stride", type=int),
+        "date": (request.form.get("date") or "").strip() or None,
+        "start_time": (request.form.get("startTime") or "").strip() or None,
+        "min_frames": request.form.get("minFrames", type=int),
+    }
+    job_id = start_batch_job(source, subject, cleanup_dir=upload_dir, **options)
+    return jsonify({"jobId": job_id, "status": "queued"}), 202
+
+
+@attendance_bp.route("/batch/<job_id>", methods=["GET"])
+def batch_attendance_status(job_id):
+    """Batch job status: queued | running (with progress) | done (with result) | error."""
+    from app.services.batch_service import get_batch_job
+
+    job = get_batch_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
@@ -4,7 +4,9 @@ import bcrypt
 
 from app.database import get_students_collection
 from app.models.student import student_schema, student_doc_to_response
-from app.services.face_image_service import save_face_image
+from app.services.collection_versions import bump
+from app.utils.http_cache import versioned_json
+from app.services.student_import_service import parse_students_csv, import_students
 
 students_bp = Blueprint("students", __name__, url_prefix="/api/students")
 
@@ -50,29 +52,64 @@ def register():
 
     doc = student_schema(enrollment, name, email, password_hash, image_count=0)
     result = coll.insert_one(doc)
+    bump("students")
     doc["_id"] = result.inserted_id
 
     return jsonify(student_doc_to_response(doc)), 201
 
 
+@students_bp.route("/import", methods=["POST"])
+def bulk_import():
+    """
+    Bulk import students from CSV. Multipart field "file" or JSON { csv: str }.
+    Optional: defaultPassword, emailDomain (form fields or JSON keys).
+    """
+    if "file" in request.files:
+        content = request.files["file"].read().decode("utf-8-sig")
+        options = request.form
+    else:
+        options = request.get_json(silent=True) or {}
+        content = options.get("csv") or ""
+    if not content.strip():
+        return jsonify({"error": "CSV file or csv text required"}), 400
+
+    try:
+        rows = parse_students_csv(content)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    result = import_students(
+        rows,
+        default_password=options.get("defaultPassword") or None,
+        email_domain=(options.get("emailDomain") or "").strip() or None,
+    )
+    return jsonify(result), 201 if result["inserted"] else 200
+
+
 @students_bp.route("", methods=["GET"])
 def list_students():
-    """List all students. Query: skip, limit (optional)."""
+    """
+    List all students. Query: skip, limit (optional).
+    Conditional GET: the ETag follows the students version.
+    """
     skip = max(0, request.args.get("skip", 0, type=int))
     limit = min(100, max(1, request.args.get("limit", 50, type=int)))
 
-    coll = get_students_collection()
-    cursor = coll.find().sort("createdAt", -1).skip(skip).limit(limit)
-    students = [student_doc_to_response(d) for d in cursor]
+    def build():
+        coll = get_students_collection()
+        cursor = coll.find().sort("createdAt", -1).skip(skip).limit(limit)
+        students = [student_doc_to_response(d) for d in cursor]
 
-    total = coll.count_documents({})
+        total = coll.count_documents({})
 
-    return jsonify({
-        "students": students,
-        "total": total,
-        "skip": skip,
-        "limit": limit,
-    })
+        return {
+            "students": students,
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+        }
+
+    return versioned_json("students", (skip, limit), build)
 
 
 @students_bp.route("/<enrollment>", methods=["GET"])
@@ -98,6 +135,8 @@ def upload_face_image(enrollment):
     if not image_b64:
         return jsonify({"error": "image (base64) required in JSON body"}), 400
 
+    from app.services.face_image_service import save_face_image  # loads OpenCV
+
     try:
         result = save_face_image(enrollment, doc["name"], image_b64)
     except ValueError as e:
@@ -111,6 +150,7 @@ def upload_face_image(enrollment):
         {"enrollment": enrollment},
         {"$set": {"imageCount": new_count, "updatedAt": datetime.utcnow()}},
     )
+    bump("students")
 
     return jsonify({
         "message": "Image saved",
@@ -123,9 +163,22 @@ def upload_face_image(enrollment):
 
 @students_bp.route("/<enrollment>", methods=["DELETE"])
 def delete_student(enrollment):
-    """Delete student by enrollment. (Admin-only in Phase 6.)"""
+    """
+    Delete student by enrollment, their stored face samples, and their label in the served
+    model (masked until the next train). (Admin-only in Phase 6.)
+    """
     coll = get_students_collection()
     result = coll.delete_one({"enrollment": enrollment})
     if result.deleted_count == 0:
         return jsonify({"error": "Student not found"}), 404
-    return jsonify({"message": "Student deleted"}), 200
+    bump("students")
+    from app.services.face_image_service import delete_student_samples
+    from app.services.train_service import remove_student_from_model
+
+    removed_from_model = remove_student_from_model(enrollment)
+    samples_deleted = delete_student_samples(enrollment)
+    return jsonify({
+        "message": "Student deleted",
+        "samplesDeleted": samples_deleted,
+        "removedFromModel": removed_from_model,
+    }), 200
@@ -2,17 +2,21 @@ from flask import Blueprint, request, jsonify
 
 from app.database import get_subjects_collection
 from app.models.subject import subject_schema, subject_doc_to_response
+from app.services.collection_versions import bump
+from app.utils.http_cache import versioned_json
 
 subjects_bp = Blueprint("subjects", __name__, url_prefix="/api/subjects")
 
 
 @subjects_bp.route("", methods=["GET"])
 def list_subjects():
-    """List all subjects."""
-    coll = get_subjects_collection()
-    cursor = coll.find().sort("name", 1)
-    subjects = [subject_doc_to_response(d) for d in cursor]
-    return jsonify({"subjects": subjects})
+    """List all subjects. Conditional GET: the ETag follows the subjects version."""
+
+    def build():
+        cursor = get_subjects_collection().find().sort("name", 1)
+        return {"subjects": [subject_doc_to_response(d) for d in cursor]}
+
+    return versioned_json("subjects", (), build)
 
 
 @subjects_bp.route("", methods=["POST"])
@@ -29,5 +33,6 @@ def create_subject():
 
     doc = subject_schema(name)
     result = coll.insert_one(doc)
+    bump("subjects")
     doc["_id"] = result.inserted_id
     return jsonify(subject_doc_to_response(doc)), 201
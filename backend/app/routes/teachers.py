@@ -7,17 +7,21 @@ from flask import Blueprint, request, jsonify
 
 from app.database import get_teachers_collection, get_subjects_collection
 from app.models.teacher import teacher_schema, teacher_doc_to_response
+from app.services.collection_versions import bump
+from app.utils.http_cache import versioned_json
 
 teachers_bp = Blueprint("teachers", __name__, url_prefix="/api/teachers")
 
 
 @teachers_bp.route("", methods=["GET"])
 def list_teachers():
-    """List all teachers."""
-    coll = get_teachers_collection()
-    cursor = coll.find().sort("createdAt", -1)
-    teachers = [teacher_doc_to_response(d) for d in cursor]
-    return jsonify({"teachers": teachers})
+    """List all teachers. Conditional GET: the ETag follows the teachers version."""
+
+    def build():
+        cursor = get_teachers_collection().find().sort("createdAt", -1)
+        return {"teachers": [teacher_doc_to_response(d) for d in cursor]}
+
+    return versioned_json("teachers", (), build)
 
 
 @teachers_bp.route("", methods=["POST"])
@@ -42,6 +46,7 @@ def create_teacher():
     password_hash = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
     doc = teacher_schema(name, email, password_hash)
     result = coll.insert_one(doc)
+    bump("teachers")
     doc["_id"] = result.inserted_id
 
     return jsonify(teacher_doc_to_response(doc)), 201
@@ -99,6 +104,7 @@ def update_teacher(teacher_id):
     )
     if result.matched_count == 0:
         return jsonify({"error": "Teacher not found"}), 404
+    bump("teachers")
 
     doc = coll.find_one({"_id": oid})
     return jsonify(teacher_doc_to_response(doc))
@@ -1,23 +1,23 @@
-import os
-
 from flask import Blueprint, jsonify
 
 from app.config import Config
-from app.services.train_service import train_model
 
 train_bp = Blueprint("train", __name__, url_prefix="/api")
 
 
 @train_bp.route("/train/status", methods=["GET"])
 def train_status():
-    """Check if model is trained (Trainner.yml exists)."""
-    path = os.path.join(Config.TRAINING_LABEL_PATH, "Trainner.yml")
-    return jsonify({"trained": os.path.isfile(path)})
+    """Check if the configured engine's model is trained (Trainner.yml or sface_index.npz exists)."""
+    from app.services.recognizers import create_engine  # OpenCV is loaded on first use, not at startup
+
+    return jsonify({"trained": create_engine().is_trained(), "engine": Config.RECOGNIZER_ENGINE})
 
 
 @train_bp.route("/train", methods=["POST"])
 def train_model_endpoint():
-    """Train LBPH face recognition model on TrainingImage folder."""
+    """Train the face recognition model (RECOGNIZER_ENGINE) on the face store."""
+    from app.services.train_service import train_model
+
     try:
         result = train_model()
         return jsonify(result), 200
@@ -1,92 +1,270 @@
 """
 Attendance service: auto (face recognition) and manual recording.
+OpenCV and the recognition modules are imported inside the functions that use them, so
+listing/export (also used by the async routes) and manual recording never load cv2 or NumPy.
 """
-import base64
+import hashlib
 import json
 import os
+import threading
 from datetime import datetime
 
-import cv2
-import numpy as np
-
 from app.config import Config
 from app.database import get_students_collection, get_attendance_collection
-from app.models.attendance import attendance_schema, attendance_doc_to_response
-from app.services.face_image_service import save_attendance_face_crop
+from app.models.attendance import DEFAULT_TYPE, attendance_schema, attendance_doc_to_response
+from app.services.collection_versions import bump
+from app.services.recognition_pool import get_recognition_pool
+from app.utils.cache import TTLCache
 
-CONFIDENCE_THRESHOLD = 80  # Lower conf = better match; accept up to 80 (was 70)
-_model_path = None
-_recognizer = None
-_detector = None
+_engine = None  # RecognizerEngine (lbph | sface), see recognizers
 _id_to_enrollment = None
-_labels_path = None
+_labels_mtime = None
+_removed = frozenset()  # enrollments masked out of the model (removed_labels.json)
+_removed_mtime = None
+_results = None  # TTLCache: request key -> (fingerprint, outcome) for retried auto submissions
+_inflight = {}  # request key -> threading.Event while the first submission is running
+_inflight_lock = threading.Lock()
+
+
+class UnrecognizedFrameError(ValueError):
+    """A valid frame that yields no attendance (no face, or no face recognized)."""
 
 
 def _load_recognizer():
-    global _recognizer, _model_path, _id_to_enrollment, _labels_path
-    path = os.path.join(Config.TRAINING_LABEL_PATH, "Trainner.yml")
-    if not os.path.exists(path):
-        raise ValueError("Model not found. Train the model first via POST /api/train")
-    if _recognizer is None or _model_path != path:
-        _recognizer = cv2.face.LBPHFaceRecognizer_create()
-        _recognizer.read(path)
-        _model_path = path
-        _id_to_enrollment = None
-        _labels_path = os.path.join(Config.TRAINING_LABEL_PATH, "id_to_enrollment.json")
-    return _recognizer
+    """The configured recognizer engine with its current model loaded (reloaded after training)."""
+    global _engine, _id_to_enrollment
+    if _engine is None:
+        from app.services.recognizers import create_engine
 
+        _engine = create_engine()
+    if _engine.load():
+        _id_to_enrollment = None  # labels are rewritten together with the model
+    return _engine
 
-def _predicted_id_to_enrollment(predicted_id: int) -> str:
-    """Map LBPH predicted label id to enrollment string (from id_to_enrollment.json if present)."""
-    global _id_to_enrollment, _labels_path
-    if _labels_path is None:
-        _labels_path = os.path.join(Config.TRAINING_LABEL_PATH, "id_to_enrollment.json")
-    if _id_to_enrollment is None and os.path.exists(_labels_path):
-        with open(_labels_path) as f:
+
+def _labels() -> list:
+    """
+    id_to_enrollment.json: label id -> enrollment string (empty if missing). Reloaded when its
+    mtime changes: train_model replaces it right after the model, so a worker that reloaded the
+    new model a moment earlier picks up the matching labels on its next frame.
+    """
+    global _id_to_enrollment, _labels_mtime
+    path = os.path.join(Config.TRAINING_LABEL_PATH, "id_to_enrollment.json")
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        _id_to_enrollment, _labels_mtime = None, None
+        return []
+    if _id_to_enrollment is None or mtime != _labels_mtime:
+        with open(path) as f:
             _id_to_enrollment = json.load(f)
-    if _id_to_enrollment is not None and 0 <= predicted_id < len(_id_to_enrollment):
-        return str(_id_to_enrollment[predicted_id])
+        _labels_mtime = mtime
+    return _id_to_enrollment
+
+
+def _predicted_id_to_enrollment(predicted_id: int) -> str:
+    """Map predicted label id to enrollment string (from id_to_enrollment.json if present)."""
+    labels = _labels()
+    if 0 <= predicted_id < len(labels):
+        return str(labels[predicted_id])
     return str(predicted_id)
 
 
-def _load_detector():
-    global _detector
-    if _detector is None:
-        _detector = cv2.CascadeClassifier(Config.HAARCASCADE_PATH)
-        if _detector.empty():
-            raise RuntimeError("Haarcascade file not found or invalid")
-    return _detector
+def _load_removed_labels() -> frozenset:
+    """
+    Enrollments deleted since the model was trained. train_service.remove_student_from_model
+    rewrites the file; the mtime check lets every worker process pick it up on the next frame.
+    """
+    global _removed, _removed_mtime
+    path = os.path.join(Config.TRAINING_LABEL_PATH, "removed_labels.json")
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        _removed, _removed_mtime = frozenset(), None
+        return _removed
+    if mtime != _removed_mtime:
+        with open(path) as f:
+            _removed = frozenset(str(e) for e in json.load(f))
+        _removed_mtime = mtime
+    return _removed
 
 
-def recognize_face_and_record(image_base64: str, subject: str) -> dict:
+def _excluded_labels(removed: frozenset) -> frozenset:
+    """Label ids of masked enrollments."""
+    if not removed:
+        return frozenset()
+    return frozenset(i for i, e in enumerate(_labels()) if str(e) in removed)
+
+
+def recognize_image(image_base64: str) -> list:
     """
-    Decode image, detect all faces, recognize each via LBPH, record attendance for each.
-    Supports multiple students in the same frame.
-    Returns: { records: [...], count: N } where each record has enrollment, name, subject, date, time, id.
-    Raises: ValueError on invalid input, no face, or when no face could be recognized.
+    CPU-bound part of auto attendance: decode, detect and predict. No database access,
+    so it can run inside a recognition worker process.
+    Returns accepted matches: [{ enrollment, confidence, face, faceSize }] in detection order
+    (confidence is the engine's score: LBPH distance or SFace cosine similarity; face is the
+    normalized grayscale crop, kept for continuous learning; faceSize is the detected box
+    size in the original frame).
+    Raises: ValueError on invalid image, no face, or missing model.
+    """
+    import cv2
+
+    from app.utils.images import decode_base64_image
+
+    return recognize_gray(decode_base64_image(image_base64, cv2.IMREAD_GRAYSCALE))
+
+
+def recognize_gray(gray) -> list:
+    """Detect and predict on a decoded grayscale frame. See recognize_image."""
+    from app.services.detectors import get_detector
+    from app.utils.images import normalize_face
+
+    detector = get_detector()
+    faces = detector.detect(gray)
+
+    if len(faces) == 0:
+        raise UnrecognizedFrameError("No face detected")
+
+    engine = _load_recognizer()
+    excluded = _excluded_labels(_load_removed_labels())
+    matches = []
+    for (x, y, w, h) in faces:
+        face = normalize_face(gray, (x, y, w, h))
+        enrollment_int, conf = engine.predict(face, excluded)
+        if not engine.accepts(conf):
+            continue  # skip unrecognized face
+        matches.append({
+            "enrollment": _predicted_id_to_enrollment(enrollment_int),
+            "confidence": float(conf),
+            "face": face,
+            "faceSize": int(min(w, h)),
+        })
+    return matches
+
+
+def _get_result_cache():
+    """Shared auto-attendance outcome cache, or None when IDEMPOTENCY_CACHE_SIZE is 0."""
+    global _results
+    if Config.IDEMPOTENCY_CACHE_SIZE <= 0:
+        return None
+    if _results is None:
+        with _inflight_lock:
+            if _results is None:
+                _results = TTLCache(Config.IDEMPOTENCY_CACHE_SIZE, Config.IDEMPOTENCY_TTL_SECONDS)
+    return _results
+
+
+def _replay(outcome, replayed: bool) -> dict:
+    kind, value = outcome
+    if kind == "error":
+        raise UnrecognizedFrameError(value)
+    return {**value, "replayed": True} if replayed else value
+
+
+def _run_once(cache, key, fingerprint, compute) -> dict:
+    """
+    Run compute() once per key while its outcome is cached. Retries that arrive while the
+    first request is still running wait for it instead of recomputing. Successes and scene
+    outcomes (UnrecognizedFrameError: no face, not recognized) are cached. Other errors
+    (missing model, invalid image, busy pool) are not, so a retry after POST /api/train or
+    with a fixed image is recognized afresh.
+    """
+    while True:
+        hit = cache.get(key)
+        if hit is not None:
+            cached_fingerprint, outcome = hit
+            if cached_fingerprint != fingerprint:
+                raise ValueError("Idempotency key was already used for a different image or subject")
+            return _replay(outcome, replayed=True)
+        with _inflight_lock:
+            event = _inflight.get(key)
+            owner = event is None
+            if owner:
+                event = _inflight[key] = threading.Event()
+        if owner:
+            break
+        if not event.wait(timeout=Config.RECOGNITION_TIMEOUT_SECONDS):
+            return compute()
+
+    try:
+        try:
+            outcome = ("ok", compute())
+        except UnrecognizedFrameError as e:
+            outcome = ("error", str(e))
+        cache.set(key, (fingerprint, outcome))
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        event.set()
+    return _replay(outcome, replayed=False)
+
+
+def recognize_face_and_record(
+    image_base64: str,
+    subject: str,
+    camera: str = None,
+    idempotency_key: str = None,
+) -> dict:
+    """
+    Record auto attendance for a frame, at most once per idempotency key (or, without one,
+    per subject + payload hash) within IDEMPOTENCY_TTL_SECONDS. Retries get the original
+    outcome, with "replayed": true, without recognition or database writes.
+    See _recognize_gated for the rest.
     """
     if not image_base64 or not subject:
         raise ValueError("image (base64) and subject required")
 
+    cache = _get_result_cache()
+    if cache is None:
+        return _recognize_gated(image_base64, subject, camera)
+    fingerprint = (subject.strip(), hashlib.sha256(image_base64.encode("utf-8")).hexdigest())
+    key = ("key", idempotency_key) if idempotency_key else ("payload",) + fingerprint
+    return _run_once(cache, key, fingerprint, lambda: _recognize_gated(image_base64, subject, camera))
+
+
+def _recognize_gated(image_base64: str, subject: str, camera: str = None) -> dict:
+    """
+    Decode image, detect all faces, recognize each via LBPH, record attendance for each.
+    Supports multiple students in the same frame. Recognition runs in the worker pool
+    when RECOGNITION_WORKERS > 0, otherwise inline in the request thread.
+    With a camera id, frames that show the same scene as that camera's last recognized frame
+    return the cached outcome (with "cached": true) without detection or recognition.
+    Returns: { records: [...], count: N } where each record has enrollment, name, subject, date, time, id.
+    Raises: ValueError on invalid input, no face, or when no face could be recognized;
+            RecognitionBusyError when the worker pool queue is full.
+    """
+    from app.services.frame_gate import get_frame_gate, thumbnail
+
+    gate = get_frame_gate() if camera else None
+    if gate is None:
+        return _recognize_and_record(image_base64, subject)
+
+    key = (camera, subject.strip())
+    try:
+        thumb = thumbnail(image_base64)
+    except ValueError:
+        return _recognize_and_record(image_base64, subject)  # reports the bad image
+    cached = gate.lookup(key, thumb)
+    if cached is not None:
+        kind, value = cached
+        if kind == "error":
+            raise UnrecognizedFrameError(value)
+        return {**value, "cached": True}
     try:
-        if "," in image_base64:
-            image_base64 = image_base64.split(",", 1)[1]
-        img_bytes = base64.b64decode(image_base64)
-        nparr = np.frombuffer(img_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        if img is None:
-            raise ValueError("Invalid image data")
-    except Exception as e:
-        raise ValueError(f"Invalid base64 image: {e}") from e
-
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    detector = _load_detector()
-    faces = detector.detectMultiScale(gray, 1.2, 5)
+        result = _recognize_and_record(image_base64, subject)
+    except UnrecognizedFrameError as e:
+        # Only outcomes of the scene itself: "Model not found" and the like must not outlive a retrain
+        gate.store(key, thumb, ("error", str(e)))
+        raise
+    gate.store(key, thumb, ("ok", result))
+    return result
 
-    if len(faces) == 0:
-        raise ValueError("No face detected")
 
-    recognizer = _load_recognizer()
+def _recognize_and_record(image_base64: str, subject: str) -> dict:
+    from app.services.face_image_service import save_attendance_face_crop
+
+    pool = get_recognition_pool()
+    matches = pool.run(image_base64) if pool else recognize_image(image_base64)
+
     coll = get_students_collection()
     coll_att = get_attendance_collection()
     ts = datetime.utcnow()
@@ -113,13 +291,8 @@ def recognize_face_and_record(image_base64: str, subject: str) -> dict:
             upsert=True,
         )
 
-    for (x, y, w, h) in faces:
-        enrollment_int, conf = recognizer.predict(gray[y : y + h, x : x + w])
-
-        if conf >= CONFIDENCE_THRESHOLD:
-            continue  # skip unrecognized face
-
-        enrollment = _predicted_id_to_enrollment(enrollment_int)
+    for match in matches:
+        enrollment = match["enrollment"]
         if enrollment in recorded_enrollments:
             continue  # already recorded this student in this capture
 
@@ -131,16 +304,21 @@ def recognize_face_and_record(image_base64: str, subject: str) -> dict:
         recorded_enrollments.add(enrollment)
 
         # Continuous learning: save face crop for future retraining (if enabled and under limit)
-        face_roi = gray[y : y + h, x : x + w]
+        face_roi = match["face"]
         count_today = _get_saved_today_count(enrollment)
         max_per_day = getattr(Config, "MAX_ATTENDANCE_FACES_PER_STUDENT_PER_DAY", 2)
-        if count_today < max_per_day and save_attendance_face_crop(enrollment, name, face_roi):
+        if (
+            count_today < max_per_day
+            and match["faceSize"] >= Config.MIN_FACE_SIZE
+            and save_attendance_face_crop(enrollment, name, face_roi)
+        ):
             _inc_saved_today(enrollment)
             new_count = student.get("imageCount", 0) + 1
             coll.update_one(
                 {"enrollment": enrollment},
                 {"$set": {"imageCount": new_count, "updatedAt": ts}},
             )
+            bump("students")  # imageCount is part of the students list
 
         existing = coll_att.find_one({
             "enrollment": enrollment,
@@ -164,7 +342,7 @@ def recognize_face_and_record(image_base64: str, subject: str) -> dict:
         records.append(attendance_doc_to_response(doc))
 
     if len(records) == 0:
-        raise ValueError(
+        raise UnrecognizedFrameError(
             "No face recognized. Ensure students are trained and face the camera clearly."
         )
 
@@ -187,17 +365,14 @@ def record_manual(enrollment: str, name: str, subject: str, date: str = None, ti
     return attendance_doc_to_response(doc)
 
 
-def list_attendance(
+def build_attendance_query(
     subject: str = None,
     date: str = None,
     enrollment: str = None,
     date_from: str = None,
     date_to: str = None,
-    skip: int = 0,
-    limit: int = 100,
-):
-    """List attendance records with optional filters."""
-    coll = get_attendance_collection()
+) -> dict:
+    """Build the Mongo filter for attendance listing/export."""
     query = {}
     if subject:
         query["subject"] = subject.strip()
@@ -212,6 +387,21 @@ def list_attendance(
             query["date"] = {"$lte": date_to.strip()}
     elif date:
         query["date"] = date.strip()
+    return query
+
+
+def list_attendance(
+    subject: str = None,
+    date: str = None,
+    enrollment: str = None,
+    date_from: str = None,
+    date_to: str = None,
+    skip: int = 0,
+    limit: int = 100,
+):
+    """List attendance records with optional filters."""
+    coll = get_attendance_collection()
+    query = build_attendance_query(subject, date, enrollment, date_from, date_to)
 
     total = coll.count_documents(query)
     cursor = coll.find(query).sort("date", -1).sort("createdAt", -1).skip(skip).limit(limit)
@@ -220,6 +410,26 @@ def list_attendance(
     return {"attendance": records, "total": total, "skip": skip, "limit": limit}
 
 
+def attendance_records_to_csv(records: list) -> str:
+    """Render attendance response dicts as CSV text."""
+    import csv
+    import io
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["Enrollment", "Name", "Subject", "Date", "Time", "Type"])
+    for r in records:
+        writer.writerow([
+            r.get("enrollment", ""),
+            r.get("name", ""),
+            r.get("subject", ""),
+            r.get("date", ""),
+            r.get("time", ""),
+            r.get("type", DEFAULT_TYPE),
+        ])
+    return output.getvalue()
+
+
 def export_attendance_csv(
     subject: str = None,
     date: str = None,
@@ -229,9 +439,6 @@ def export_attendance_csv(
     limit: int = 5000,
 ) -> str:
     """Export attendance records as CSV string."""
-    import csv
-    import io
-
     result = list_attendance(
         subject=subject,
         date=date,
@@ -241,16 +448,4 @@ def export_attendance_csv(
         skip=0,
         limit=limit,
     )
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Enrollment", "Name", "Subject", "Date", "Time", "Type"])
-    for r in result["attendance"]:
-        writer.writerow([
-            r.get("enrollment", ""),
-            r.get("name", ""),
-            r.get("subject", ""),
-            r.get("date", ""),
-            r.get("time", ""),
-            r.get("type", "auto"),
-        ])
-    return output.getvalue()
+    return attendance_records_to_csv(result["attendance"])
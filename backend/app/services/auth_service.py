@@ -10,7 +10,7 @@ from app.config import Config
 from app.database import get_students_collection, get_teachers_collection
 
 
-def _verify_password(plain: str, hashed: str) -> bool:
+def verify_password(plain: str, hashed: str) -> bool:
     try:
         return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
     except Exception:
@@ -23,11 +23,13 @@ def _create_token(payload: dict) -> str:
     return jwt.encode(payload, Config.JWT_SECRET, algorithm="HS256")
 
 
-def login_student(email: str, password: str) -> dict | None:
-    coll = get_students_collection()
-    doc = coll.find_one({"email": email.strip().lower()})
-    if not doc or not _verify_password(password, doc["passwordHash"]):
-        return None
+def decode_token(token: str) -> dict:
+    """Payload of a token issued by _create_token. Raises jwt.InvalidTokenError if invalid or expired."""
+    return jwt.decode(token, Config.JWT_SECRET, algorithms=["HS256"])
+
+
+def student_session(doc: dict) -> dict:
+    """Token + user payload for an authenticated student document."""
     return {
         "token": _create_token({
             "sub": str(doc["_id"]),
@@ -46,11 +48,8 @@ def login_student(email: str, password: str) -> dict | None:
     }
 
 
-def login_teacher(email: str, password: str) -> dict | None:
-    coll = get_teachers_collection()
-    doc = coll.find_one({"email": email.strip().lower()})
-    if not doc or not _verify_password(password, doc["passwordHash"]):
-        return None
+def teacher_session(doc: dict) -> dict:
+    """Token + user payload for an authenticated teacher document."""
     return {
         "token": _create_token({
             "sub": str(doc["_id"]),
@@ -68,6 +67,22 @@ def login_teacher(email: str, password: str) -> dict | None:
     }
 
 
+def login_student(email: str, password: str) -> dict | None:
+    coll = get_students_collection()
+    doc = coll.find_one({"email": email.strip().lower()})
+    if not doc or not verify_password(password, doc["passwordHash"]):
+        return None
+    return student_session(doc)
+
+
+def login_teacher(email: str, password: str) -> dict | None:
+    coll = get_teachers_collection()
+    doc = coll.find_one({"email": email.strip().lower()})
+    if not doc or not verify_password(password, doc["passwordHash"]):
+        return None
+    return teacher_session(doc)
+
+
 def login_admin(email: str, password: str) -> dict | None:
     admin_email = Config.ADMIN_EMAIL
     admin_password = Config.ADMIN_PASSWORD
@@ -0,0 +1,265 @@
+"""
+Offline attendance from recordings: a lecture video or a folder of photos.
+Every `stride`-th frame is sampled (skipped video frames are grabbed, not colour-converted),
+recognized across a process pool that uses the live recognition pool's worker initializer,
+and identities are aggregated over the whole recording. A student counts as present after
+being recognized in BATCH_MIN_FRAMES sampled frames; attendance is then written with one
+unordered bulk upsert per (enrollment, subject, date), so re-running a recording is safe.
+
+API jobs run in a background thread (one at a time per process) and keep their status in
+the batch_jobs collection, so any server process can answer GET /api/attendance/batch/<id>.
+"""
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import cv2
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+
+from app.config import Config
+from app.database import get_attendance_collection, get_db, get_students_collection
+from app.models.attendance import attendance_schema
+from app.services.face_store import IMAGE_EXTENSIONS
+from app.services.recognition_pool import _worker_init
+from app.services.recognizers import create_engine
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+
+_job_slots = threading.Semaphore(1)  # batch jobs use every core; run them one at a time
+
+
+def _sample_video(path: str, stride: int):
+    """Yield (frame_index, seconds or None, gray) for every stride-th frame."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"Cannot open video: {os.path.basename(path)}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0
+    index = 0
+    try:
+        while True:
+            if index % stride:
+                if not cap.grab():
+                    break
+            else:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                yield index, (index / fps if fps else None), cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            index += 1
+    finally:
+        cap.release()
+
+
+def _sample_folder(path: str, stride: int):
+    """Yield (index, None, image path) for every stride-th image; workers decode in parallel."""
+    names = sorted(f for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS))
+    for index, name in enumerate(names[::stride]):
+        yield index * stride, None, os.path.join(path, name)
+
+
+def sample_frames(source: str, stride: int):
+    if os.path.isdir(source):
+        return _sample_folder(source, stride)
+    if os.path.isfile(source) and source.lower().endswith(VIDEO_EXTENSIONS):
+        return _sample_video(source, stride)
+    raise ValueError("source must be a video file or a folder of images")
+
+
+def _recognize_frame(frame) -> list:
+    """Worker: [(enrollment, confidence)] for one frame (gray array or image path); None if unreadable."""
+    from app.services.attendance_service import UnrecognizedFrameError, recognize_gray
+
+    if isinstance(frame, str):
+        frame = cv2.imread(frame, cv2.IMREAD_GRAYSCALE)
+        if frame is None:
+            return None
+    try:
+        matches = recognize_gray(frame)
+    except UnrecognizedFrameError:
+        return []  # no face in this frame; model errors fail the job
+    return [(m["enrollment"], m["confidence"]) for m in matches]
+
+
+def process_recording(source: str, stride: int = None, workers: int = None, progress=None) -> dict:
+    """
+    Recognize sampled frames of a recording. progress(stats) is called about once a second.
+    Returns { framesSampled, framesUnreadable, framesWithMatches, seconds, fps, seen: {enrollment: {...}} }.
+    """
+    if not create_engine().is_trained():
+        raise ValueError("Model not found. Train the model first via POST /api/train")
+    stride = max(1, stride or Config.BATCH_FRAME_STRIDE)
+    workers = workers or Config.BATCH_WORKERS or os.cpu_count() or 1
+    frames = sample_frames(source, stride)
+
+    stats = {"framesSampled": 0, "framesUnreadable": 0, "framesWithMatches": 0}
+    seen = {}  # enrollment -> {frames, firstFrame, firstSeconds, meanConfidence}
+    started = time.perf_counter()
+    last_report = started
+
+    def collect(item):
+        nonlocal last_report
+        index, seconds, future = item
+        result = future.result()
+        stats["framesSampled"] += 1
+        if result is None:
+            stats["framesUnreadable"] += 1
+        elif result:
+            stats["framesWithMatches"] += 1
+        for enrollment, confidence in result or ():
+            entry = seen.setdefault(enrollment, {
+                "frames": 0, "firstFrame": index, "firstSeconds": seconds, "confidences": [],
+            })
+            entry["frames"] += 1
+            entry["confidences"].append(confidence)
+        now = time.perf_counter()
+        if progress and now - last_report >= 1:
+            last_report = now
+            progress({**stats, "fps": round(stats["framesSampled"] / (now - started), 1)})
+
+    # spawn: never fork a multi-threaded web server process
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=_worker_init
+    ) as executor:
+        pending = deque()
+        for index, seconds, frame in frames:
+            pending.append((index, seconds, executor.submit(_recognize_frame, frame)))
+            if len(pending) >= workers * 4:  # bound memory: decoded frames wait in the queue
+                collect(pending.popleft())
+        while pending:
+            collect(pending.popleft())
+
+    elapsed = time.perf_counter() - started
+    for entry in seen.values():
+        confidences = entry.pop("confidences")
+        entry["meanConfidence"] = round(sum(confidences) / len(confidences), 2)
+    return {
+        **stats,
+        "stride": stride,
+        "workers": workers,
+        "seconds": round(elapsed, 2),
+        "fps": round(stats["framesSampled"] / elapsed, 1) if elapsed else 0.0,
+        "seen": seen,
+    }
+
+
+def record_recording(seen: dict, subject: str, date: str, start_time: str, min_frames: int) -> dict:
+    """Bulk-upsert attendance for students seen in at least min_frames sampled frames."""
+    present = {e: s for e, s in seen.items() if s["frames"] >= min_frames}
+    totals = {"present": len(present), "belowMinFrames": len(seen) - len(present), "inserted": 0, "existing": 0, "unknown": 0}
+    if not present:
+        return totals
+    names = {
+        d["enrollment"]: d.get("name", "")
+        for d in get_students_collection().find({"enrollment": {"$in": list(present)}}, {"enrollment": 1, "name": 1})
+    }
+    start = datetime.strptime(start_time, "%H:%M:%S")
+    ops = []
+    for enrollment, s in sorted(present.items()):
+        if enrollment not in names:
+            totals["unknown"] += 1  # deleted since the model was trained
+            continue
+        seen_at = start + timedelta(seconds=s["firstSeconds"] or 0)
+        doc = attendance_schema(enrollment, names[enrollment], subject, date, seen_at.strftime("%H:%M:%S"), "auto")
+        ops.append(UpdateOne({"enrollment": enrollment, "subject": subject, "date": date}, {"$setOnInsert": doc}, upsert=True))
+    if ops:
+        result = get_attendance_collection().bulk_write(ops, ordered=False)
+        totals["inserted"] = result.upserted_count
+        totals["existing"] = len(ops) - result.upserted_count
+    return totals
+
+
+def run_batch(
+    source: str,
+    subject: str,
+    stride: int = None,
+    date: str = None,
+    start_time: str = None,
+    workers: int = None,
+    min_frames: int = None,
+    dry_run: bool = False,
+    progress=None,
+) -> dict:
+    """
+    Recognize a recording and record attendance. date defaults to today, start_time (when the
+    recording started, HH:MM:SS) to now; each student's time is start_time + first sighting.
+    Raises: ValueError on bad input or missing model.
+    """
+    subject = (subject or "").strip()
+    if not subject:
+        raise ValueError("subject required")
+    now = datetime.utcnow()
+    date = date or now.strftime("%Y-%m-%d")
+    start_time = start_time or now.strftime("%H:%M:%S")
+    try:
+        datetime.strptime(date, "%Y-%m-%d")
+        datetime.strptime(start_time, "%H:%M:%S")
+    except ValueError:
+        raise ValueError("date must be YYYY-MM-DD and startTime HH:MM:SS")
+
+    report = process_recording(source, stride, workers, progress)
+    min_frames = min_frames or Config.BATCH_MIN_FRAMES
+    min_frames = max(1, min(min_frames, report["framesSampled"]))
+    report.update({"subject": subject, "date": date, "minFrames": min_frames})
+    if not dry_run:
+        report["attendance"] = record_recording(report["seen"], subject, date, start_time, min_frames)
+    return report
+
+
+def _jobs():
+    return get_db()["batch_jobs"]
+
+
+def start_batch_job(source: str, subject: str, cleanup_dir: str = None, **options) -> str:
+    """Run run_batch in a background thread and return the job id. cleanup_dir (the upload) is deleted afterwards."""
+    job_id = _jobs().insert_one({
+        "status": "queued",
+        "subject": subject,
+        "options": options,
+        "createdAt": datetime.utcnow(),
+    }).inserted_id
+
+    def update(fields):
+        _jobs().update_one({"_id": job_id}, {"$set": fields})
+
+    def run():
+        with _job_slots:
+            update({"status": "running", "startedAt": datetime.utcnow()})
+            try:
+                report = run_batch(source, subject, progress=lambda p: update({"progress": p}), **options)
+                update({"status": "done", "result": report, "finishedAt": datetime.utcnow()})
+            except Exception as e:
+                update({"status": "error", "error": str(e), "finishedAt": datetime.utcnow()})
+            finally:
+                if cleanup_dir:
+                    shutil.rmtree(cleanup_dir, ignore_errors=True)
+
+    threading.Thread(target=run, name=f"batch-{job_id}", daemon=True).start()
+    return str(job_id)
+
+
+def get_batch_job(job_id: str) -> dict:
+    """Job status for the API, or None if unknown."""
+    try:
+        doc = _jobs().find_one({"_id": ObjectId(job_id)})
+    except InvalidId:
+        return None
+    if not doc:
+        return None
+    out = {
+        "id": str(doc["_id"]),
+        "status": doc["status"],
+        "subject": doc.get("subject"),
+        "progress": doc.get("progress"),
+        "result": doc.get("result"),
+        "error": doc.get("error"),
+    }
+    for key in ("createdAt", "startedAt", "finishedAt"):
+        out[key] = doc[key].isoformat() if doc.get(key) else None
+    return out
@@ -0,0 +1,108 @@
+"""
+Per-collection version counters for conditional GET on read-mostly lists
+(students, teachers, subjects).
+
+Every write to a versioned collection calls bump(name), which increments its counter in the
+collection_versions collection ({ _id: name, version, updatedAt }). List routes derive their
+ETag from the counter (see app.utils.http_cache): a 304 costs one point read
+of the counter, or nothing while the value is cached in this process
+(COLLECTION_VERSION_TTL_SECONDS). Bumps from this process update that cache at once; bumps
+from other server processes are seen within the TTL.
+
+Serialized list bodies are cached per (collection, version, variant), so a new version
+simply stops matching old entries.
+"""
+import threading
+import time
+
+from pymongo import ReturnDocument
+
+from app.config import Config
+from app.utils.cache import TTLCache
+
+VERSIONED = ("students", "teachers", "subjects")
+VERSIONS_COLLECTION = "collection_versions"
+
+_versions = {}  # name -> (checked_at monotonic, version, updated_at)
+_versions_lock = threading.Lock()
+_bodies = None  # TTLCache: (name, version, variant) -> serialized body
+_bodies_lock = threading.Lock()
+
+
+def _remember(name: str, doc: dict):
+    version = (doc or {}).get("version", 0)
+    updated_at = (doc or {}).get("updatedAt")
+    with _versions_lock:
+        _versions[name] = (time.monotonic(), version, updated_at)
+    return version, updated_at
+
+
+def _fresh(name: str):
+    cached = _versions.get(name)
+    if cached is not None and time.monotonic() - cached[0] < Config.COLLECTION_VERSION_TTL_SECONDS:
+        return cached[1], cached[2]
+    return None
+
+
+def bump(name: str) -> int:
+    """Mark a collection as changed (call after every successful write). Returns the new version."""
+    from app.database import get_db
+
+    doc = get_db()[VERSIONS_COLLECTION].find_one_and_update(
+        {"_id": name},
+        {"$inc": {"version": 1}, "$currentDate": {"updatedAt": True}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return _remember(name, doc)[0]
+
+
+def current(name: str):
+    """(version, updatedAt or None) of a collection; version 0 if it was never bumped."""
+    fresh = _fresh(name)
+    if fresh is not None:
+        return fresh
+    from app.database import get_db
+
+    return _remember(name, get_db()[VERSIONS_COLLECTION].find_one({"_id": name}))
+
+
+async def current_async(name: str):
+    """current() on the async driver (ASGI serving mode)."""
+    fresh = _fresh(name)
+    if fresh is not None:
+        return fresh
+    from app.async_database import get_async_db
+
+    return _remember(name, await get_async_db()[VERSIONS_COLLECTION].find_one({"_id": name}))
+
+
+def _get_body_cache():
+    global _bodies
+    if _bodies is None:
+        with _bodies_lock:
+            if _bodies is None:
+                _bodies = TTLCache(Config.RESPONSE_CACHE_SIZE, Config.RESPONSE_CACHE_TTL_SECONDS)
+    return _bodies
+
+
+def cached_body(name: str, version: int, variant, build):
+    """Serialized body for (collection, version, variant); build() runs only on a miss."""
+    cache = _get_body_cache()
+    key = (name, version, variant)
+    body = cache.get(key)
+    if body is None:
+        body = build()
+        cache.set(key, body)
+    return body
+
+
+async def cached_body_async(name: str, version: int, variant, build):
+    """cached_body() with an async build()."""
+    cache = _get_body_cache()
+    key = (name, version, variant)
+    body = cache.get(key)
+    if body is None:
+        body = await build()
+        cache.set(key, body)
+    return body
@@ -0,0 +1,140 @@
+"""
+Face detector backends behind one interface: detect(gray) -> [(x, y, w, h), ...].
+
+- haar_default: haarcascade_frontalface_default.xml (the original detector)
+- haar_alt:     haarcascade_frontalface_alt.xml (fewer false positives, usually a little slower)
+- lbp:          lbpcascade_frontalface_improved.xml (integer features, usually the fastest)
+- yunet:        OpenCV's YuNet CNN (cv2.FaceDetectorYN, OpenCV >= 4.8) from a local ONNX file;
+                best recall on turned/tilted faces
+
+Select with FACE_DETECTOR; cascades share DETECT_SCALE_FACTOR / DETECT_MIN_NEIGHBORS, and
+every backend honours DETECT_MIN_SIZE / DETECT_DOWNSCALE. All of these can come from a tuned
+profile (DETECTOR_PROFILE_PATH, written by scripts/autotune_detector.py).
+Compare backends on stored samples with scripts/benchmark_detectors.py.
+"""
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from app.config import Config
+
+DETECTORS = ("haar_default", "haar_alt", "lbp", "yunet")
+
+
+class FaceDetector:
+    """
+    detect() optionally runs on a downscaled copy of the frame (downscale < 1; fewer pixels
+    and pyramid levels) and maps boxes back to full-frame coordinates; faces smaller than
+    min_size full-frame pixels are ignored.
+    """
+    name = "base"
+
+    def __init__(self, min_size: int = None, downscale: float = None):
+        self.min_size = min_size if min_size is not None else Config.DETECT_MIN_SIZE
+        self.downscale = downscale or Config.DETECT_DOWNSCALE
+
+    def detect(self, gray: np.ndarray) -> list:
+        """Face boxes (x, y, w, h) in a grayscale image."""
+        scale = self.downscale if 0 < self.downscale < 1 else 1.0
+        small = gray if scale == 1.0 else cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        boxes = self._detect(small, int(self.min_size * scale))
+        if scale != 1.0:
+            boxes = [tuple(int(round(v / scale)) for v in b) for b in boxes]
+        return boxes
+
+    def _detect(self, gray: np.ndarray, min_size: int) -> list:
+        raise NotImplementedError
+
+
+class CascadeDetector(FaceDetector):
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        scale_factor: float = None,
+        min_neighbors: int = None,
+        min_size: int = None,
+        downscale: float = None,
+    ):
+        super().__init__(min_size, downscale)
+        self.name = name
+        self.path = path
+        self.scale_factor = scale_factor or Config.DETECT_SCALE_FACTOR
+        self.min_neighbors = min_neighbors if min_neighbors is not None else Config.DETECT_MIN_NEIGHBORS
+        self._cascade = cv2.CascadeClassifier(path)
+        if self._cascade.empty():
+            raise RuntimeError(f"Cascade file not found or invalid: {path}")
+
+    def _detect(self, gray: np.ndarray, min_size: int) -> list:
+        size = (min_size, min_size) if min_size > 0 else (0, 0)
+        faces = self._cascade.detectMultiScale(gray, self.scale_factor, self.min_neighbors, minSize=size)
+        return [tuple(int(v) for v in f) for f in faces]
+
+
+class YuNetDetector(FaceDetector):
+    name = "yunet"
+
+    def __init__(self, model_path: str, score_threshold: float = None, min_size: int = None, downscale: float = None):
+        super().__init__(min_size, downscale)
+        if not hasattr(cv2, "FaceDetectorYN"):
+            raise RuntimeError("yunet detector needs OpenCV >= 4.8 (cv2.FaceDetectorYN)")
+        if not os.path.exists(model_path):
+            raise RuntimeError(f"YuNet model not found: {model_path} (see backend/models/README.md)")
+        threshold = score_threshold if score_threshold is not None else Config.YUNET_SCORE_THRESHOLD
+        self._net = cv2.FaceDetectorYN.create(model_path, "", (320, 320), threshold, 0.3, 5000)
+        self._lock = threading.Lock()  # setInputSize + detect mutate the network
+
+    def _detect(self, gray: np.ndarray, min_size: int) -> list:
+        bgr = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        with self._lock:
+            self._net.setInputSize((bgr.shape[1], bgr.shape[0]))
+            _, faces = self._net.detect(bgr)
+        if faces is None:
+            return []
+        h_img, w_img = gray.shape[:2]
+        boxes = []
+        for f in faces:
+            x, y = max(0, int(f[0])), max(0, int(f[1]))
+            w, h = min(int(f[2]), w_img - x), min(int(f[3]), h_img - y)
+            if w > 0 and h > 0 and min(w, h) >= min_size:
+                boxes.append((x, y, w, h))
+        return boxes
+
+
+CASCADE_PATHS = {
+    "haar_default": lambda: Config.HAARCASCADE_PATH,
+    "haar_alt": lambda: Config.HAARCASCADE_ALT_PATH,
+    "lbp": lambda: Config.LBP_CASCADE_PATH,
+}
+
+
+def create_detector(name: str = None, **params) -> FaceDetector:
+    """
+    Build a detector by name (default: FACE_DETECTOR). params override the configured
+    scale_factor, min_neighbors (cascades), min_size and downscale.
+    Raises RuntimeError if its file is missing.
+    """
+    name = (name or Config.FACE_DETECTOR).lower()
+    if name in CASCADE_PATHS:
+        return CascadeDetector(name, CASCADE_PATHS[name](), **params)
+    if name == "yunet":
+        params.pop("scale_factor", None)
+        params.pop("min_neighbors", None)
+        return YuNetDetector(Config.YUNET_MODEL_PATH, **params)
+    raise ValueError(f"Unknown FACE_DETECTOR: {name} (choose from {', '.join(DETECTORS)})")
+
+
+_detector = None
+_detector_lock = threading.Lock()
+
+
+def get_detector() -> FaceDetector:
+    """Shared detector for this process."""
+    global _detector
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                _detector = create_detector()
+    return _detector
@@ -0,0 +1,157 @@
+"""
+Columnar attendance export for analytics: GET /api/attendance/export?format=parquet|arrow.
+The attendance cursor is read in EXPORT_BATCH_SIZE batches; each batch becomes one Arrow
+record batch and is streamed to the client as soon as it is encoded, so memory stays
+bounded by one batch whatever the export size.
+
+Columns are typed: enrollment, name, subject and type are dictionary-encoded strings (a few
+hundred distinct values across millions of rows), date is date32, time is time32[s] and
+createdAt is a UTC timestamp. Parquet (EXPORT_PARQUET_COMPRESSION, zstd by default) is the
+compact file format; arrow is the Arrow IPC stream, which pandas/polars read without parsing.
+
+pyarrow is imported on first use, so the API starts without it.
+"""
+import io
+from datetime import date as date_type, time as time_type
+from functools import lru_cache
+
+from app.config import Config
+from app.database import get_attendance_collection
+from app.models.attendance import DEFAULT_TYPE
+
+FORMATS = ("csv", "parquet", "arrow")
+MIMETYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+EXTENSIONS = {"parquet": "parquet", "arrow": "arrows"}
+_PROJECTION = {"_id": 0, "enrollment": 1, "name": 1, "subject": 1, "date": 1, "time": 1, "type": 1, "createdAt": 1}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet/Arrow export needs pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def _schema(pa):
+    text = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("enrollment", text),
+        ("name", text),
+        ("subject", text),
+        ("date", pa.date32()),
+        ("time", pa.time32("s")),
+        ("type", text),
+        ("createdAt", pa.timestamp("ms", tz="UTC")),
+    ])
+
+
+# Few distinct dates / times repeat across many rows: parse each string once
+@lru_cache(maxsize=4096)
+def _parse_date(value):
+    try:
+        return date_type.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None  # legacy rows with unparseable dates export as null
+
+
+@lru_cache(maxsize=86400)
+def _parse_time(value):
+    try:
+        return time_type.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _record_batch(pa, schema, docs: list):
+    def text(field, default=""):
+        return pa.array([d.get(field, default) for d in docs], pa.string()).dictionary_encode()
+
+    return pa.record_batch([
+        text("enrollment"),
+        text("name"),
+        text("subject"),
+        pa.array([_parse_date(d.get("date")) for d in docs], pa.date32()),
+        pa.array([_parse_time(d.get("time")) for d in docs], pa.time32("s")),
+        text("type", DEFAULT_TYPE),
+        pa.array([d.get("createdAt") for d in docs], pa.timestamp("ms", tz="UTC")),
+    ], schema=schema)
+
+
+def _batches(query: dict, limit: int, batch_size: int):
+    cursor = get_attendance_collection().find(query, _PROJECTION).batch_size(batch_size)
+    if limit:
+        cursor = cursor.limit(limit)
+    docs = []
+    for doc in cursor:
+        docs.append(doc)
+        if len(docs) >= batch_size:
+            yield docs
+            docs = []
+    if docs:
+        yield docs
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the response generator."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_attendance(fmt: str, query: dict, limit: int = None):
+    """
+    Generator of file bytes for a parquet or arrow export of the attendance matching query.
+    limit defaults to (and is capped at) EXPORT_MAX_ROWS; 0 there means no cap.
+    Raises: ValueError on an unknown format; RuntimeError if pyarrow is missing (both before
+    the first chunk, so routes can still return an error status).
+    """
+    if fmt not in MIMETYPES:
+        raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+    pa = _pyarrow()
+    limit, cap = max(0, limit or 0), Config.EXPORT_MAX_ROWS
+    limit = min(limit, cap) if limit and cap else (limit or cap)
+    schema = _schema(pa)
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pa.parquet.ParquetWriter(sink, schema, compression=Config.EXPORT_PARQUET_COMPRESSION)
+    else:
+        # The stream format (unlike the IPC file format) allows new dictionaries per batch
+        writer = pa.ipc.new_stream(sink, schema)
+
+    def generate():
+        try:
+            for docs in _batches(query, limit, Config.EXPORT_BATCH_SIZE):
+                batch = _record_batch(pa, schema, docs)
+                if fmt == "parquet":
+                    writer.write_batch(batch, row_group_size=len(docs))
+                else:
+                    writer.write_batch(batch)
+                yield sink.drain()
+        finally:
+            writer.close()  # Parquet footer / end-of-stream marker
+        yield sink.drain()
+
+    return generate()
@@ -0,0 +1,62 @@
+"""
+Near-duplicate suppression for continuous-learning face crops.
+Each stored sample is summarised by a 64-bit difference hash (dHash). A new crop whose hash
+is within FACE_DEDUP_MAX_DISTANCE bits of one of the student's existing samples adds nothing
+to the LBPH model, so it is not saved. Hashes are kept in memory per student; a student's
+existing samples are read from the face store once, the first time that student is checked.
+"""
+import threading
+
+import cv2
+import numpy as np
+
+from app.config import Config
+from app.services.face_store import get_face_store
+
+_lock = threading.Lock()
+_hashes = {}  # enrollment -> list of 64-bit ints
+
+
+def face_hash(gray: np.ndarray) -> int:
+    """64-bit dHash: compare horizontally adjacent pixels of a 9x8 thumbnail."""
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def _student_hashes(enrollment: str) -> list:
+    """Caller holds _lock. Loads the student's stored samples on first use."""
+    if enrollment not in _hashes:
+        _hashes[enrollment] = [face_hash(img) for img in get_face_store().samples_for(enrollment)]
+    return _hashes[enrollment]
+
+
+def is_near_duplicate(enrollment: str, gray: np.ndarray) -> bool:
+    """
+    True if gray is within FACE_DEDUP_MAX_DISTANCE bits of a stored sample for this student.
+    Otherwise the crop's hash is registered, since the caller is about to save it.
+    """
+    if not Config.FACE_DEDUP_ENABLED:
+        return False
+    h = face_hash(gray)
+    max_distance = Config.FACE_DEDUP_MAX_DISTANCE
+    with _lock:
+        hashes = _student_hashes(enrollment)
+        if any((h ^ other).bit_count() <= max_distance for other in hashes):
+            return True
+        hashes.append(h)
+    return False
+
+
+def register_sample(enrollment: str, gray: np.ndarray):
+    """Record a sample saved through another path (e.g. student upload)."""
+    if not Config.FACE_DEDUP_ENABLED:
+        return
+    h = face_hash(gray)
+    with _lock:
+        _student_hashes(enrollment).append(h)
+
+
+def forget_student(enrollment: str):
+    with _lock:
+        _hashes.pop(enrollment, None)
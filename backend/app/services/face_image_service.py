@@ -1,37 +1,21 @@
 """
 Face image capture & storage.
-- Validates face in image using Haarcascade
-- Saves locally (required for LBPH training)
-- Optionally uploads to Cloudinary for cloud backup
+- Validates face in image using the configured detector (see detectors)
+- Stores the normalized face crop (fixed size, grayscale) rather than the full frame
+- Saves to the face store (required for LBPH training) via the write-behind queue
+- Optionally backs up to Cloudinary (or another CloudBackup) from the same queue
 """
-import base64
 import os
-import re
 
 import cv2
 import numpy as np
 
 from app.config import Config
-
-
-def _ensure_dirs():
-    os.makedirs(Config.TRAINING_IMAGE_PATH, exist_ok=True)
-    os.makedirs(Config.TRAINING_LABEL_PATH, exist_ok=True)
-
-
-def _is_cloudinary_configured():
-    return bool(
-        Config.CLOUDINARY_CLOUD_NAME
-        and Config.CLOUDINARY_API_KEY
-        and Config.CLOUDINARY_API_SECRET
-    )
-
-
-def _get_detector():
-    detector = cv2.CascadeClassifier(Config.HAARCASCADE_PATH)
-    if detector.empty():
-        raise RuntimeError("Haarcascade file not found or invalid")
-    return detector
+from app.services.detectors import get_detector
+from app.services.face_dedup_service import forget_student, is_near_duplicate, register_sample
+from app.services.face_store import get_face_store, sample_filename
+from app.services.persistence_queue import flush_persistence, persist_sample
+from app.utils.images import decode_base64_image, normalize_face
 
 
 def _check_blur(gray: np.ndarray) -> bool:
@@ -42,9 +26,9 @@ def _check_blur(gray: np.ndarray) -> bool:
 
 def _validate_face(image_array: np.ndarray) -> bool:
     """Return True if exactly one face is detected with sufficient size and sharpness."""
-    detector = _get_detector()
+    detector = get_detector()
     gray = cv2.cvtColor(image_array, cv2.COLOR_BGR2GRAY) if len(image_array.shape) == 3 else image_array
-    faces = detector.detectMultiScale(gray, 1.2, 5)
+    faces = detector.detect(gray)
     if len(faces) != 1:
         return False
     x, y, w, h = faces[0]
@@ -55,39 +39,24 @@ def _validate_face(image_array: np.ndarray) -> bool:
     return _check_blur(face_roi)
 
 
-def _sanitize_name(name: str) -> str:
-    """Remove invalid chars for filename (dot used as separator)."""
-    return re.sub(r'[<>:"/\\|?*]', "_", name).strip() or "student"
-
-
 def save_face_image(
     enrollment: str,
     name: str,
     image_base64: str,
 ) -> dict:
     """
-    Validate face, save locally, optionally upload to Cloudinary.
-    Returns: { localPath, cloudinaryUrl?, sampleNum }
+    Validate face, then enqueue the local save and optional cloud backup.
+    Returns: { localPath, filename, cloudinaryUrl (always None; uploaded in background), sampleNum }
     Raises: ValueError on invalid input or no face detected.
     """
     if not enrollment or not name or not image_base64:
         raise ValueError("enrollment, name, and image (base64) required")
 
-    # Decode base64
-    try:
-        if "," in image_base64:
-            image_base64 = image_base64.split(",", 1)[1]
-        img_bytes = base64.b64decode(image_base64)
-        nparr = np.frombuffer(img_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        if img is None:
-            raise ValueError("Invalid image data")
-    except Exception as e:
-        raise ValueError(f"Invalid base64 image: {e}") from e
-
-    detector = _get_detector()
+    img = decode_base64_image(image_base64)
+
+    detector = get_detector()
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    faces = detector.detectMultiScale(gray, 1.2, 5)
+    faces = detector.detect(gray)
     if len(faces) == 0:
         raise ValueError("No face detected - ensure your face is clearly visible in the frame")
     if len(faces) > 1:
@@ -99,53 +68,31 @@ def save_face_image(
     if not _check_blur(face_roi):
         raise ValueError("Image too blurry - hold still and ensure good lighting")
 
-    _ensure_dirs()
-    safe_name = _sanitize_name(name)
-
-    # Next sample number for this student
-    prefix = f"{safe_name}.{enrollment}."
-    existing = [f for f in os.listdir(Config.TRAINING_IMAGE_PATH) if f.startswith(prefix)]
-    max_num = 0
-    for f in existing:
-        try:
-            n = int(f.rsplit(".", 1)[0].rsplit(".", 1)[-1])
-            max_num = max(max_num, n)
-        except (ValueError, IndexError):
-            pass
-    sample_num = max_num + 1
-    filename = f"{safe_name}.{enrollment}.{sample_num}.jpg"
-    local_path = os.path.join(Config.TRAINING_IMAGE_PATH, filename)
-
-    # Save locally (required for LBPH training)
-    cv2.imwrite(local_path, img)
-
-    cloudinary_url = None
-    if _is_cloudinary_configured():
-        try:
-            import cloudinary
-            import cloudinary.uploader
-            cloudinary.config(
-                cloud_name=Config.CLOUDINARY_CLOUD_NAME,
-                api_key=Config.CLOUDINARY_API_KEY,
-                api_secret=Config.CLOUDINARY_API_SECRET,
-            )
-            result = cloudinary.uploader.upload(local_path, folder="attendance/face_images")
-            cloudinary_url = result.get("secure_url")
-        except Exception:
-            pass  # Non-fatal: local copy is enough for training
+    sample_num = get_face_store().next_sample_num(enrollment)
+    filename = sample_filename(name, enrollment, sample_num)
+
+    # Store the canonical face crop, not the full frame. The face store write (required for
+    # LBPH training) and cloud backup happen in the background.
+    face = normalize_face(gray, (x, y, w, h))
+    ok, buf = cv2.imencode(".jpg", face)
+    if not ok:
+        raise RuntimeError("Failed to encode image")
+    persist_sample(enrollment, name, sample_num, buf.tobytes(), backup_key=filename)
+    register_sample(enrollment, face)
 
     return {
-        "localPath": local_path,
+        "localPath": os.path.join(Config.TRAINING_IMAGE_PATH, filename) if Config.FACE_STORE_BACKEND == "directory" else None,
         "filename": filename,
-        "cloudinaryUrl": cloudinary_url,
+        "cloudinaryUrl": None,  # backup is uploaded asynchronously
         "sampleNum": sample_num,
     }
 
 
 def save_attendance_face_crop(enrollment: str, name: str, face_gray: np.ndarray) -> bool:
     """
-    Save a face crop from attendance capture for continuous learning.
-    Caller must enforce daily limit. Returns True if saved, False if skipped.
+    Save a normalized face crop (see normalize_face) from attendance capture for continuous learning.
+    Caller must enforce daily limit. Returns True if saved, False if skipped
+    (disabled, too small, blurry, or a near-duplicate of an existing sample).
     """
     if not getattr(Config, "SAVE_ATTENDANCE_FACES_FOR_TRAINING", True):
         return False
@@ -153,20 +100,22 @@ def save_attendance_face_crop(enrollment: str, name: str, face_gray: np.ndarray)
         return False
     if not _check_blur(face_gray):
         return False
+    if is_near_duplicate(enrollment, face_gray):
+        return False  # adds nothing to the model, only size and predict time
 
-    _ensure_dirs()
-    safe_name = _sanitize_name(name)
-    prefix = f"{safe_name}.{enrollment}."
-    existing = [f for f in os.listdir(Config.TRAINING_IMAGE_PATH) if f.startswith(prefix)]
-    max_num = 0
-    for f in existing:
-        try:
-            n = int(f.rsplit(".", 1)[0].rsplit(".", 1)[-1])
-            max_num = max(max_num, n)
-        except (ValueError, IndexError):
-            pass
-    sample_num = max_num + 1
-    filename = f"{safe_name}.{enrollment}.{sample_num}.jpg"
-    local_path = os.path.join(Config.TRAINING_IMAGE_PATH, filename)
-    cv2.imwrite(local_path, face_gray)
+    ok, buf = cv2.imencode(".jpg", face_gray)
+    if not ok:
+        return False
+    try:
+        persist_sample(enrollment, name, get_face_store().next_sample_num(enrollment), buf.tobytes())
+    except RuntimeError:
+        return False  # continuous learning is best-effort; attendance is already recorded
     return True
+
+
+def delete_student_samples(enrollment: str) -> int:
+    """Delete every stored sample of a student (including queued writes). Returns samples deleted."""
+    flush_persistence(timeout=30)  # a queued write must not recreate a sample after the delete
+    deleted = get_face_store().delete_student(enrollment)
+    forget_student(enrollment)
+    return deleted
@@ -0,0 +1,261 @@
+"""
+Face sample storage behind one interface, used by face_image_service, train_service and
+face_dedup_service.
+
+- DirectoryFaceStore: the original flat TrainingImage/ folder of Name.enrollment.N.jpg files.
+- SqliteFaceStore: a packed store. All samples live in one SQLite file (WAL mode), clustered
+  by (enrollment, sample). Appends are transactional, training reads every sample in one
+  sequential scan, and deleting a student is a single DELETE. Backups copy one file.
+
+Select with FACE_STORE_BACKEND=directory|sqlite; scripts/pack_training_images.py migrates.
+Samples are encoded images (JPEG); readers get decoded grayscale arrays.
+"""
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+
+import cv2
+import numpy as np
+from pymongo import ReturnDocument
+
+from app.config import Config
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+SAMPLE_COUNTERS_COLLECTION = "sample_counters"  # { _id: enrollment, last: highest allocated sample number }
+
+
+def sanitize_name(name: str) -> str:
+    """Remove invalid chars for filename (dot used as separator)."""
+    return re.sub(r'[<>:"/\\|?*]', "_", name).strip() or "student"
+
+
+def sample_filename(name: str, enrollment: str, sample_num: int) -> str:
+    return f"{sanitize_name(name)}.{enrollment}.{sample_num}.jpg"
+
+
+def parse_sample_filename(filename: str):
+    """Name.enrollment.N.jpg -> (name, enrollment, N), or None. Parsed from the right: names may contain dots."""
+    parts = filename.split(".")
+    if len(parts) < 4 or not filename.lower().endswith(IMAGE_EXTENSIONS):
+        return None
+    try:
+        return ".".join(parts[:-3]), parts[-3], int(parts[-2])
+    except ValueError:
+        return None
+
+
+def _decode_gray(data: bytes):
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
+
+
+class FaceStore:
+    """
+    Interface. Sample numbers are allocated up front (next_sample_num) so writes can be
+    queued (see persistence_queue) without two requests getting the same number.
+    """
+
+    def __init__(self):
+        self._seeded = set()  # enrollments whose shared counter was raised to the store's max
+        self._alloc_lock = threading.Lock()
+
+    def next_sample_num(self, enrollment: str) -> int:
+        """
+        Allocate from a per-enrollment Mongo counter ($inc), shared by every server process.
+        The first allocation in a process raises the counter ($max) to the highest sample
+        already in the store, so existing files are never overwritten.
+        """
+        from app.database import get_db
+
+        counters = get_db()[SAMPLE_COUNTERS_COLLECTION]
+        with self._alloc_lock:
+            if enrollment not in self._seeded:
+                counters.update_one(
+                    {"_id": enrollment}, {"$max": {"last": self._max_sample_num(enrollment)}}, upsert=True
+                )
+                self._seeded.add(enrollment)
+        doc = counters.find_one_and_update(
+            {"_id": enrollment}, {"$inc": {"last": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        return doc["last"]
+
+    def _max_sample_num(self, enrollment: str) -> int:
+        raise NotImplementedError
+
+    def put(self, enrollment: str, name: str, sample_num: int, data: bytes):
+        """Atomically store one encoded sample."""
+        raise NotImplementedError
+
+    def iter_samples(self):
+        """Yield (enrollment, ref, gray_image) for every active sample, in storage order."""
+        raise NotImplementedError
+
+    def samples_for(self, enrollment: str):
+        """Yield gray images of one student's active samples."""
+        raise NotImplementedError
+
+    def archive(self, refs: list) -> int:
+        """Take samples (refs from iter_samples) out of training without deleting them."""
+        raise NotImplementedError
+
+    def delete_student(self, enrollment: str) -> int:
+        """Delete every sample of a student (active and archived). Returns samples deleted."""
+        raise NotImplementedError
+
+    def _forget(self, enrollment: str):
+        with self._alloc_lock:
+            self._seeded.discard(enrollment)
+
+
+class DirectoryFaceStore(FaceStore):
+    def __init__(self, root: str, archive_root: str):
+        super().__init__()
+        self.root = root
+        self.archive_root = archive_root
+
+    def _files(self, root: str, enrollment: str = None):
+        """[(filename, enrollment, sample_num)] of the sample files in root."""
+        if not os.path.isdir(root):
+            return []
+        out = []
+        for f in os.listdir(root):
+            parsed = parse_sample_filename(f)
+            if parsed is not None and (enrollment is None or parsed[1] == enrollment):
+                out.append((f, parsed[1], parsed[2]))
+        return out
+
+    def _max_sample_num(self, enrollment: str) -> int:
+        # Archived files count too: archive() moves files by name and must not overwrite one
+        files = self._files(self.root, enrollment) + self._files(self.archive_root, enrollment)
+        return max((num for _, _, num in files), default=0)
+
+    def put(self, enrollment: str, name: str, sample_num: int, data: bytes):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, sample_filename(name, enrollment, sample_num))
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def iter_samples(self):
+        for f, enrollment, _ in self._files(self.root):
+            path = os.path.join(self.root, f)
+            img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if img is not None:
+                yield enrollment, path, img
+
+    def samples_for(self, enrollment: str):
+        for f, _, _ in self._files(self.root, enrollment):
+            img = cv2.imread(os.path.join(self.root, f), cv2.IMREAD_GRAYSCALE)
+            if img is not None:
+                yield img
+
+    def archive(self, refs: list) -> int:
+        os.makedirs(self.archive_root, exist_ok=True)
+        for p in refs:
+            shutil.move(p, os.path.join(self.archive_root, os.path.basename(p)))
+        return len(refs)
+
+    def delete_student(self, enrollment: str) -> int:
+        deleted = 0
+        for root in (self.root, self.archive_root):
+            for f, _, _ in self._files(root, enrollment):
+                os.remove(os.path.join(root, f))
+                deleted += 1
+        self._forget(enrollment)
+        return deleted
+
+
+class SqliteFaceStore(FaceStore):
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS samples ("
+            " enrollment TEXT NOT NULL, sample INTEGER NOT NULL, name TEXT NOT NULL,"
+            " data BLOB NOT NULL, archived INTEGER NOT NULL DEFAULT 0, created REAL NOT NULL,"
+            " PRIMARY KEY (enrollment, sample)) WITHOUT ROWID"
+        )
+        conn.commit()
+
+    def _conn(self):
+        # One connection per thread and process (sqlite3 connections must not cross forks)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _max_sample_num(self, enrollment: str) -> int:
+        row = self._conn().execute("SELECT MAX(sample) FROM samples WHERE enrollment = ?", (enrollment,)).fetchone()
+        return row[0] or 0
+
+    def put(self, enrollment: str, name: str, sample_num: int, data: bytes):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO samples (enrollment, sample, name, data, archived, created) VALUES (?, ?, ?, ?, 0, ?)",
+                (enrollment, sample_num, name, sqlite3.Binary(data), time.time()),
+            )
+
+    def iter_samples(self):
+        cursor = self._conn().execute(
+            "SELECT enrollment, sample, data FROM samples WHERE archived = 0 ORDER BY enrollment, sample"
+        )
+        for enrollment, sample, data in cursor:
+            img = _decode_gray(data)
+            if img is not None:
+                yield enrollment, (enrollment, sample), img
+
+    def samples_for(self, enrollment: str):
+        cursor = self._conn().execute(
+            "SELECT data FROM samples WHERE enrollment = ? AND archived = 0 ORDER BY sample", (enrollment,)
+        )
+        for (data,) in cursor:
+            img = _decode_gray(data)
+            if img is not None:
+                yield img
+
+    def archive(self, refs: list) -> int:
+        conn = self._conn()
+        with conn:
+            conn.executemany("UPDATE samples SET archived = 1 WHERE enrollment = ? AND sample = ?", refs)
+        return len(refs)
+
+    def delete_student(self, enrollment: str) -> int:
+        conn = self._conn()
+        with conn:
+            deleted = conn.execute("DELETE FROM samples WHERE enrollment = ?", (enrollment,)).rowcount
+        self._forget(enrollment)
+        return deleted
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def create_face_store(backend: str = None) -> FaceStore:
+    backend = (backend or Config.FACE_STORE_BACKEND).lower()
+    if backend == "sqlite":
+        return SqliteFaceStore(Config.FACE_STORE_DB_PATH)
+    if backend == "directory":
+        return DirectoryFaceStore(Config.TRAINING_IMAGE_PATH, Config.TRAINING_ARCHIVE_PATH)
+    raise ValueError(f"Unknown FACE_STORE_BACKEND: {backend}")
+
+
+def get_face_store() -> FaceStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_face_store()
+    return _store
@@ -0,0 +1,91 @@
+"""
+Change gating for auto attendance.
+Kiosks post frames continuously; most of them show the same scene as the last one. For each
+camera (and subject) the gate keeps a tiny grayscale thumbnail of the last frame that was
+actually recognized, plus that frame's outcome. A new frame is decoded at 1/8 scale (JPEG
+decoders do this far faster than a full decode) and compared to the reference by mean
+absolute difference; below FRAME_GATE_THRESHOLD the cached outcome is returned and Haar +
+LBPH are skipped. The reference is only replaced on a miss, so slow drift still triggers a
+fresh recognition, and cached outcomes expire after FRAME_GATE_MAX_AGE_SECONDS.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from app.config import Config
+from app.utils.images import decode_base64_image
+
+THUMB_SIZE = (32, 24)  # width, height
+
+
+def thumbnail(image_base64: str) -> np.ndarray:
+    """
+    Small grayscale thumbnail for change detection. No explicit blur: the 1/8 decode and area
+    resize already average sensor noise away. Raises ValueError on bad input.
+    """
+    small = decode_base64_image(image_base64, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    return cv2.resize(small, THUMB_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+def change_score(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean absolute gray-level difference between two thumbnails (0-255)."""
+    return float(np.abs(a - b).mean())
+
+
+class FrameGate:
+    def __init__(self, threshold: float, max_age: float, max_keys: int = 256):
+        self.threshold = threshold
+        self.max_age = max_age
+        self.max_keys = max_keys
+        self._entries = OrderedDict()  # key -> (thumb, outcome, stored_at), least recently used first
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key, thumb: np.ndarray):
+        """Cached outcome for an unchanged scene, or None when the frame must be recognized."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                ref, outcome, stored_at = entry
+                if now - stored_at <= self.max_age and change_score(thumb, ref) < self.threshold:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return outcome
+            self.misses += 1
+            return None
+
+    def store(self, key, thumb: np.ndarray, outcome):
+        with self._lock:
+            self._entries[key] = (thumb, outcome, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "cameras": len(self._entries)}
+
+
+_gate = None
+_gate_lock = threading.Lock()
+
+
+def get_frame_gate():
+    """Return the shared gate, or None when FRAME_GATE_ENABLED is off."""
+    global _gate
+    if not Config.FRAME_GATE_ENABLED:
+        return None
+    if _gate is None:
+        with _gate_lock:
+            if _gate is None:
+                _gate = FrameGate(Config.FRAME_GATE_THRESHOLD, Config.FRAME_GATE_MAX_AGE_SECONDS)
+    return _gate
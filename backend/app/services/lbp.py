@@ -0,0 +1,69 @@
+"""
+Uniform local binary patterns in numpy, for the lbph_compact engine (see recognizers).
+
+Codes are computed like OpenCV's LBPH (circular neighbourhood, bilinear sampling), then
+mapped to uniform patterns: codes with at most two 0/1 transitions around the circle each get
+a bin, every other code shares one. With 8 neighbours that is 59 bins instead of 256, and
+uniform patterns carry most of a face's texture. A face is described by one count histogram
+per grid cell; counts fit in uint16 for any cell under 65,536 pixels.
+"""
+import math
+from functools import lru_cache
+
+import numpy as np
+
+
+def uniform_bins(neighbors: int) -> int:
+    """Histogram bins for uniform patterns: P * (P - 1) + 2 uniform codes plus one for the rest."""
+    return neighbors * (neighbors - 1) + 3
+
+
+@lru_cache(maxsize=None)
+def uniform_mapping(neighbors: int) -> np.ndarray:
+    """Lookup table: LBP code -> uniform bin."""
+    codes = np.arange(1 << neighbors, dtype=np.int64)
+    rotated = ((codes >> 1) | ((codes & 1) << (neighbors - 1)))  # compare each bit with its neighbour
+    transitions = np.array([bin(int(c)).count("1") for c in codes ^ rotated])
+    table = np.full(len(codes), uniform_bins(neighbors) - 1, dtype=np.int32)
+    uniform = transitions <= 2
+    table[uniform] = np.arange(int(uniform.sum()))
+    table.setflags(write=False)
+    return table
+
+
+def lbp_codes(gray: np.ndarray, radius: int, neighbors: int) -> np.ndarray:
+    """Extended LBP codes of the interior (border of `radius` pixels dropped), as in OpenCV's elbp."""
+    src = gray.astype(np.float32)
+    rows, cols = src.shape
+    center = src[radius:rows - radius, radius:cols - radius]
+    codes = np.zeros(center.shape, dtype=np.int32)
+    for n in range(neighbors):
+        x = radius * math.cos(2.0 * math.pi * n / neighbors)
+        y = -radius * math.sin(2.0 * math.pi * n / neighbors)
+        fx, fy, cx, cy = math.floor(x), math.floor(y), math.ceil(x), math.ceil(y)
+        tx, ty = x - fx, y - fy
+
+        def at(dy, dx):
+            return src[radius + dy:rows - radius + dy, radius + dx:cols - radius + dx]
+
+        sample = (
+            (1 - tx) * (1 - ty) * at(fy, fx) + tx * (1 - ty) * at(fy, cx)
+            + (1 - tx) * ty * at(cy, fx) + tx * ty * at(cy, cx)
+        )
+        codes |= ((sample > center) | (np.abs(sample - center) < np.finfo(np.float32).eps)).astype(np.int32) << n
+    return codes
+
+
+def describe(gray: np.ndarray, radius: int, neighbors: int, grid_x: int, grid_y: int) -> np.ndarray:
+    """
+    Uniform LBP count histograms of a face crop: shape (grid_y * grid_x, bins), uint16.
+    Cells are equal-sized; leftover rows/columns are ignored (as in OpenCV's LBPH).
+    """
+    mapped = uniform_mapping(neighbors)[lbp_codes(gray, radius, neighbors)]
+    bins = uniform_bins(neighbors)
+    h, w = mapped.shape[0] // grid_y, mapped.shape[1] // grid_x
+    cells = mapped[:grid_y * h, :grid_x * w].reshape(grid_y, h, grid_x, w).transpose(0, 2, 1, 3).reshape(grid_y * grid_x, h * w)
+    index = cells + (np.arange(len(cells)) * bins)[:, None]
+    counts = np.bincount(index.ravel(), minlength=len(cells) * bins)
+    return counts.reshape(len(cells), bins).astype(np.uint16)
+
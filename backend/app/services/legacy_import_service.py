@@ -0,0 +1,123 @@
+"""
+Import the desktop app's CSV history into MongoDB.
+- StudentDetails/StudentDetails.csv -> students (upsert by enrollment; placeholder email, no password)
+- Attendance/<Subject>.csv           -> attendance (upsert by enrollment + subject + date)
+Files are streamed with the csv module and written with unordered bulk upserts, so
+re-running the import is idempotent and memory stays flat regardless of history size.
+"""
+import csv
+import glob
+import os
+import re
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.database import get_students_collection, get_attendance_collection
+from app.models.attendance import attendance_schema
+from app.models.student import student_schema
+from app.services.collection_versions import bump
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+_LIST_NAME = re.compile(r"^\[\s*'(.*)'\s*\]$")  # desktop app wrote names as "['Name']"
+
+
+def _clean_name(name: str) -> str:
+    name = (name or "").strip()
+    m = _LIST_NAME.match(name)
+    return m.group(1).strip() if m else name
+
+
+def _flush(coll, ops: list, totals: dict):
+    """
+    Write one batch. Rows the database rejects (e.g. a synthesized email that collides with
+    the unique email index) are counted as skipped and listed in totals["errors"]; the rest
+    of the batch and the import go on.
+    """
+    if not ops:
+        return
+    try:
+        result = coll.bulk_write(ops, ordered=False)
+        upserted, errors = result.upserted_count, []
+    except BulkWriteError as e:
+        details = e.details
+        upserted = details.get("nUpserted", 0) + details.get("nInserted", 0)
+        errors = details.get("writeErrors", [])
+    totals["inserted"] += upserted
+    totals["existing"] += len(ops) - upserted - len(errors)
+    totals["skipped"] += len(errors)
+    for err in errors:
+        if len(totals["errors"]) < MAX_REPORTED_ERRORS:
+            totals["errors"].append({
+                "enrollment": (err.get("op") or {}).get("q", {}).get("enrollment"),
+                "error": err.get("errmsg", "write failed"),
+            })
+    ops.clear()
+
+
+def import_legacy_students(path: str, email_domain: str = "legacy.local") -> dict:
+    """
+    Upsert students from StudentDetails.csv. The last row per enrollment wins (the desktop
+    app appends a row per capture session). Existing students are left untouched.
+    Imported students have no password; they must be reset before they can log in.
+    """
+    latest = {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            enrollment = (row.get("Enrollment") or "").strip()
+            name = _clean_name(row.get("Name"))
+            if enrollment.isdigit() and name:
+                latest[enrollment] = name
+
+    coll = get_students_collection()
+    totals = {"rows": len(latest), "inserted": 0, "existing": 0, "skipped": 0, "errors": []}
+    ops = []
+    for enrollment, name in latest.items():
+        doc = student_schema(enrollment, name, f"{enrollment}@{email_domain}", "", image_count=0)
+        ops.append(UpdateOne({"enrollment": enrollment}, {"$setOnInsert": doc}, upsert=True))
+        if len(ops) >= BATCH_SIZE:
+            _flush(coll, ops, totals)
+    _flush(coll, ops, totals)
+    if totals["inserted"]:
+        bump("students")
+    return totals
+
+
+def import_legacy_attendance(attendance_dir: str) -> dict:
+    """
+    Upsert every Attendance/<Subject>.csv row. Like auto attendance, one record is kept per
+    student, subject and date (the first sighting in the file); records already in Mongo
+    are left untouched and counted as "existing".
+    """
+    coll = get_attendance_collection()
+    totals = {"files": 0, "rows": 0, "inserted": 0, "existing": 0, "duplicates": 0, "skipped": 0, "errors": []}
+    ops = []
+    for path in sorted(glob.glob(os.path.join(attendance_dir, "*.csv"))):
+        subject = os.path.splitext(os.path.basename(path))[0].strip()
+        totals["files"] += 1
+        seen = set()  # (enrollment, date) already queued from this file
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                totals["rows"] += 1
+                enrollment = (row.get("Enrollment") or "").strip()
+                date = (row.get("Date") or "").strip().replace("_", "-")
+                time_str = (row.get("Time") or "").strip()
+                if not enrollment or not date:
+                    totals["skipped"] += 1
+                    continue
+                if (enrollment, date) in seen:
+                    totals["duplicates"] += 1
+                    continue
+                seen.add((enrollment, date))
+                doc = attendance_schema(enrollment, _clean_name(row.get("Name")), subject, date, time_str, "auto")
+                ops.append(UpdateOne(
+                    {"enrollment": doc["enrollment"], "subject": subject, "date": date},
+                    {"$setOnInsert": doc},
+                    upsert=True,
+                ))
+                if len(ops) >= BATCH_SIZE:
+                    _flush(coll, ops, totals)
+    _flush(coll, ops, totals)
+    return totals
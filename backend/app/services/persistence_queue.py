@@ -0,0 +1,340 @@
+"""
+Write-behind persistence for face images.
+Request handlers encode the image and enqueue it; a background thread writes it to the
+face store (see face_store) and then hands it to the cloud backup (Cloudinary, or a local directory
+stand-in for testing). Failed jobs are retried with exponential backoff. Jobs that do not
+fit in the bounded in-memory queue, exhaust their retries, or are pending at shutdown are
+spooled to PERSIST_SPOOL_PATH and replayed on the next start (and periodically). A job
+replayed PERSIST_MAX_SPOOL_REPLAYS times without succeeding is renamed to *.job.bad.
+"""
+import atexit
+import heapq
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+
+from app.config import Config
+
+SPOOL_SUFFIX = ".job"
+
+
+class CloudBackup:
+    """Pluggable cloud backup target. upload() returns a URL (or None) and raises on failure."""
+
+    name = "none"
+
+    def upload(self, key: str, data: bytes):
+        raise NotImplementedError
+
+
+class CloudinaryBackup(CloudBackup):
+    name = "cloudinary"
+
+    def __init__(self, folder: str = "attendance/face_images"):
+        import cloudinary
+
+        cloudinary.config(
+            cloud_name=Config.CLOUDINARY_CLOUD_NAME,
+            api_key=Config.CLOUDINARY_API_KEY,
+            api_secret=Config.CLOUDINARY_API_SECRET,
+        )
+        self.folder = folder
+
+    def upload(self, key: str, data: bytes):
+        import io
+
+        import cloudinary.uploader
+
+        public_id = os.path.splitext(key)[0]
+        result = cloudinary.uploader.upload(io.BytesIO(data), folder=self.folder, public_id=public_id)
+        return result.get("secure_url")
+
+
+class LocalDirectoryBackup(CloudBackup):
+    """Filesystem stand-in for a CDN: copies each upload into a local directory."""
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def upload(self, key: str, data: bytes):
+        path = os.path.join(self.root, key)
+        _atomic_write(path, data)
+        return "file://" + path
+
+
+def _is_cloudinary_configured():
+    return bool(
+        Config.CLOUDINARY_CLOUD_NAME
+        and Config.CLOUDINARY_API_KEY
+        and Config.CLOUDINARY_API_SECRET
+    )
+
+
+def create_cloud_backup():
+    """Backup target from CLOUD_BACKUP_BACKEND ("auto" = Cloudinary when configured)."""
+    backend = Config.CLOUD_BACKUP_BACKEND
+    if backend == "auto":
+        backend = "cloudinary" if _is_cloudinary_configured() else "none"
+    if backend == "cloudinary":
+        return CloudinaryBackup()
+    if backend == "local":
+        return LocalDirectoryBackup(Config.CLOUD_BACKUP_LOCAL_PATH)
+    return None
+
+
+_cloud_backup = None
+_cloud_backup_loaded = False
+
+
+def get_cloud_backup():
+    """Configured backup target, created (and Cloudinary configured) once per process."""
+    global _cloud_backup, _cloud_backup_loaded
+    if not _cloud_backup_loaded:
+        _cloud_backup = create_cloud_backup()
+        _cloud_backup_loaded = True
+    return _cloud_backup
+
+
+def _atomic_write(path: str, data: bytes):
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class PersistenceQueue:
+    def __init__(
+        self,
+        maxsize: int,
+        spool_path: str,
+        max_retries: int,
+        retry_base: float,
+        replay_interval: float = 60.0,
+        backup: CloudBackup = None,
+        max_replays: int = 5,
+    ):
+        self.spool_path = spool_path
+        self.replay_interval = replay_interval
+        self.max_replays = max_replays
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.backup = backup
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._delayed = []  # heap of (due_time, seq, job, data) waiting for retry
+        self._seq = 0
+        self._pending = {"write": 0, "backup": 0}  # accepted but not finished (queued, delayed or running)
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="persistence-queue", daemon=True)
+
+    def start(self):
+        os.makedirs(self.spool_path, exist_ok=True)
+        self._thread.start()
+        self._replay_spool()
+
+    # -- public API ---------------------------------------------------------
+
+    def write_sample(self, sample: dict, data: bytes, backup_key: str = None):
+        """Store an encoded face sample ({enrollment, name, sampleNum}), then back it up under backup_key."""
+        self._submit({"kind": "write", "sample": sample, "key": backup_key, "attempts": 0}, data)
+
+    def flush(self, timeout: float = None, kinds=("write",)) -> bool:
+        """Wait until accepted jobs of the given kinds have finished. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while any(self._pending[k] for k in kinds):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self):
+        """Spool whatever is still queued or waiting for retry so nothing is lost."""
+        self._stopped = True
+        while True:
+            try:
+                job, data = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._spool(job, data)
+        with self._cond:
+            for _, _, job, data in self._delayed:
+                self._spool(job, data)
+            self._delayed = []
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "retrying": len(self._delayed),
+            "pending": dict(self._pending),
+            "spooled": len([f for f in os.listdir(self.spool_path) if f.endswith(SPOOL_SUFFIX)]),
+        }
+
+    # -- internals ----------------------------------------------------------
+
+    def _submit(self, job: dict, data: bytes):
+        with self._cond:
+            self._pending[job["kind"]] += 1
+        try:
+            self._queue.put_nowait((job, data))
+        except queue.Full:
+            try:
+                self._spool(job, data)  # durable overflow; replayed when the queue drains
+            except OSError as e:
+                raise RuntimeError(f"Could not queue {job['kind']}: {e}") from e
+            finally:
+                self._done(job)
+
+    def _done(self, job: dict):
+        with self._cond:
+            self._pending[job["kind"]] -= 1
+            self._cond.notify_all()
+
+    def _run(self):
+        last_replay = time.monotonic()
+        while True:
+            due = None
+            timeout = 1.0
+            with self._cond:
+                if self._delayed:
+                    wait = self._delayed[0][0] - time.monotonic()
+                    if wait <= 0:
+                        due = heapq.heappop(self._delayed)
+                    else:
+                        timeout = min(timeout, wait)
+            if due is not None:
+                self._process(due[2], due[3])
+                continue
+            try:
+                job, data = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                if not self._stopped and time.monotonic() - last_replay >= self.replay_interval:
+                    last_replay = time.monotonic()
+                    self._replay_spool()
+                continue
+            self._process(job, data)
+
+    def _process(self, job: dict, data: bytes):
+        try:
+            if job["kind"] == "write":
+                _store_sample(job["sample"], data)
+                if self.backup is not None and job.get("key"):
+                    self._submit({"kind": "backup", "key": job["key"], "attempts": 0}, data)
+            elif job["kind"] == "backup" and self.backup is not None:
+                self.backup.upload(job["key"], data)
+        except Exception:
+            job["attempts"] += 1
+            if job["attempts"] <= self.max_retries and not self._stopped:
+                delay = self.retry_base * (2 ** (job["attempts"] - 1))
+                with self._cond:
+                    self._seq += 1
+                    heapq.heappush(self._delayed, (time.monotonic() + delay, self._seq, job, data))
+                return  # still pending
+            self._spool(job, data)
+        self._done(job)
+
+    def _spool(self, job: dict, data: bytes):
+        name = f"{time.time():.6f}-{uuid.uuid4().hex}{SPOOL_SUFFIX}"
+        header = json.dumps(job).encode("utf-8")
+        _atomic_write(os.path.join(self.spool_path, name), header + b"\n" + data)
+
+    def _replay_spool(self):
+        """Move spooled jobs back into the queue while there is room (oldest first)."""
+        try:
+            names = sorted(f for f in os.listdir(self.spool_path) if f.endswith(SPOOL_SUFFIX))
+        except OSError:
+            return
+        for name in names:
+            if self._queue.full():
+                return
+            path = os.path.join(self.spool_path, name)
+            try:
+                with open(path, "rb") as f:
+                    header, data = f.read().split(b"\n", 1)
+                job = json.loads(header)
+            except (OSError, ValueError):
+                shutil.move(path, path + ".bad")
+                continue
+            # A job that keeps failing would otherwise cycle retry -> spool -> replay forever
+            if job.get("replays", 0) >= self.max_replays:
+                shutil.move(path, path + ".bad")
+                continue
+            job["attempts"] = 0  # a fresh round of backoff retries
+            job["replays"] = job.get("replays", 0) + 1
+            with self._cond:
+                self._pending[job["kind"]] += 1
+            try:
+                self._queue.put_nowait((job, data))
+            except queue.Full:
+                self._done(job)  # keep the spool file for the next replay
+                return
+            os.remove(path)
+
+
+_persistence_queue = None
+_persistence_lock = threading.Lock()
+
+
+def get_persistence_queue():
+    """Shared write-behind queue, or None when WRITE_BEHIND_ENABLED is off."""
+    global _persistence_queue
+    if not Config.WRITE_BEHIND_ENABLED:
+        return None
+    if _persistence_queue is None:
+        with _persistence_lock:
+            if _persistence_queue is None:
+                q = PersistenceQueue(
+                    maxsize=Config.PERSIST_QUEUE_SIZE,
+                    spool_path=Config.PERSIST_SPOOL_PATH,
+                    max_retries=Config.PERSIST_MAX_RETRIES,
+                    retry_base=Config.PERSIST_RETRY_BASE_SECONDS,
+                    replay_interval=Config.PERSIST_SPOOL_REPLAY_SECONDS,
+                    max_replays=Config.PERSIST_MAX_SPOOL_REPLAYS,
+                    backup=get_cloud_backup(),
+                )
+                q.start()
+                atexit.register(q.stop)
+                _persistence_queue = q
+    return _persistence_queue
+
+
+def _store_sample(sample: dict, data: bytes):
+    from app.services.face_store import get_face_store
+
+    get_face_store().put(sample["enrollment"], sample["name"], sample["sampleNum"], data)
+
+
+def persist_sample(enrollment: str, name: str, sample_num: int, data: bytes, backup_key: str = None):
+    """
+    Enqueue a face sample write (or store it inline when write-behind is disabled).
+    Raises: RuntimeError when the sample can be neither queued, spooled nor stored (e.g. disk full).
+    """
+    sample = {"enrollment": enrollment, "name": name, "sampleNum": sample_num}
+    q = get_persistence_queue()
+    if q is not None:
+        q.write_sample(sample, data, backup_key)
+        return
+    try:
+        _store_sample(sample, data)
+    except OSError as e:
+        raise RuntimeError(f"Could not store face sample: {e}") from e
+    backup = get_cloud_backup()
+    if backup is not None and backup_key:
+        try:
+            backup.upload(backup_key, data)
+        except Exception:
+            pass  # Non-fatal: local copy is enough for training
+
+
+def flush_persistence(timeout: float = None) -> bool:
+    """Wait for pending sample writes (e.g. before training reads the face store)."""
+    q = _persistence_queue
+    return q.flush(timeout) if q is not None else True
@@ -0,0 +1,125 @@
+"""
+On-demand statistical profiler for the serving process (POST /api/admin/profile).
+Every PROFILER_INTERVAL_MS it snapshots the Python stack of every thread with
+sys._current_frames() and counts identical stacks; nothing is traced between samples, so
+overhead is a few stack walks per interval. Output is collapsed stacks
+("outer;inner;leaf count" per line), the input format of flamegraph.pl and speedscope.
+
+Frames are labelled "function (file.py)"; the leaf also gets its line number, so time inside
+C calls (detectMultiScale, predict, imdecode, socket reads under PyMongo) shows up on the
+Python line that made the call. Only this process is sampled: recognition running in
+RECOGNITION_WORKERS processes appears as request threads waiting on the pool.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from app.config import Config
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Leaf functions of threads parked in a server loop or an idle keep-alive connection
+IDLE_LEAVES = frozenset({"wait", "select", "poll", "accept", "sleep", "readinto", "_wait_for_tstate_lock"})
+
+_active = None  # ProfileSession while one is running (one per process)
+_active_lock = threading.Lock()
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profiling session is already running in this process."""
+
+    def __init__(self):
+        super().__init__("A profile is already running in this process")
+
+
+class ProfileSession:
+    def __init__(self, seconds: float, max_requests: int = 0, interval_ms: float = None, path_prefix: str = None, include_idle: bool = False):
+        self.seconds = seconds
+        self.max_requests = max_requests
+        self.interval = (interval_ms or Config.PROFILER_INTERVAL_MS) / 1000.0
+        self.path_prefix = path_prefix
+        self.include_idle = include_idle
+        self.stacks = Counter()
+        self.samples = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def note_request(self, path: str):
+        """Count a finished request; ends the session after max_requests matching ones."""
+        if self.path_prefix and not path.startswith(self.path_prefix):
+            return
+        with self._lock:
+            self.requests += 1
+            if self.max_requests and self.requests >= self.max_requests:
+                self._done.set()
+
+    def _sample(self, own_thread: int):
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(frame)
+                frame = frame.f_back
+            leaf = frames[0]
+            if not self.include_idle and leaf.f_code.co_name in IDLE_LEAVES and not any(
+                f.f_code.co_filename.startswith(APP_DIR) for f in frames
+            ):
+                continue
+            labels = [f"{f.f_code.co_name} ({os.path.basename(f.f_code.co_filename)})" for f in reversed(frames[1:])]
+            labels.append(f"{leaf.f_code.co_name} ({os.path.basename(leaf.f_code.co_filename)}:{leaf.f_lineno})")
+            self.stacks[";".join(labels)] += 1
+        self.samples += 1
+
+    def run(self) -> dict:
+        """Sample from the calling thread until the time or request limit is reached."""
+        own_thread = threading.get_ident()
+        started = time.perf_counter()
+        deadline = started + self.seconds
+        while not self._done.wait(self.interval) and time.perf_counter() < deadline:
+            self._sample(own_thread)
+        return {
+            "seconds": round(time.perf_counter() - started, 2),
+            "samples": self.samples,
+            "requests": self.requests,
+            "intervalMs": self.interval * 1000,
+            "stacks": self.stacks.most_common(),
+        }
+
+
+def profile(seconds: float, max_requests: int = 0, interval_ms: float = None, path_prefix: str = None, include_idle: bool = False) -> dict:
+    """
+    Run a profiling session in the calling thread (blocks for up to `seconds`).
+    Raises: ValueError on bad limits, RuntimeError if disabled, ProfilerBusyError if a session is running.
+    """
+    global _active
+    if not Config.PROFILER_ENABLED:
+        raise RuntimeError("Profiler disabled (PROFILER_ENABLED=false)")
+    if not 0 < seconds <= Config.PROFILER_MAX_SECONDS:
+        raise ValueError(f"seconds must be between 0 and {Config.PROFILER_MAX_SECONDS}")
+    if max_requests < 0 or (interval_ms is not None and interval_ms < 1):
+        raise ValueError("requests must be >= 0 and intervalMs >= 1")
+    session = ProfileSession(seconds, max_requests, interval_ms, path_prefix, include_idle)
+    with _active_lock:
+        if _active is not None:
+            raise ProfilerBusyError()
+        _active = session
+    try:
+        return session.run()
+    finally:
+        with _active_lock:
+            _active = None
+
+
+def note_request(path: str):
+    """Called after every request; cheap when no session is running."""
+    session = _active
+    if session is not None:
+        session.note_request(path)
+
+
+def to_collapsed(stacks: list) -> str:
+    """Collapsed-stack text: one "frame;frame;frame count" line per stack."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks)
@@ -0,0 +1,130 @@
+"""
+Recognition executor: a pool of long-lived worker processes for CPU-bound face recognition.
+Each worker loads the face detector and recognizer model once and keeps them between frames,
+so request threads only wait on a future and cheap endpoints are not starved of CPU.
+Admission control caps in-flight frames at RECOGNITION_WORKERS + RECOGNITION_MAX_QUEUE;
+beyond that submit fails fast with RecognitionBusyError (HTTP 503 + Retry-After).
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from app.config import Config
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class RecognitionBusyError(Exception):
+    """Raised when the recognition queue is full; retry_after is in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Recognition service busy, retry later")
+        self.retry_after = retry_after
+
+
+def _worker_init():
+    """Load detector and model once per worker process (model may not be trained yet)."""
+    from app.services import attendance_service
+    from app.services.detectors import get_detector
+
+    get_detector()
+    try:
+        attendance_service._load_recognizer()
+    except ValueError:
+        pass  # loaded on first frame after POST /api/train
+
+
+def _worker_recognize(image_base64: str) -> list:
+    from app.services.attendance_service import recognize_image
+
+    return recognize_image(image_base64)
+
+
+class RecognitionPool:
+    def __init__(self, workers: int, max_queue: int, timeout: float, retry_after: int):
+        self.workers = workers
+        self.capacity = workers + max_queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._executor_lock = threading.Lock()
+        self._executor = self._create_executor()
+
+    def _create_executor(self):
+        # spawn: never fork a multi-threaded web server process
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_worker_init,
+        )
+
+    def _restart(self, broken):
+        with self._executor_lock:
+            if self._executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._create_executor()
+
+    def run(self, image_base64: str) -> list:
+        """
+        Recognize a frame in a worker process and return its matches (see recognize_image).
+        Raises: RecognitionBusyError when saturated, ValueError from recognition,
+                RuntimeError on timeout or worker crash.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise RecognitionBusyError(self.retry_after)
+        executor = self._executor
+        try:
+            future = executor.submit(_worker_recognize, image_base64)
+        except BrokenProcessPool as e:
+            self._slots.release()
+            self._restart(executor)
+            raise RuntimeError("Recognition worker crashed, please retry") from e
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot frees when the worker is really done: a timed-out frame that is already
+        # running keeps its worker busy, so it must keep counting against admission
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError as e:
+            future.cancel()  # only succeeds if the frame has not started yet
+            raise RuntimeError("Recognition timed out") from e
+        except BrokenProcessPool as e:
+            self._restart(executor)
+            raise RuntimeError("Recognition worker crashed, please retry") from e
+
+    def warm_up(self):
+        """Start every worker process now instead of on the first frames."""
+        futures = [self._executor.submit(int, 0) for _ in range(self.workers)]
+        for f in futures:
+            f.result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_recognition_pool():
+    """Return the shared pool, or None when RECOGNITION_WORKERS is 0 (recognize inline)."""
+    global _pool
+    if Config.RECOGNITION_WORKERS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = RecognitionPool(
+                    workers=Config.RECOGNITION_WORKERS,
+                    max_queue=Config.RECOGNITION_MAX_QUEUE,
+                    timeout=Config.RECOGNITION_TIMEOUT_SECONDS,
+                    retry_after=Config.RECOGNITION_RETRY_AFTER_SECONDS,
+                )
+    return _pool
+
+
+def shutdown_recognition_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
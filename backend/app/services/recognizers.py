@@ -0,0 +1,349 @@
+"""
+Face recognizer engines behind one interface, selected with RECOGNIZER_ENGINE.
+Both map label ids to enrollments through id_to_enrollment.json (written by train_service).
+
+- lbph:  OpenCV LBPH (Trainner.yml). Keeps one 16,384-float histogram per sample and
+         compares a query with every one of them; score is a distance (lower is better).
+         With LBPH_SHARED_MODEL the histograms are also exported to lbph_histograms.npy and
+         every process memory-maps that file read-only instead of parsing Trainner.yml into
+         its own copy: N server/recognition workers share one copy in the page cache.
+- lbph_compact: uniform-pattern LBP in numpy (see lbp): 59 bins per cell instead of 256 and
+         uint16 counts (or float16) instead of float32 (lbph_compact.npz), about 9x less model
+         memory with the default grid. Same chi-square distance; calibrate
+         LBPH_COMPACT_THRESHOLD with scripts/compare_lbph.py.
+- sface: OpenCV SFace CNN (cv2.FaceRecognizerSF, local ONNX file) turns each face into a
+         128-float embedding; training builds a vector index (sface_index.npz, see
+         vector_index). Score is cosine similarity (higher is better).
+
+Engines reload their model file when its mtime changes (after POST /api/train), so every
+recognition worker process picks up a new model on its next frame.
+"""
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from app.config import Config
+from app.services.lbp import describe, uniform_bins
+from app.services.vector_index import build_index, load_index, save_index
+
+ENGINES = ("lbph", "lbph_compact", "sface")
+LBPH_CONFIDENCE_THRESHOLD = 80  # Lower conf = better match; accept up to 80 (was 70)
+SHARED_HISTOGRAMS_FILENAME = "lbph_histograms.npy"
+_DISTANCE_CHUNK = 256  # histogram rows per numpy step: bounds temporaries to ~16 MB
+
+
+def _chi_square_alt(gallery, query: np.ndarray, scale: float = 1.0) -> np.ndarray:
+    """
+    OpenCV's HISTCMP_CHISQR_ALT (2 * sum((a - b)^2 / (a + b))) between query and every row of
+    gallery * scale, in chunks so reduced-precision rows are widened a few at a time.
+    """
+    distances = np.empty(len(gallery), dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for start in range(0, len(gallery), _DISTANCE_CHUNK):
+            rows = gallery[start:start + _DISTANCE_CHUNK].astype(np.float32) * np.float32(scale)
+            total, diff = rows + query, rows - query
+            distances[start:start + len(rows)] = 2 * np.where(total > 0, diff * diff / total, 0).sum(axis=1)
+    return distances
+
+
+def _nearest(distances: np.ndarray, labels: np.ndarray, excluded: frozenset):
+    """(label, distance) of the nearest row whose label is not excluded, or (-1, None)."""
+    if excluded:
+        distances[np.isin(labels, list(excluded))] = np.inf
+    if len(distances) == 0 or not np.isfinite(distances.min()):
+        return -1, None
+    best = int(distances.argmin())
+    return int(labels[best]), float(distances[best])
+
+
+class RecognizerEngine:
+    name = "base"
+    model_filename = None
+    bytes_per_sample = 0  # model memory per training sample
+
+    def __init__(self, label_path: str = None):
+        self.label_path = label_path or Config.TRAINING_LABEL_PATH
+        self._mtime = None
+
+    @property
+    def model_path(self) -> str:
+        return os.path.join(self.label_path, self.model_filename)
+
+    def is_trained(self) -> bool:
+        return os.path.isfile(self.model_path)
+
+    def load(self) -> bool:
+        """Load the model, or reload it if the file changed. Returns True if (re)loaded."""
+        path = self.model_path
+        if not os.path.exists(path):
+            raise ValueError("Model not found. Train the model first via POST /api/train")
+        mtime = os.stat(path).st_mtime_ns
+        if mtime == self._mtime:
+            return False
+        self._read(path)
+        self._mtime = mtime
+        return True
+
+    def _read(self, path: str):
+        raise NotImplementedError
+
+    def train(self, faces: list, labels: list):
+        """Train on canonical face crops with integer labels and save the model file."""
+        raise NotImplementedError
+
+    def predict(self, face: np.ndarray, excluded: frozenset = frozenset()):
+        """(label, score) of the best match whose label is not excluded, or (-1, None)."""
+        raise NotImplementedError
+
+    def accepts(self, score) -> bool:
+        raise NotImplementedError
+
+
+class LBPHEngine(RecognizerEngine):
+    name = "lbph"
+    model_filename = "Trainner.yml"
+
+    def __init__(self, label_path: str = None, shared: bool = None):
+        super().__init__(label_path)
+        self.shared = Config.LBPH_SHARED_MODEL if shared is None else shared
+        self.params = (Config.LBPH_RADIUS, Config.LBPH_NEIGHBORS, Config.LBPH_GRID_X, Config.LBPH_GRID_Y)
+        self._recognizer = None
+        self._shared = None  # read-only memmap of (label, histogram) rows
+
+    @property
+    def bytes_per_sample(self) -> int:
+        # OpenCV keeps one float32 histogram of grid_x * grid_y * 2^neighbors bins per sample
+        # (radius 1, 8 neighbors, 8x8 grid: 16,384 floats)
+        _, neighbors, grid_x, grid_y = self.params
+        return grid_x * grid_y * (1 << neighbors) * 4
+
+    @property
+    def shared_path(self) -> str:
+        return os.path.join(self.label_path, SHARED_HISTOGRAMS_FILENAME)
+
+    def load(self) -> bool:
+        if not self.shared:
+            return super().load()
+        if not os.path.exists(self.model_path):
+            raise ValueError("Model not found. Train the model first via POST /api/train")
+        # Only stat and map here: training, warm-up and scripts/prepare_shared_model.py export
+        try:
+            mtime = os.stat(self.shared_path).st_mtime_ns
+        except FileNotFoundError:
+            raise ValueError(
+                "Shared LBPH model not exported. Run python -m scripts.prepare_shared_model "
+                "or retrain via POST /api/train"
+            )
+        if mtime == self._mtime:
+            return False
+        # A retrain replaces the file: this process remaps on its next frame, and the old
+        # inode stays valid for anyone still reading it until they remap too
+        self._shared = np.load(self.shared_path, mmap_mode="r")
+        self._mtime = mtime
+        return True
+
+    def _read(self, path: str):
+        recognizer = cv2.face.LBPHFaceRecognizer_create()
+        recognizer.read(path)
+        self._recognizer = recognizer
+
+    def train(self, faces: list, labels: list):
+        recognizer = cv2.face.LBPHFaceRecognizer_create(*self.params)
+        recognizer.train(faces, np.array(labels))
+        os.makedirs(self.label_path, exist_ok=True)
+        recognizer.save(self.model_path)
+        if self.shared:
+            _save_shared(self.shared_path, recognizer)
+        self._recognizer = recognizer
+
+    def predict(self, face: np.ndarray, excluded: frozenset = frozenset()):
+        if self.shared:
+            return self._predict_shared(face, excluded)
+        if not excluded:
+            return self._recognizer.predict(face)
+        # Masked labels: collect every (label, distance) and take the nearest one left
+        collector = cv2.face.StandardCollector_create()
+        self._recognizer.predict_collect(face, collector)
+        for label, distance in collector.getResults(sorted=True):
+            if label not in excluded:
+                return label, distance
+        return -1, None
+
+    def _predict_shared(self, face: np.ndarray, excluded: frozenset):
+        # The query histogram comes from a one-sample LBPH model, so it matches OpenCV's
+        # exactly; distances are OpenCV's HISTCMP_CHISQR_ALT, as in LBPHFaceRecognizer.predict
+        probe = cv2.face.LBPHFaceRecognizer_create(*self.params)
+        probe.train([face], np.array([0]))
+        query = probe.getHistograms()[0].ravel()
+        rows = self._shared
+        if query.size != rows.dtype["histogram"].shape[0]:
+            raise ValueError("LBPH parameters changed since training. Retrain the model via POST /api/train")
+        return _nearest(_chi_square_alt(rows["histogram"], query), rows["label"], excluded)
+
+    def accepts(self, score) -> bool:
+        return score is not None and score < LBPH_CONFIDENCE_THRESHOLD
+
+
+def _save_shared(path: str, recognizer):
+    """Write an LBPH model's histograms as one .npy of (label, histogram) rows, atomically."""
+    histograms = recognizer.getHistograms()
+    labels = recognizer.getLabels().ravel()
+    bins = recognizer.getGridX() * recognizer.getGridY() * (1 << recognizer.getNeighbors())
+    rows = np.empty(len(histograms), dtype=[("label", "<i4"), ("histogram", "<f4", (bins,))])
+    rows["label"] = labels
+    for i, hist in enumerate(histograms):
+        rows["histogram"][i] = hist.ravel()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, rows)
+    os.replace(tmp, path)  # label and histogram rows change together
+
+
+def prepare_shared_model(label_path: str = None) -> bool:
+    """
+    Export Trainner.yml to lbph_histograms.npy if the export is missing or older.
+    Called by startup warm-up and scripts/prepare_shared_model.py (train writes the export
+    itself), never per frame: workers only map the file. Returns True if it exported.
+    """
+    engine = LBPHEngine(label_path, shared=True)
+    try:
+        if os.stat(engine.shared_path).st_mtime_ns >= os.stat(engine.model_path).st_mtime_ns:
+            return False
+    except FileNotFoundError:
+        if not os.path.exists(engine.model_path):
+            return False
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.read(engine.model_path)
+    _save_shared(engine.shared_path, recognizer)
+    return True
+
+
+class LBPHCompactEngine(RecognizerEngine):
+    """
+    Uniform-pattern LBPH. Histograms are stored as uint16 counts (exact; normalised by the
+    cell size at match time) or float16 frequencies (LBPH_COMPACT_DTYPE).
+    """
+    name = "lbph_compact"
+    model_filename = "lbph_compact.npz"
+
+    def __init__(self, label_path: str = None, dtype: str = None):
+        super().__init__(label_path)
+        self.params = (Config.LBPH_RADIUS, Config.LBPH_NEIGHBORS, Config.LBPH_GRID_X, Config.LBPH_GRID_Y)
+        self.dtype = np.dtype(dtype or Config.LBPH_COMPACT_DTYPE)
+        if self.dtype not in (np.uint16, np.float16):
+            raise ValueError(f"Unknown LBPH_COMPACT_DTYPE: {self.dtype} (choose uint16 or float16)")
+        self._histograms = None  # (samples, cells * bins)
+        self._labels = None
+        self._cell_pixels = None
+
+    @property
+    def bytes_per_sample(self) -> int:
+        _, neighbors, grid_x, grid_y = self.params
+        return grid_x * grid_y * uniform_bins(neighbors) * self.dtype.itemsize
+
+    def _describe(self, face: np.ndarray) -> np.ndarray:
+        return describe(face, *self.params).ravel()
+
+    def _read(self, path: str):
+        with np.load(path) as data:
+            self.params = tuple(int(v) for v in data["params"])  # as trained, whatever Config says now
+            self._histograms, self._labels = data["histograms"], data["labels"]
+            self._cell_pixels = int(data["cell_pixels"])
+
+    def train(self, faces: list, labels: list):
+        counts = np.stack([self._describe(f) for f in faces])
+        cell_pixels = int(counts[0, :uniform_bins(self.params[1])].sum())
+        histograms = counts if self.dtype == np.uint16 else (counts / cell_pixels).astype(np.float16)
+        os.makedirs(self.label_path, exist_ok=True)
+        tmp = f"{self.model_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                histograms=histograms,
+                labels=np.asarray(labels, dtype=np.int32),
+                params=np.array(self.params, dtype=np.int32),
+                cell_pixels=np.array(cell_pixels),
+            )
+        os.replace(tmp, self.model_path)
+        self._histograms, self._labels, self._cell_pixels = histograms, np.asarray(labels, dtype=np.int32), cell_pixels
+
+    def predict(self, face: np.ndarray, excluded: frozenset = frozenset()):
+        query = self._describe(face).astype(np.float32) / self._cell_pixels
+        scale = 1.0 / self._cell_pixels if self._histograms.dtype == np.uint16 else 1.0
+        return _nearest(_chi_square_alt(self._histograms, query, scale), self._labels, excluded)
+
+    def accepts(self, score) -> bool:
+        return score is not None and score < Config.LBPH_COMPACT_THRESHOLD
+
+
+class SFaceEngine(RecognizerEngine):
+    name = "sface"
+    model_filename = "sface_index.npz"
+    bytes_per_sample = 128 * 4  # one float32 embedding
+    INPUT_SIZE = (112, 112)
+
+    def __init__(self, label_path: str = None, model_path: str = None):
+        super().__init__(label_path)
+        self.onnx_path = model_path or Config.SFACE_MODEL_PATH
+        self._net = None
+        self._net_lock = threading.Lock()  # DNN forward passes are not thread-safe
+        self._index = None
+
+    def _embedder(self):
+        if self._net is None:
+            if not hasattr(cv2, "FaceRecognizerSF"):
+                raise RuntimeError("sface engine needs OpenCV >= 4.8 (cv2.FaceRecognizerSF)")
+            if not os.path.exists(self.onnx_path):
+                raise RuntimeError(f"SFace model not found: {self.onnx_path} (see backend/models/README.md)")
+            self._net = cv2.FaceRecognizerSF.create(self.onnx_path, "")
+        return self._net
+
+    def embed(self, face: np.ndarray) -> np.ndarray:
+        """L2-normalised 128-d embedding of a canonical gray crop (resized, not landmark-aligned)."""
+        bgr = cv2.cvtColor(cv2.resize(face, self.INPUT_SIZE, interpolation=cv2.INTER_AREA), cv2.COLOR_GRAY2BGR)
+        net = self._embedder()
+        with self._net_lock:
+            feature = net.feature(bgr).ravel().astype(np.float32)
+        return feature / max(float(np.linalg.norm(feature)), 1e-12)
+
+    def _read(self, path: str):
+        self._index = load_index(path)
+
+    def train(self, faces: list, labels: list):
+        vectors = np.stack([self.embed(f) for f in faces])
+        index = build_index(vectors, np.asarray(labels, dtype=np.int32))
+        os.makedirs(self.label_path, exist_ok=True)
+        save_index(self.model_path, index)
+        self._index = index
+
+    def predict(self, face: np.ndarray, excluded: frozenset = frozenset()):
+        query = self.embed(face)
+        if not excluded:
+            return next(iter(self._index.search(query, 1)), (-1, None))
+        # Masked labels: widen the search until an unmasked label shows up (a deleted student
+        # can own every one of the top k rows)
+        k = 64
+        while True:
+            k = min(k, len(self._index))
+            for label, score in self._index.search(query, k):
+                if label not in excluded:
+                    return label, score
+            if k >= len(self._index):
+                return -1, None
+            k *= 2
+
+    def accepts(self, score) -> bool:
+        return score is not None and score >= Config.SFACE_MATCH_THRESHOLD
+
+
+def create_engine(name: str = None, label_path: str = None) -> RecognizerEngine:
+    name = (name or Config.RECOGNIZER_ENGINE).lower()
+    if name == "lbph":
+        return LBPHEngine(label_path)
+    if name == "lbph_compact":
+        return LBPHCompactEngine(label_path)
+    if name == "sface":
+        return SFaceEngine(label_path)
+    raise ValueError(f"Unknown RECOGNIZER_ENGINE: {name} (choose from {', '.join(ENGINES)})")
@@ -0,0 +1,149 @@
+"""
+Bulk student import from CSV.
+Accepts StudentDetails/StudentDetails.csv (Enrollment,Name,Date,Time) or an extended
+file with Email and Password columns. Uniqueness is checked with set operations plus
+batched $in queries, passwords are hashed in parallel and rows go in via unordered insert_many.
+"""
+import csv
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from pymongo.errors import BulkWriteError
+
+from app.config import Config
+from app.database import get_students_collection
+from app.models.student import student_schema
+from app.services.collection_versions import bump
+
+QUERY_BATCH_SIZE = 1000
+INSERT_BATCH_SIZE = 1000
+
+
+def parse_students_csv(content) -> list:
+    """
+    Parse CSV text (or a text file object) into row dicts with lower-case keys.
+    Blank lines are skipped; each row keeps its 1-based line number in the file as "row".
+    """
+    stream = io.StringIO(content) if isinstance(content, str) else content
+    reader = csv.reader(stream)
+    header = None
+    rows = []
+    for line_no, values in enumerate(reader, start=1):
+        if not any(v.strip() for v in values):
+            continue
+        if header is None:
+            header = [h.strip().lower() for h in values]
+            continue
+        row = {header[i]: values[i].strip() for i in range(min(len(header), len(values)))}
+        row["row"] = line_no
+        rows.append(row)
+    if header is None:
+        raise ValueError("CSV is empty")
+    if "enrollment" not in header or "name" not in header:
+        raise ValueError("CSV must have Enrollment and Name columns")
+    return rows
+
+
+def _hash_password(password: str) -> str:
+    # bcrypt releases the GIL while hashing, so a thread pool uses every core
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+
+def _existing_values(coll, field: str, values: list) -> set:
+    """Return the subset of values already stored in field, querying in batches."""
+    found = set()
+    for i in range(0, len(values), QUERY_BATCH_SIZE):
+        chunk = values[i : i + QUERY_BATCH_SIZE]
+        for doc in coll.find({field: {"$in": chunk}}, {field: 1, "_id": 0}):
+            found.add(doc[field])
+    return found
+
+
+def import_students(
+    rows: list,
+    default_password: str = None,
+    email_domain: str = None,
+) -> dict:
+    """
+    Validate, de-duplicate, hash and insert student rows.
+    Rows without Email get "<enrollment>@<email_domain>" when email_domain is given;
+    rows without Password use default_password.
+    Returns: { total, inserted, errors: [{ row, enrollment, error }] }
+    """
+    errors = []
+    candidates = []
+    seen_enrollments = set()
+    seen_emails = set()
+
+    for row in rows:
+        enrollment = row.get("enrollment", "")
+        name = row.get("name", "")
+        email = (row.get("email") or "").lower()
+        password = row.get("password") or default_password or ""
+        if not email and email_domain and enrollment:
+            email = f"{enrollment}@{email_domain}".lower()
+
+        problems = []
+        if not enrollment:
+            problems.append("enrollment is required")
+        elif not enrollment.isdigit():
+            problems.append("enrollment must be numeric")
+        if not name:
+            problems.append("name is required")
+        if not email:
+            problems.append("email is required")
+        if len(password) < 6:
+            problems.append("password must be at least 6 characters")
+        if not problems and enrollment in seen_enrollments:
+            problems.append("Duplicate enrollment in file")
+        if not problems and email in seen_emails:
+            problems.append("Duplicate email in file")
+        if problems:
+            errors.append({"row": row.get("row"), "enrollment": enrollment, "error": "; ".join(problems)})
+            continue
+
+        seen_enrollments.add(enrollment)
+        seen_emails.add(email)
+        candidates.append({"row": row.get("row"), "enrollment": enrollment, "name": name, "email": email, "password": password})
+
+    coll = get_students_collection()
+    taken_enrollments = _existing_values(coll, "enrollment", sorted(seen_enrollments))
+    taken_emails = _existing_values(coll, "email", sorted(seen_emails))
+
+    to_insert = []
+    for c in candidates:
+        if c["enrollment"] in taken_enrollments:
+            errors.append({"row": c["row"], "enrollment": c["enrollment"], "error": "Enrollment already registered"})
+        elif c["email"] in taken_emails:
+            errors.append({"row": c["row"], "enrollment": c["enrollment"], "error": "Email already registered"})
+        else:
+            to_insert.append(c)
+
+    workers = Config.BULK_IMPORT_HASH_WORKERS or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        hashes = list(pool.map(_hash_password, [c["password"] for c in to_insert]))  # bcrypt releases the GIL
+
+    inserted = 0
+    for i in range(0, len(to_insert), INSERT_BATCH_SIZE):
+        batch = to_insert[i : i + INSERT_BATCH_SIZE]
+        docs = [
+            student_schema(c["enrollment"], c["name"], c["email"], h, image_count=0)
+            for c, h in zip(batch, hashes[i : i + INSERT_BATCH_SIZE])
+        ]
+        try:
+            result = coll.insert_many(docs, ordered=False)
+            inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            details = e.details or {}
+            inserted += details.get("nInserted", 0)
+            for err in details.get("writeErrors", []):
+                c = batch[err["index"]]
+                msg = "Enrollment or email already registered" if err.get("code") == 11000 else err.get("errmsg", "insert failed")
+                errors.append({"row": c["row"], "enrollment": c["enrollment"], "error": msg})
+
+    if inserted:
+        bump("students")
+    errors.sort(key=lambda e: e["row"] or 0)
+    return {"total": len(rows), "inserted": inserted, "errors": errors}
@@ -1,92 +1,192 @@
 """
-LBPH face model training.
-Reads images from TrainingImage/ folder, trains OpenCV LBPH, saves Trainner.yml.
+Face model training.
+Reads samples from the face store (TrainingImage/ folder or packed SQLite) and trains the
+RECOGNIZER_ENGINE (see recognizers): OpenCV LBPH -> Trainner.yml, or SFace embeddings -> sface_index.npz.
 Uses id_to_enrollment.json so predicted label (int) maps to exact enrollment string (e.g. "04").
+Each student contributes at most MAX_SAMPLES_PER_STUDENT faces, chosen for diversity.
+Deleted students are masked out of the served model (removed_labels.json) until the next train.
 """
 import json
 import os
 
 import cv2
 import numpy as np
-from PIL import Image
 
 from app.config import Config
+from app.services.detectors import get_detector
+from app.services.face_store import DirectoryFaceStore, get_face_store
+from app.services.persistence_queue import flush_persistence
+from app.services.recognizers import create_engine
+from app.utils.images import is_normalized_face, normalize_face
 
 LABELS_FILENAME = "id_to_enrollment.json"
+REMOVED_LABELS_FILENAME = "removed_labels.json"  # enrollments masked out of the model until retrain
 
 
-def _get_detector():
-    detector = cv2.CascadeClassifier(Config.HAARCASCADE_PATH)
-    if detector.empty():
-        raise RuntimeError("Haarcascade file not found or invalid")
-    return detector
-
-
-def get_images_and_labels(path: str):
+def _load_samples(store) -> list:
     """
-    Load faces and labels from images.
-    Filename: Name.enrollment.sampleNum.jpg -> enrollment is the second segment (kept as string).
-    Returns (face_samples, label_ids, id_to_enrollment) so prediction id maps to enrollment string.
+    Read every active sample from the face store in one pass. Canonical face crops are used
+    as-is; older full-frame images are detected and normalized.
+    Returns [(enrollment, face, ref)] where ref identifies the stored sample.
     """
-    detector = _get_detector()
-    image_paths = [os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith((".jpg", ".jpeg", ".png"))]
-    face_samples = []
-    enrollment_strings = []
-
-    for image_path in image_paths:
-        try:
-            pil_img = Image.open(image_path).convert("L")
-            img_np = np.array(pil_img, "uint8")
-            # Filename: Name.enrollment.sampleNum.jpg -> enrollment is the second segment
-            parts = os.path.basename(image_path).split(".")
-            if len(parts) < 4:
-                continue
-            enrollment_str = parts[1]
-        except (ValueError, IndexError, OSError):
+    detector = None
+    samples = []
+    for enrollment, ref, img in store.iter_samples():
+        if is_normalized_face(img):
+            samples.append((enrollment, img, ref))
             continue
+        if detector is None:
+            detector = get_detector()
+        for box in detector.detect(img):
+            samples.append((enrollment, normalize_face(img, box), ref))
+    return samples
 
-        faces = detector.detectMultiScale(img_np)
-        for (x, y, w, h) in faces:
-            face_samples.append(img_np[y : y + h, x : x + w])
-            enrollment_strings.append(enrollment_str)
 
+def _labels_for(enrollment_strings: list):
     # Unique enrollments in stable order; label id = index into this list
-    unique_enrollments = sorted(set(enrollment_strings))
-    id_to_enrollment = unique_enrollments
-    enrollment_to_id = {e: i for i, e in enumerate(unique_enrollments)}
-    ids = [enrollment_to_id[e] for e in enrollment_strings]
+    id_to_enrollment = sorted(set(enrollment_strings))
+    enrollment_to_id = {e: i for i, e in enumerate(id_to_enrollment)}
+    return [enrollment_to_id[e] for e in enrollment_strings], id_to_enrollment
 
+
+def get_images_and_labels(path: str = None):
+    """
+    Load faces and labels from the face store (or a TrainingImage-style folder at path).
+    Returns (face_samples, label_ids, id_to_enrollment) so prediction id maps to enrollment string.
+    """
+    store = DirectoryFaceStore(path, Config.TRAINING_ARCHIVE_PATH) if path else get_face_store()
+    samples = _load_samples(store)
+    face_samples = [face for _, face, _ in samples]
+    ids, id_to_enrollment = _labels_for([e for e, _, _ in samples])
     return face_samples, ids, id_to_enrollment
 
 
-def train_model() -> dict:
+def _diversity_feature(face: np.ndarray) -> np.ndarray:
+    """Cheap appearance descriptor: 4x4 grid of 16-bin intensity histograms, L1-normalised."""
+    small = cv2.equalizeHist(cv2.resize(face, (32, 32), interpolation=cv2.INTER_AREA))
+    cells = small.reshape(4, 8, 4, 8).transpose(0, 2, 1, 3).reshape(16, 64) // 16
+    hist = np.stack([np.bincount(c, minlength=16) for c in cells]).astype(np.float32).ravel()
+    return hist / hist.sum()
+
+
+def select_diverse(faces: list, budget: int) -> list:
     """
-    Train LBPH model on TrainingImage/ folder.
-    Saves Trainner.yml and id_to_enrollment.json for mapping predicted id -> enrollment string.
-    Returns: { success, message, studentCount?, imageCount? }
+    Farthest-point selection: start from the sample closest to the mean, then repeatedly add
+    the sample farthest (L1) from everything chosen so far. Returns sorted, unique indices into
+    faces; duplicates of chosen samples are picked only once the distinct ones run out.
     """
-    path = Config.TRAINING_IMAGE_PATH
+    if budget <= 0 or len(faces) <= budget:
+        return list(range(len(faces)))
+    feats = np.stack([_diversity_feature(f) for f in faces])
+    first = int(np.abs(feats - feats.mean(axis=0)).sum(axis=1).argmin())
+    chosen = [first]
+    min_dist = np.abs(feats - feats[first]).sum(axis=1)
+    min_dist[first] = -1
+    while len(chosen) < budget:
+        nxt = int(min_dist.argmax())
+        chosen.append(nxt)
+        min_dist = np.minimum(min_dist, np.abs(feats - feats[nxt]).sum(axis=1))
+        min_dist[chosen] = -1  # never re-pick: identical remaining faces are at distance 0, not below
+    return sorted(chosen)
+
+
+def _apply_budget(samples: list, budget: int, bytes_per_sample: int):
+    """Keep at most budget samples per student. Returns (kept_samples, per_student_report, unused_refs)."""
+    by_student = {}
+    for s in samples:
+        by_student.setdefault(s[0], []).append(s)
+
+    kept, report, used_refs, all_refs = [], [], set(), set()
+    for enrollment in sorted(by_student):
+        group = by_student[enrollment]
+        selected = [group[i] for i in select_diverse([face for _, face, _ in group], budget)]
+        kept.extend(selected)
+        used_refs.update(r for _, _, r in selected)
+        all_refs.update(r for _, _, r in group)
+        report.append({
+            "enrollment": enrollment,
+            "samples": len(group),
+            "used": len(selected),
+            "modelBytes": len(selected) * bytes_per_sample,
+        })
+    return kept, report, sorted(all_refs - used_refs)
+
+
+def _read_json(path: str, default):
     if not os.path.exists(path):
-        raise ValueError("TrainingImage folder not found")
+        return default
+    with open(path) as f:
+        return json.load(f)
 
-    face_samples, ids, id_to_enrollment = get_images_and_labels(path)
-    if not face_samples or not ids:
-        raise ValueError("No valid face images found in TrainingImage folder")
 
-    recognizer = cv2.face.LBPHFaceRecognizer_create()
-    recognizer.train(face_samples, np.array(ids))
+def _write_removed_labels(removed: list):
+    path = os.path.join(Config.TRAINING_LABEL_PATH, REMOVED_LABELS_FILENAME)
+    if not removed:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(sorted(removed), f)
+    os.replace(tmp, path)  # readers see the old or the new mask, never a partial file
 
-    os.makedirs(Config.TRAINING_LABEL_PATH, exist_ok=True)
-    model_path = os.path.join(Config.TRAINING_LABEL_PATH, "Trainner.yml")
-    recognizer.save(model_path)
+
+def remove_student_from_model(enrollment: str) -> bool:
+    """
+    Mask a student's label in the served model without retraining. Recognition skips masked
+    labels and falls through to the next-nearest student. Returns False if the student was
+    not in the model.
+    """
+    labels = _read_json(os.path.join(Config.TRAINING_LABEL_PATH, LABELS_FILENAME), [])
+    if enrollment not in labels:
+        return False
+    removed = set(_read_json(os.path.join(Config.TRAINING_LABEL_PATH, REMOVED_LABELS_FILENAME), []))
+    if enrollment not in removed:
+        removed.add(enrollment)
+        _write_removed_labels(list(removed))
+    return True
+
+
+def train_model() -> dict:
+    """
+    Train the RECOGNIZER_ENGINE model on every active sample in the face store.
+    Saves the model (Trainner.yml or sface_index.npz) and id_to_enrollment.json for mapping
+    predicted id -> enrollment string.
+    Returns: { success, message, studentCount?, imageCount?, engine?, modelBytes?, archivedCount?, students? }
+    """
+    flush_persistence(timeout=30)  # include samples still in the write-behind queue
+    store = get_face_store()
+    engine = create_engine()
+
+    samples, report, unused_refs = _apply_budget(
+        _load_samples(store), Config.MAX_SAMPLES_PER_STUDENT, engine.bytes_per_sample
+    )
+    face_samples = [face for _, face, _ in samples]
+    ids, id_to_enrollment = _labels_for([e for e, _, _ in samples])
+    if not face_samples or not ids:
+        raise ValueError("No valid face images found in the face store")
+
+    engine.train(face_samples, ids)
 
     labels_path = os.path.join(Config.TRAINING_LABEL_PATH, LABELS_FILENAME)
-    with open(labels_path, "w") as f:
+    tmp = f"{labels_path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
         json.dump(id_to_enrollment, f)
+    os.replace(tmp, labels_path)  # workers never read a half-written label list
+
+    # Students deleted while this run was reading samples stay masked; the rest are gone
+    removed = _read_json(os.path.join(Config.TRAINING_LABEL_PATH, REMOVED_LABELS_FILENAME), [])
+    _write_removed_labels([e for e in removed if e in set(id_to_enrollment)])
+
+    archived = store.archive(unused_refs) if Config.ARCHIVE_EXCESS_SAMPLES and unused_refs else 0
 
     return {
         "success": True,
         "message": "Model trained successfully",
         "studentCount": len(id_to_enrollment),
         "imageCount": len(face_samples),
+        "engine": engine.name,
+        "modelBytes": len(face_samples) * engine.bytes_per_sample,
+        "archivedCount": archived,
+        "students": report,
     }
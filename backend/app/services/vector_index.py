@@ -0,0 +1,108 @@
+"""
+Inner-product vector indexes for face embeddings (rows are L2-normalised, so inner product
+is cosine similarity).
+
+- FlatIndex: exact search, one matrix-vector product. Right for small sites.
+- IVFIndex:  inverted file. Training clusters the vectors with k-means into ~sqrt(N) lists;
+             a query scans only the VECTOR_INDEX_NPROBE lists whose centroids are closest.
+             Sub-linear search for large sites at a small recall cost.
+
+Both save to / load from a single .npz file (see save_index / load_index).
+"""
+import math
+import os
+
+import cv2
+import numpy as np
+
+from app.config import Config
+
+
+def _top(scores: np.ndarray, labels: np.ndarray, k: int) -> list:
+    """[(label, score)] for the k best scores, best first."""
+    if len(scores) == 0:
+        return []
+    k = min(k, len(scores))
+    idx = np.argpartition(-scores, k - 1)[:k]
+    idx = idx[np.argsort(-scores[idx])]
+    return [(int(labels[i]), float(scores[i])) for i in idx]
+
+
+class FlatIndex:
+    kind = "flat"
+
+    def __init__(self, vectors: np.ndarray, labels: np.ndarray):
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.labels = np.asarray(labels, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def search(self, query: np.ndarray, k: int = 1) -> list:
+        return _top(self.vectors @ query, self.labels, k)
+
+    def arrays(self) -> dict:
+        return {"vectors": self.vectors, "labels": self.labels}
+
+
+class IVFIndex:
+    kind = "ivf"
+
+    def __init__(self, vectors: np.ndarray, labels: np.ndarray, centroids: np.ndarray, offsets: np.ndarray, nprobe: int = None):
+        # vectors/labels are grouped by list: list i is rows offsets[i]:offsets[i + 1]
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.labels = np.asarray(labels, dtype=np.int32)
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.nprobe = nprobe or Config.VECTOR_INDEX_NPROBE
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, labels: np.ndarray, nlist: int = None):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        nlist = max(1, min(len(vectors), nlist or int(math.sqrt(len(vectors)))))
+        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 1e-4)
+        _, assignment, centroids = cv2.kmeans(vectors, nlist, None, criteria, 1, cv2.KMEANS_PP_CENTERS)
+        assignment = assignment.ravel()
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.searchsorted(assignment[order], np.arange(nlist + 1))
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        return cls(vectors[order], np.asarray(labels)[order], centroids / np.maximum(norms, 1e-12), offsets)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def search(self, query: np.ndarray, k: int = 1) -> list:
+        nprobe = min(self.nprobe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        rows = np.concatenate([np.arange(self.offsets[i], self.offsets[i + 1]) for i in lists])
+        return _top(self.vectors[rows] @ query, self.labels[rows], k)
+
+    def arrays(self) -> dict:
+        return {"vectors": self.vectors, "labels": self.labels, "centroids": self.centroids, "offsets": self.offsets}
+
+
+def build_index(vectors: np.ndarray, labels: np.ndarray, kind: str = None):
+    """kind: flat | ivf | auto (ivf from VECTOR_INDEX_IVF_MIN_SAMPLES vectors up). Default: VECTOR_INDEX."""
+    kind = (kind or Config.VECTOR_INDEX).lower()
+    if kind == "auto":
+        kind = "ivf" if len(vectors) >= Config.VECTOR_INDEX_IVF_MIN_SAMPLES else "flat"
+    if kind == "flat":
+        return FlatIndex(vectors, labels)
+    if kind == "ivf":
+        return IVFIndex.build(vectors, labels)
+    raise ValueError(f"Unknown VECTOR_INDEX: {kind} (choose flat, ivf or auto)")
+
+
+def save_index(path: str, index):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, kind=np.array(index.kind), **index.arrays())
+    os.replace(tmp, path)  # readers see the old or the new index, never a partial file
+
+
+def load_index(path: str):
+    with np.load(path) as data:
+        kind = str(data["kind"])
+        if kind == "ivf":
+            return IVFIndex(data["vectors"], data["labels"], data["centroids"], data["offsets"])
+        return FlatIndex(data["vectors"], data["labels"])
@@ -0,0 +1,123 @@
+"""
+Startup warm-up and readiness state.
+Connects to MongoDB, ensures indexes, loads the face detector and the current recognizer model
+and runs one dummy prediction, so the first real requests after a deploy are not slow.
+Each step's duration and outcome is cached for GET /ready (which never touches the DB).
+"""
+import threading
+import time
+from datetime import datetime
+
+from app.config import Config
+from app.database import connect_db, ensure_indexes
+
+# Components that must be "ok" for the instance to report ready. The model may be
+# "missing" on a fresh install (nothing trained yet) and an index error (e.g. a conflicting
+# existing index) is reported but, as before, does not block traffic.
+REQUIRED_COMPONENTS = ("database", "cascade")
+
+_lock = threading.Lock()
+_state = {
+    "ready": False,
+    "warmedUp": False,
+    "startedAt": None,
+    "finishedAt": None,
+    "components": {},
+}
+
+
+def _run_step(name: str, fn):
+    started = time.perf_counter()
+    try:
+        status, detail = fn()
+    except Exception as e:
+        status, detail = "error", str(e)
+    entry = {"status": status, "ms": round((time.perf_counter() - started) * 1000, 1)}
+    if detail:
+        entry["detail"] = detail
+    with _lock:
+        _state["components"][name] = entry
+    return status
+
+
+def _database():
+    connect_db().command("ping")
+    return "ok", None
+
+
+def _indexes():
+    error = ensure_indexes()
+    return ("error", error) if error else ("ok", None)
+
+
+def _cascade():
+    from app.services.detectors import get_detector
+
+    return "ok", get_detector().name
+
+
+def _model():
+    from app.services.attendance_service import _load_recognizer
+    from app.services.recognizers import create_engine, prepare_shared_model
+
+    if Config.RECOGNIZER_ENGINE == "lbph" and Config.LBPH_SHARED_MODEL:
+        prepare_shared_model()  # export once here; workers then only map the file
+    if Config.RECOGNITION_WORKERS > 0:
+        # Workers load (and predict with) the model; avoid another copy in this process
+        trained = create_engine().is_trained()
+        return ("ok", "loaded by recognition workers") if trained else ("missing", "Model not trained yet")
+    try:
+        engine = _load_recognizer()
+    except ValueError as e:
+        return "missing", str(e)
+    import numpy as np
+
+    engine.predict(np.zeros((Config.FACE_CROP_SIZE, Config.FACE_CROP_SIZE), dtype=np.uint8))  # first predict allocates internals
+    return "ok", engine.name
+
+
+def _recognition_pool():
+    from app.services.recognition_pool import get_recognition_pool
+
+    pool = get_recognition_pool()
+    if pool is None:
+        return "disabled", None
+    pool.warm_up()
+    return "ok", f"{pool.workers} workers"
+
+
+def warm_up() -> dict:
+    """Run every warm-up step in order and return the resulting readiness state."""
+    with _lock:
+        _state["startedAt"] = datetime.utcnow().isoformat()
+    _run_step("database", _database)
+    _run_step("indexes", _indexes)
+    _run_step("cascade", _cascade)
+    _run_step("model", _model)
+    _run_step("recognitionPool", _recognition_pool)
+    with _lock:
+        components = _state["components"]
+        _state["ready"] = all(components.get(c, {}).get("status") == "ok" for c in REQUIRED_COMPONENTS)
+        _state["warmedUp"] = True
+        _state["finishedAt"] = datetime.utcnow().isoformat()
+    return get_readiness()
+
+
+def start_warm_up(background: bool = True):
+    """Start warm-up; in the background the server can bind while /ready still reports 503."""
+    if background:
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    else:
+        warm_up()
+
+
+def get_readiness() -> dict:
+    """Cached readiness snapshot (no I/O)."""
+    with _lock:
+        return {
+            "ready": _state["ready"],
+            "warmedUp": _state["warmedUp"],
+            "startedAt": _state["startedAt"],
+            "finishedAt": _state["finishedAt"],
+            "components": {k: dict(v) for k, v in _state["components"].items()},
+        }
@@ -0,0 +1,29 @@
+"""
+Route guards for JWT bearer tokens issued by POST /api/auth/login.
+"""
+from functools import wraps
+
+import jwt
+from flask import jsonify, request
+
+from app.services.auth_service import decode_token
+
+
+def admin_required(view):
+    """Reject the request with 401 (no or bad token) or 403 (not an admin) before calling view."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        header = request.headers.get("Authorization", "")
+        token = header[7:].strip() if header[:7].lower() == "bearer " else ""
+        if not token:
+            return jsonify({"error": "Authorization: Bearer <token> required"}), 401
+        try:
+            payload = decode_token(token)
+        except jwt.InvalidTokenError:
+            return jsonify({"error": "Invalid or expired token"}), 401
+        if payload.get("role") != "admin":
+            return jsonify({"error": "Admin only"}), 403
+        return view(*args, **kwargs)
+
+    return wrapper
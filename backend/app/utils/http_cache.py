@@ -0,0 +1,148 @@
+"""
+HTTP caching helpers.
+- Conditional GET for versioned lists: the ETag comes from the collection's version
+  counter (app.services.collection_versions), so a 304 never queries the list itself, and
+  200 bodies are served from the serialized-body cache.
+  The lists are ETag-only, by design: Last-Modified has one-second resolution, so two writes
+  in the same second would answer If-Modified-Since with a 304 for the stale list. Every
+  browser and HTTP cache revalidates with If-None-Match when it has an ETag.
+- gzip for JSON / CSV bodies of at least COMPRESS_MIN_BYTES when the client accepts it.
+Flask and Quart variants share the same header logic.
+"""
+import gzip
+import hashlib
+
+from app.config import Config
+from app.services.collection_versions import cached_body, cached_body_async, current, current_async
+
+COMPRESSIBLE = ("application/json", "text/csv")
+
+
+def _validators(name: str, version: int, variant) -> dict:
+    digest = hashlib.sha1(repr(variant).encode("utf-8")).hexdigest()[:12]
+    return {"ETag": f'"{name}-{version}-{digest}"', "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+
+def _gzip_etag(etag: str) -> str:
+    return etag[:-1] + '-gzip"'  # the gzip body is a different representation: its own strong ETag
+
+
+def not_modified_etag(request_headers, etag: str):
+    """
+    The ETag to send with a 304 when If-None-Match matches this version in either encoding,
+    else None (no Last-Modified / If-Modified-Since; see the module docstring).
+    """
+    if_none_match = request_headers.get("If-None-Match")
+    if not if_none_match:
+        return None
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    if "*" in tags:
+        return etag
+    for candidate in (etag, _gzip_etag(etag)):
+        if candidate in tags:
+            return candidate
+    return None
+
+
+def accepts_gzip(request_headers) -> bool:
+    for part in request_headers.get("Accept-Encoding", "").split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def should_compress(request_headers, mimetype: str, size: int) -> bool:
+    return (
+        Config.COMPRESS_MIN_BYTES > 0
+        and size >= Config.COMPRESS_MIN_BYTES
+        and mimetype in COMPRESSIBLE
+        and accepts_gzip(request_headers)
+    )
+
+
+def gzip_body(body: bytes) -> bytes:
+    return gzip.compress(body, Config.COMPRESS_LEVEL, mtime=0)  # mtime=0: identical bytes for identical input
+
+
+def _compressible(response) -> bool:
+    return (
+        response.status_code == 200
+        and "Content-Encoding" not in response.headers
+        and response.mimetype in COMPRESSIBLE
+    )
+
+
+def compress_response(response):
+    """Flask after_request hook: gzip large JSON / CSV responses."""
+    from flask import request
+
+    if not _compressible(response) or response.is_streamed or response.direct_passthrough:
+        return response
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if should_compress(request.headers, response.mimetype, len(body)):
+        response.set_data(gzip_body(body))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+async def compress_response_async(response):
+    """Quart after_request hook: gzip large JSON / CSV responses."""
+    from quart import request
+    from quart.wrappers.response import DataBody
+
+    # Only in-memory bodies: generators (Parquet / Arrow exports) and files stream through
+    if not _compressible(response) or not isinstance(response.response, DataBody):
+        return response
+    response.vary.add("Accept-Encoding")
+    body = await response.get_data()
+    if should_compress(request.headers, response.mimetype, len(body)):
+        response.set_data(gzip_body(body))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+def _encoded(request_headers, name: str, version: int, variant, body: bytes, headers: dict) -> bytes:
+    if should_compress(request_headers, "application/json", len(body)):
+        headers["Content-Encoding"] = "gzip"
+        headers["ETag"] = _gzip_etag(headers["ETag"])
+        return cached_body(name, version, (variant, "gzip"), lambda: gzip_body(body))
+    return body
+
+
+def versioned_json(name: str, variant, build):
+    """
+    Flask response for a list backed by collection `name`. variant identifies the query
+    (e.g. skip/limit); build() returns the payload and runs only when the body is not cached.
+    """
+    from flask import Response, current_app, request
+
+    version, _ = current(name)
+    headers = _validators(name, version, variant)
+    matched = not_modified_etag(request.headers, headers["ETag"])
+    if matched:
+        headers["ETag"] = matched
+        return Response(status=304, headers=headers)
+    body = cached_body(name, version, variant, lambda: current_app.json.dumps(build()).encode("utf-8"))
+    body = _encoded(request.headers, name, version, variant, body, headers)
+    return Response(body, mimetype="application/json", headers=headers)
+
+
+async def versioned_json_async(name: str, variant, build):
+    """versioned_json() for Quart views; build() is a coroutine function."""
+    from quart import Response, current_app, request
+
+    version, _ = await current_async(name)
+    headers = _validators(name, version, variant)
+    matched = not_modified_etag(request.headers, headers["ETag"])
+    if matched:
+        headers["ETag"] = matched
+        return Response("", status=304, headers=headers)
+
+    async def serialize():
+        return current_app.json.dumps(await build()).encode("utf-8")
+
+    body = await cached_body_async(name, version, variant, serialize)
+    body = _encoded(request.headers, name, version, variant, body, headers)
+    return Response(body, mimetype="application/json", headers=headers)
@@ -0,0 +1,48 @@
+"""
+Image helpers shared by upload, attendance, training and prediction.
+Every face that is stored or fed to LBPH goes through normalize_face(), so crops have one
+canonical size (FACE_CROP_SIZE x FACE_CROP_SIZE grayscale): LBP encoding cost per predict is
+constant and TrainingImage/ holds small face crops instead of full camera frames.
+"""
+import base64
+
+import cv2
+import numpy as np
+
+from app.config import Config
+
+
+def decode_base64_image(image_base64: str, flags: int = cv2.IMREAD_COLOR) -> np.ndarray:
+    """Decode a base64 (optionally data-URL) image. Raises ValueError on bad input."""
+    try:
+        if "," in image_base64:
+            image_base64 = image_base64.split(",", 1)[1]
+        img_bytes = base64.b64decode(image_base64)
+        nparr = np.frombuffer(img_bytes, np.uint8)
+        img = cv2.imdecode(nparr, flags)
+        if img is None:
+            raise ValueError("Invalid image data")
+    except Exception as e:
+        raise ValueError(f"Invalid base64 image: {e}") from e
+    return img
+
+
+def normalize_face(gray: np.ndarray, box, margin: float = None, size: int = None) -> np.ndarray:
+    """
+    Crop box (x, y, w, h) from a grayscale image with a relative margin on every side
+    (clamped to the image) and resize to the canonical size x size.
+    """
+    margin = Config.FACE_CROP_MARGIN if margin is None else margin
+    size = Config.FACE_CROP_SIZE if size is None else size
+    x, y, w, h = (int(v) for v in box)
+    dx, dy = int(w * margin), int(h * margin)
+    x0, y0 = max(0, x - dx), max(0, y - dy)
+    x1, y1 = min(gray.shape[1], x + w + dx), min(gray.shape[0], y + h + dy)
+    crop = gray[y0:y1, x0:x1]
+    interpolation = cv2.INTER_AREA if crop.shape[0] > size else cv2.INTER_LINEAR
+    return cv2.resize(crop, (size, size), interpolation=interpolation)
+
+
+def is_normalized_face(img: np.ndarray) -> bool:
+    """True for images already stored as canonical face crops (no detection needed)."""
+    return img.ndim == 2 and img.shape[0] == img.shape[1] == Config.FACE_CROP_SIZE
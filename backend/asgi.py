@@ -0,0 +1,6 @@
+"""
+Async serving mode. Run: hypercorn asgi:app --bind 0.0.0.0:5001 --workers 2
+"""
+from app import create_async_app
+
+app = create_async_app()
@@ -1,8 +1,18 @@
 import os
+import sys
+
+if __name__ == "__main__" and "--profile-startup" in sys.argv:
+    # Before importing app, so its imports are timed too
+    from scripts.profile_startup import main
+
+    sys.exit(main(sys.argv[1:]))
+
 from app import create_app
 
 app = create_app()
 port = int(os.getenv("PORT", 5001))
 
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=port)
+    # threaded: each request gets its own thread; CPU-heavy recognition runs in the
+    # RECOGNITION_WORKERS process pool so cheap endpoints are not queued behind it
+    app.run(debug=True, host="0.0.0.0", port=port, threaded=True)
@@ -0,0 +1 @@
+# Scripts package - command-line tools, run from backend/ as `python -m scripts.<name>`
@@ -0,0 +1,171 @@
+"""
+Sweep face detector settings (scaleFactor, minNeighbors, minSize, input downscale) over a
+labeled image set, print the latency/recall Pareto front, and write the fastest setting
+that meets --target-recall as a profile that Config loads (DETECTOR_PROFILE_PATH).
+
+Image sets:
+- default: face store samples pasted onto a 640x480 canvas (one known box each, as in
+  scripts/benchmark_detectors.py)
+- --images DIR --labels labels.json: {"frame1.jpg": [[x, y, w, h], ...], ...}
+- --images DIR without labels: every image is assumed to hold one face (any detection counts)
+
+Usage (from backend/):
+  python -m scripts.autotune_detector --target-recall 0.95
+  python -m scripts.autotune_detector --images ../classroom --labels ../classroom/labels.json --backends haar_default,lbp
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import cv2
+
+from app.config import Config
+from app.services.detectors import create_detector
+from app.services.face_store import IMAGE_EXTENSIONS
+from scripts.benchmark_detectors import _iou, load_frames
+
+MATCH_IOU = 0.3
+
+
+def _floats(text):
+    return [float(v) for v in text.split(",") if v.strip()]
+
+
+def _ints(text):
+    return [int(v) for v in text.split(",") if v.strip()]
+
+
+def load_labeled(images_dir: str, labels_path: str, limit: int) -> list:
+    """[(gray, [boxes] or None)] — None means one face somewhere in the image."""
+    labels = {}
+    if labels_path:
+        with open(labels_path) as f:
+            labels = {name: [tuple(b) for b in boxes] for name, boxes in json.load(f).items()}
+    names = sorted(labels) if labels else sorted(f for f in os.listdir(images_dir) if f.lower().endswith(IMAGE_EXTENSIONS))
+    frames = []
+    for name in names[: limit or None]:
+        gray = cv2.imread(os.path.join(images_dir, name), cv2.IMREAD_GRAYSCALE)
+        if gray is not None:
+            frames.append((gray, labels.get(name)))
+    return frames
+
+
+def evaluate(detector, frames: list) -> dict:
+    detector.detect(frames[0][0])  # warm-up
+    latencies, truths, matched, false_pos = [], 0, 0, 0
+    for gray, boxes in frames:
+        started = time.perf_counter()
+        found = detector.detect(gray)
+        latencies.append(time.perf_counter() - started)
+        if boxes is None:
+            truths += 1
+            matched += bool(found)
+            continue
+        unused = list(found)
+        for truth in boxes:
+            truths += 1
+            best = max(unused, key=lambda b: _iou(b, truth), default=None)
+            if best is not None and _iou(best, truth) >= MATCH_IOU:
+                matched += 1
+                unused.remove(best)
+        false_pos += len(unused)
+    latencies.sort()
+    n = len(frames)
+    return {
+        "recall": round(matched / truths, 4) if truths else 0.0,
+        "falsePositivesPerImage": round(false_pos / n, 3),
+        "p50Ms": round(latencies[n // 2] * 1000, 2),
+        "meanMs": round(sum(latencies) / n * 1000, 2),
+    }
+
+
+def pareto_front(results: list) -> list:
+    """Results that no other result beats on both latency (lower) and recall (higher)."""
+    front, best_recall = [], -1.0
+    for r in sorted(results, key=lambda r: (r["metrics"]["p50Ms"], -r["metrics"]["recall"])):
+        if r["metrics"]["recall"] > best_recall:
+            front.append(r)
+            best_recall = r["metrics"]["recall"]
+    return front
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune detectMultiScale settings for this deployment")
+    parser.add_argument("--backends", default="haar_default", help="Comma-separated detectors to sweep")
+    parser.add_argument("--images", help="Folder of images (default: face store samples on a canvas)")
+    parser.add_argument("--labels", help="JSON of ground-truth boxes per image file")
+    parser.add_argument("--limit", type=int, default=200, help="Max images (0 = all)")
+    parser.add_argument("--scale-factors", default="1.05,1.1,1.2,1.3")
+    parser.add_argument("--min-neighbors", default="3,5,7")
+    parser.add_argument("--min-sizes", default="0,40,80", help="Minimum face size in full-frame pixels")
+    parser.add_argument("--downscales", default="1.0,0.75,0.5", help="Input resize factors")
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("--max-false-positives", type=float, default=0.1, help="Per image, on labeled sets")
+    parser.add_argument("--output", default=Config.DETECTOR_PROFILE_PATH)
+    parser.add_argument("--dry-run", action="store_true", help="Report only; do not write the profile")
+    args = parser.parse_args(argv)
+
+    if args.images:
+        frames = load_labeled(args.images, args.labels, args.limit)
+    else:
+        frames = [(f, [box] if box else None) for f, box in load_frames(None, args.limit, (640, 480), 0)]
+    if not frames:
+        print("No images found", file=sys.stderr)
+        return 1
+
+    grid = list(itertools.product(
+        _floats(args.scale_factors), _ints(args.min_neighbors), _ints(args.min_sizes), _floats(args.downscales)
+    ))
+    results = []
+    for backend in (b.strip() for b in args.backends.split(",") if b.strip()):
+        try:
+            detector = create_detector(backend)
+        except (RuntimeError, ValueError) as e:
+            print(f"skipping {backend}: {e}", file=sys.stderr)
+            continue
+        combos = grid if backend != "yunet" else sorted({(None, None, m, d) for _, _, m, d in grid}, key=str)
+        for scale_factor, min_neighbors, min_size, downscale in combos:
+            if scale_factor is not None:
+                detector.scale_factor, detector.min_neighbors = scale_factor, min_neighbors
+            detector.min_size, detector.downscale = min_size, downscale
+            settings = {"detector": backend, "minSize": min_size, "downscale": downscale}
+            if scale_factor is not None:
+                settings.update({"scaleFactor": scale_factor, "minNeighbors": min_neighbors})
+            results.append({"settings": settings, "metrics": evaluate(detector, frames)})
+        print(f"{backend}: {len(combos)} settings on {len(frames)} images", file=sys.stderr)
+    if not results:
+        return 1
+
+    front = pareto_front(results)
+    eligible = [
+        r for r in results
+        if r["metrics"]["recall"] >= args.target_recall
+        and r["metrics"]["falsePositivesPerImage"] <= args.max_false_positives
+    ]
+    chosen = min(eligible, key=lambda r: r["metrics"]["p50Ms"]) if eligible else None
+    report = {
+        "generatedAt": datetime.utcnow().isoformat(),
+        "images": len(frames),
+        "targetRecall": args.target_recall,
+        "settings": chosen["settings"] if chosen else None,
+        "metrics": chosen["metrics"] if chosen else None,
+        "pareto": front,
+    }
+    print(json.dumps(report, indent=2))
+    if not chosen:
+        best = max(results, key=lambda r: r["metrics"]["recall"])
+        print(f"No setting reaches recall {args.target_recall} (best: {best['metrics']['recall']}); profile not written", file=sys.stderr)
+        return 1
+    if not args.dry_run:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Profile written to {args.output}; restart the server to apply it", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
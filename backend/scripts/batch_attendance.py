@@ -0,0 +1,51 @@
+"""
+Record attendance from a lecture recording: a video file or a folder of photos.
+
+Usage (from backend/):
+  python -m scripts.batch_attendance ../recordings/maths-2024-03-04.mp4 --subject Maths --date 2024-03-04 --start-time 09:00:00
+  python -m scripts.batch_attendance ../photos/physics --subject Physics --stride 1 --dry-run
+"""
+import argparse
+import json
+import sys
+
+from app.services.batch_service import run_batch
+
+
+def _progress(stats):
+    print(f"  {stats['framesSampled']} frames sampled, {stats['fps']} fps", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline attendance from a video file or image folder")
+    parser.add_argument("source", help="Video file or folder of images")
+    parser.add_argument("--subject", required=True)
+    parser.add_argument("--stride", type=int, help="Recognize every Nth frame / image (default: BATCH_FRAME_STRIDE)")
+    parser.add_argument("--date", help="Attendance date YYYY-MM-DD (default: today)")
+    parser.add_argument("--start-time", help="When the recording started, HH:MM:SS (default: now)")
+    parser.add_argument("--workers", type=int, help="Recognition processes (default: BATCH_WORKERS or CPU count)")
+    parser.add_argument("--min-frames", type=int, help="Sampled frames a student must be seen in (default: BATCH_MIN_FRAMES)")
+    parser.add_argument("--dry-run", action="store_true", help="Recognize and report, but do not write attendance")
+    args = parser.parse_args(argv)
+
+    try:
+        report = run_batch(
+            args.source,
+            args.subject,
+            stride=args.stride,
+            date=args.date,
+            start_time=args.start_time,
+            workers=args.workers,
+            min_frames=args.min_frames,
+            dry_run=args.dry_run,
+            progress=_progress,
+        )
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Compare face detector backends (app/services/detectors.py) on our own samples.
+Each stored sample holds exactly one face, so recall = share of samples where the detector
+finds it. Canonical crops (FACE_CROP_SIZE squares) are pasted onto a larger gray canvas at a
+random position first, so detectors see a kiosk-sized frame and the true box is known.
+Reports per-backend recall, multi-detection rate and latency, and recommends the fastest
+backend that meets --target-recall.
+
+Usage (from backend/):
+  python -m scripts.benchmark_detectors
+  python -m scripts.benchmark_detectors --images ../TrainingImage --backends haar_default,haar_alt,lbp,yunet --target-recall 0.97
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from app.services.detectors import DETECTORS, create_detector
+from app.services.face_store import IMAGE_EXTENSIONS, get_face_store
+from app.utils.images import is_normalized_face
+
+
+def _iou(a, b) -> float:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    return inter / float(aw * ah + bw * bh - inter) if inter else 0.0
+
+
+def _to_frame(img: np.ndarray, canvas, rng: random.Random):
+    """(frame, true_box or None). Canonical crops are pasted onto a canvas; other images are used as-is."""
+    if not is_normalized_face(img):
+        return img, None
+    cw, ch = canvas
+    size = min(img.shape[0], cw, ch)
+    x, y = rng.randrange(0, cw - size + 1), rng.randrange(0, ch - size + 1)
+    frame = np.full((ch, cw), 128, dtype=np.uint8)
+    frame[y:y + size, x:x + size] = cv2.resize(img, (size, size))
+    return frame, (x, y, size, size)
+
+
+def load_frames(images_dir: str, limit: int, canvas, seed: int) -> list:
+    rng = random.Random(seed)
+    if images_dir:
+        paths = sorted(f for f in os.listdir(images_dir) if f.lower().endswith(IMAGE_EXTENSIONS))
+        imgs = (cv2.imread(os.path.join(images_dir, f), cv2.IMREAD_GRAYSCALE) for f in paths)
+    else:
+        imgs = (img for _, _, img in get_face_store().iter_samples())
+    frames = []
+    for img in imgs:
+        if img is None:
+            continue
+        frames.append(_to_frame(img, canvas, rng))
+        if limit and len(frames) >= limit:
+            break
+    return frames
+
+
+def benchmark(detector, frames: list) -> dict:
+    detector.detect(frames[0][0])  # first call allocates internals
+    latencies, found, multi = [], 0, 0
+    for frame, truth in frames:
+        started = time.perf_counter()
+        boxes = detector.detect(frame)
+        latencies.append(time.perf_counter() - started)
+        if truth is None:
+            found += len(boxes) > 0
+        else:
+            found += any(_iou(b, truth) >= 0.3 for b in boxes)
+        multi += len(boxes) > 1
+    latencies.sort()
+    n = len(frames)
+    return {
+        "images": n,
+        "recall": round(found / n, 4),
+        "multiFaceRate": round(multi / n, 4),
+        "meanMs": round(sum(latencies) / n * 1000, 2),
+        "p50Ms": round(latencies[n // 2] * 1000, 2),
+        "p95Ms": round(latencies[min(n - 1, int(n * 0.95))] * 1000, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare face detector backends on stored samples")
+    parser.add_argument("--backends", default=",".join(DETECTORS), help=f"Comma-separated subset of {', '.join(DETECTORS)}")
+    parser.add_argument("--images", help="Folder of images, one face each (default: the face store)")
+    parser.add_argument("--limit", type=int, default=500, help="Max images (0 = all)")
+    parser.add_argument("--canvas", default="640x480", help="Frame size canonical crops are pasted into")
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    canvas = tuple(int(v) for v in args.canvas.lower().split("x"))
+    frames = load_frames(args.images, args.limit, canvas, args.seed)
+    if not frames:
+        print("No images found", file=sys.stderr)
+        return 1
+
+    results = {}
+    for name in (b.strip() for b in args.backends.split(",") if b.strip()):
+        try:
+            detector = create_detector(name)
+        except (RuntimeError, ValueError) as e:
+            results[name] = {"error": str(e)}
+            continue
+        results[name] = benchmark(detector, frames)
+
+    eligible = [n for n, r in results.items() if "error" not in r and r["recall"] >= args.target_recall]
+    report = {
+        "targetRecall": args.target_recall,
+        "backends": results,
+        "recommended": min(eligible, key=lambda n: results[n]["p50Ms"]) if eligible else None,
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
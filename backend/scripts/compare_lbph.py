@@ -0,0 +1,124 @@
+"""
+Compare the compact LBPH engine (uniform patterns, uint16 / float16 storage) with the current
+OpenCV LBPH baseline on the face store: every --holdout-every-th sample of each student is a
+query, the rest are trained on. Models are trained in a temporary folder; the served model is
+not touched.
+
+Reports, per engine: model bytes, rank-1 accuracy, accepted-correct / false-accept rates at
+the engine's threshold, p50 predict latency and agreement with the baseline. For the compact
+engines it also suggests the LBPH_COMPACT_THRESHOLD that accepts as many queries as lbph does.
+
+Usage (from backend/):
+  python -m scripts.compare_lbph [--holdout-every 5] [--limit 5000]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from app.services.face_store import get_face_store
+from app.services.recognizers import LBPHCompactEngine, LBPHEngine
+from app.services.train_service import _labels_for, _load_samples
+
+
+def split(samples: list, every: int):
+    """Per student, every `every`-th sample becomes a query (students with one sample only train)."""
+    by_student = {}
+    for enrollment, face, _ in samples:
+        by_student.setdefault(enrollment, []).append(face)
+    gallery, queries = [], []
+    for enrollment in sorted(by_student):
+        faces = by_student[enrollment]
+        for i, face in enumerate(faces):
+            (queries if len(faces) > 1 and i % every == every - 1 else gallery).append((enrollment, face))
+    return gallery, queries
+
+
+def evaluate(engine, gallery: list, queries: list) -> tuple:
+    labels, id_to_enrollment = _labels_for([e for e, _ in gallery])
+    started = time.perf_counter()
+    engine.train([f for _, f in gallery], labels)
+    train_seconds = time.perf_counter() - started
+    engine.load()
+
+    predictions, latencies = [], []
+    correct = accepted_correct = false_accepts = 0
+    for enrollment, face in queries:
+        started = time.perf_counter()
+        label, score = engine.predict(face)
+        latencies.append(time.perf_counter() - started)
+        predicted = id_to_enrollment[label] if label >= 0 else None
+        predictions.append((predicted, score))
+        correct += predicted == enrollment
+        if engine.accepts(score):
+            accepted_correct += predicted == enrollment
+            false_accepts += predicted != enrollment
+    latencies.sort()
+    n = len(queries)
+    report = {
+        "engine": engine.name,
+        "modelBytes": len(gallery) * engine.bytes_per_sample,
+        "modelFileBytes": os.path.getsize(engine.model_path),
+        "trainSeconds": round(train_seconds, 2),
+        "rank1Accuracy": round(correct / n, 4),
+        "acceptedCorrectRate": round(accepted_correct / n, 4),
+        "falseAcceptRate": round(false_accepts / n, 4),
+        "p50PredictMs": round(latencies[n // 2] * 1000, 2),
+    }
+    return report, predictions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Accuracy and memory of lbph_compact vs lbph")
+    parser.add_argument("--holdout-every", type=int, default=5, help="Every Nth sample per student is a query")
+    parser.add_argument("--limit", type=int, default=0, help="Max samples to read (0 = all)")
+    args = parser.parse_args(argv)
+
+    samples = _load_samples(get_face_store())
+    if args.limit:
+        samples = samples[: args.limit]
+    gallery, queries = split(samples, max(2, args.holdout_every))
+    if not gallery or not queries:
+        print("Need students with at least two samples", file=sys.stderr)
+        return 1
+
+    workdir = tempfile.mkdtemp(prefix="compare_lbph_")
+    try:
+        engines = [
+            LBPHEngine(os.path.join(workdir, "lbph"), shared=False),
+            LBPHCompactEngine(os.path.join(workdir, "uint16"), "uint16"),
+            LBPHCompactEngine(os.path.join(workdir, "float16"), "float16"),
+        ]
+        baseline, base_predictions = evaluate(engines[0], gallery, queries)
+        base_accept_rate = sum(engines[0].accepts(s) for _, s in base_predictions) / len(queries)
+        reports = [baseline]
+        for engine in engines[1:]:
+            report, predictions = evaluate(engine, gallery, queries)
+            report["dtype"] = str(engine.dtype)
+            report["memoryReduction"] = round(baseline["modelBytes"] / report["modelBytes"], 1)
+            report["agreementWithBaseline"] = round(
+                sum(p == b for (p, _), (b, _) in zip(predictions, base_predictions)) / len(queries), 4
+            )
+            scores = [s for _, s in predictions if s is not None]
+            if scores and base_accept_rate > 0:
+                report["thresholdMatchingBaselineAcceptRate"] = round(float(np.quantile(scores, base_accept_rate)), 2)
+            reports.append(report)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps({
+        "students": len({e for e, _ in gallery}),
+        "gallerySamples": len(gallery),
+        "queries": len(queries),
+        "engines": reports,
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""
+Migrate the desktop app's CSV history into MongoDB.
+
+Usage (from backend/):
+  python -m scripts.import_legacy --students ../StudentDetails/StudentDetails.csv --attendance ../Attendance
+"""
+import argparse
+import json
+import sys
+import time
+
+from app.services.legacy_import_service import import_legacy_students, import_legacy_attendance
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import legacy StudentDetails / Attendance CSVs into MongoDB")
+    parser.add_argument("--students", help="Path to StudentDetails.csv")
+    parser.add_argument("--attendance", help="Directory with <Subject>.csv attendance files")
+    parser.add_argument("--email-domain", default="legacy.local", help="Placeholder email domain for imported students")
+    args = parser.parse_args(argv)
+    if not args.students and not args.attendance:
+        parser.error("nothing to import: pass --students and/or --attendance")
+
+    report = {}
+    started = time.perf_counter()
+    if args.students:
+        report["students"] = import_legacy_students(args.students, email_domain=args.email_domain)
+    if args.attendance:
+        report["attendance"] = import_legacy_attendance(args.attendance)
+    report["seconds"] = round(time.perf_counter() - started, 2)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
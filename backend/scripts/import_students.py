@@ -0,0 +1,36 @@
+"""
+Bulk import students from a CSV file.
+
+Usage (from backend/):
+  python -m scripts.import_students ../StudentDetails/StudentDetails.csv \\
+      --email-domain school.edu --default-password changeme123
+"""
+import argparse
+import json
+import sys
+import time
+
+from app.services.student_import_service import parse_students_csv, import_students
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import students from CSV")
+    parser.add_argument("csv_path", help="CSV with Enrollment,Name[,Email,Password] columns")
+    parser.add_argument("--default-password", help="Password for rows without a Password column")
+    parser.add_argument("--email-domain", help="Generate <enrollment>@<domain> for rows without Email")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    with open(args.csv_path, newline="", encoding="utf-8-sig") as f:
+        rows = parse_students_csv(f)
+    result = import_students(rows, default_password=args.default_password, email_domain=args.email_domain)
+    elapsed = time.perf_counter() - started
+
+    for err in result["errors"]:
+        print(f"row {err['row']} ({err['enrollment'] or '-'}): {err['error']}", file=sys.stderr)
+    print(json.dumps({"total": result["total"], "inserted": result["inserted"], "errors": len(result["errors"]), "seconds": round(elapsed, 2)}))
+    return 0 if not result["errors"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
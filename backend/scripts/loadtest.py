@@ -0,0 +1,253 @@
+"""
+HTTP load test for the Flask app (create_app).
+Seeds N students and M attendance rows into a throwaway database, starts the app on a local
+port (or targets --url), drives a weighted mix of routes from --concurrency keep-alive
+clients for --duration seconds, and prints per-route p50/p95/p99 latency and requests/sec.
+
+Usage (from backend/):
+  python -m scripts.loadtest --in-memory --students 2000 --attendance 100000 --concurrency 16 --duration 30
+  python -m scripts.loadtest --mongo-uri mongodb://localhost:27017/ --mix students=4,attendance=4,login=1,manual=2,auto=1
+
+--in-memory uses mongomock (pip install mongomock). It measures the app's own overhead, not
+Mongo's; use a local mongod for numbers comparable to production. The auto route needs a
+trained model and --auto-image; without an image it sends a face-less frame (400 responses),
+which still measures decode + detection cost.
+"""
+import argparse
+import base64
+import http.client
+import json
+import math
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+import bcrypt
+
+from app.config import Config
+
+PASSWORD = "loadtest"
+SUBJECTS = ["Maths", "Physics", "Chemistry", "Biology", "English", "History"]
+DEFAULT_MIX = "students=4,student=2,attendance=4,export=1,login=1,manual=2,auto=1"
+
+
+def _enrollment(i: int) -> str:
+    return f"LT{i:06d}"
+
+
+def seed(db, students: int, attendance: int, days: int = 60):
+    """Insert students (one shared bcrypt hash) and attendance rows spread over subjects and days."""
+    from app.models.attendance import attendance_schema
+    from app.models.student import student_schema
+    from app.services.collection_versions import VERSIONS_COLLECTION
+
+    db["students"].delete_many({})
+    db["attendance"].delete_many({})
+    password_hash = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    batch = []
+    for i in range(students):
+        batch.append(student_schema(_enrollment(i), f"Student {i}", f"{_enrollment(i).lower()}@loadtest.local", password_hash))
+        if len(batch) >= 1000:
+            db["students"].insert_many(batch)
+            batch = []
+    if batch:
+        db["students"].insert_many(batch)
+    # Invalidate cached student lists (ETag / body cache) of servers already running
+    db[VERSIONS_COLLECTION].update_one(
+        {"_id": "students"}, {"$inc": {"version": 1}, "$currentDate": {"updatedAt": True}}, upsert=True
+    )
+
+    today = date.today()
+    batch = []
+    for i in range(attendance):
+        n = random.randrange(students)
+        day = (today - timedelta(days=random.randrange(days))).isoformat()
+        batch.append(attendance_schema(_enrollment(n), f"Student {n}", random.choice(SUBJECTS), day, "09:00:00", "manual"))
+        if len(batch) >= 1000:
+            db["attendance"].insert_many(batch)
+            batch = []
+    if batch:
+        db["attendance"].insert_many(batch)
+
+
+def _auto_image(path: str) -> str:
+    if path:
+        with open(path, "rb") as f:
+            return base64.b64encode(f.read()).decode("ascii")
+    import cv2
+    import numpy as np
+
+    frame = np.random.default_rng(0).integers(0, 256, (480, 640), dtype=np.uint8)
+    ok, buf = cv2.imencode(".jpg", frame)
+    return base64.b64encode(buf.tobytes()).decode("ascii")
+
+
+def build_workloads(students: int, auto_image: str) -> dict:
+    """name -> () -> (route label, method, path, json body or None)."""
+    def pick():
+        return _enrollment(random.randrange(students))
+
+    return {
+        "students": lambda: ("GET /api/students", "GET", f"/api/students?skip={random.randrange(0, max(1, students - 50))}&limit=50", None),
+        "student": lambda: ("GET /api/students/<enrollment>", "GET", f"/api/students/{pick()}", None),
+        "attendance": lambda: (
+            "GET /api/attendance", "GET",
+            f"/api/attendance?subject={random.choice(SUBJECTS)}&skip={random.randrange(0, 1000, 100)}&limit=100", None,
+        ),
+        "export": lambda: ("GET /api/attendance/export", "GET", f"/api/attendance/export?subject={random.choice(SUBJECTS)}&limit=1000", None),
+        "login": lambda: ("POST /api/auth/login", "POST", "/api/auth/login", {"email": f"{pick().lower()}@loadtest.local", "password": PASSWORD, "role": "student"}),
+        "manual": lambda: (
+            "POST /api/attendance/manual", "POST", "/api/attendance/manual",
+            {"enrollment": pick(), "name": "Load Test", "subject": random.choice(SUBJECTS)},
+        ),
+        "auto": lambda: ("POST /api/attendance/auto", "POST", "/api/attendance/auto", {"image": auto_image, "subject": random.choice(SUBJECTS)}),
+    }
+
+
+def parse_mix(mix: str, workloads: dict) -> list:
+    """"students=4,login=1" -> [(name, weight)]."""
+    out = []
+    for part in mix.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in workloads:
+            raise SystemExit(f"unknown workload {name!r}; choose from {', '.join(workloads)}")
+        out.append((name, float(weight or 1)))
+    return out
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not sorted_values:
+        return 0.0
+    k = math.ceil(pct / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, k))]
+
+
+class _Client(threading.Thread):
+    def __init__(self, host, port, workloads, mix, deadline, results, lock):
+        super().__init__(daemon=True)
+        self.host, self.port = host, port
+        self.workloads = workloads
+        self.names = [n for n, _ in mix]
+        self.weights = [w for _, w in mix]
+        self.deadline = deadline
+        self.results = results  # route -> {"latencies": [...], "status": {code: n}, "errors": n}
+        self.lock = lock
+
+    def run(self):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        local = {}
+        while time.time() < self.deadline:
+            route, method, path, body = self.workloads[random.choices(self.names, self.weights)[0]]()
+            payload = json.dumps(body) if body is not None else None
+            headers = {"Content-Type": "application/json"} if payload else {}
+            entry = local.setdefault(route, {"latencies": [], "status": {}, "errors": 0})
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=payload, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                status = resp.status
+            except (OSError, http.client.HTTPException):
+                entry["errors"] += 1
+                conn.close()
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+                continue
+            entry["latencies"].append(time.perf_counter() - started)
+            entry["status"][status] = entry["status"].get(status, 0) + 1
+        conn.close()
+        with self.lock:
+            for route, entry in local.items():
+                agg = self.results.setdefault(route, {"latencies": [], "status": {}, "errors": 0})
+                agg["latencies"].extend(entry["latencies"])
+                agg["errors"] += entry["errors"]
+                for code, n in entry["status"].items():
+                    agg["status"][code] = agg["status"].get(code, 0) + n
+
+
+def run_load(host, port, workloads, mix, concurrency, duration) -> dict:
+    results, lock = {}, threading.Lock()
+    deadline = time.time() + duration
+    clients = [_Client(host, port, workloads, mix, deadline, results, lock) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for c in clients:
+        c.start()
+    for c in clients:
+        c.join()
+    elapsed = time.perf_counter() - started
+
+    report = {}
+    total = 0
+    for route in sorted(results):
+        lat = sorted(results[route]["latencies"])
+        total += len(lat)
+        report[route] = {
+            "requests": len(lat),
+            "errors": results[route]["errors"],
+            "status": {str(k): v for k, v in sorted(results[route]["status"].items())},
+            "rps": round(len(lat) / elapsed, 1),
+            "p50Ms": round(_percentile(lat, 50) * 1000, 1),
+            "p95Ms": round(_percentile(lat, 95) * 1000, 1),
+            "p99Ms": round(_percentile(lat, 99) * 1000, 1),
+        }
+    return {"seconds": round(elapsed, 1), "requests": total, "rps": round(total / elapsed, 1), "routes": report}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the attendance API")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--in-memory", action="store_true", help="Use an in-memory Mongo stand-in (mongomock)")
+    target.add_argument("--mongo-uri", help="Mongo to seed and serve from (default: MONGODB_URI)")
+    parser.add_argument("--database", default="attendance_loadtest", help="Database to seed; its students and attendance are replaced")
+    parser.add_argument("--url", help="Target an already running server instead of starting one (it must use the same database)")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--attendance", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20, help="Seconds of load")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted workloads (default: {DEFAULT_MIX})")
+    parser.add_argument("--auto-image", help="JPEG with a trained student's face for the auto workload")
+    parser.add_argument("--no-seed", action="store_true", help="Reuse data from a previous run")
+    args = parser.parse_args(argv)
+    if args.in_memory and args.url:
+        parser.error("--in-memory cannot be shared with an external --url server")
+
+    Config.MONGODB_URI = "mongomock://" if args.in_memory else (args.mongo_uri or Config.MONGODB_URI)
+    Config.DATABASE_NAME = args.database
+    Config.WARMUP_IN_BACKGROUND = False  # measure a warm app
+
+    from app.database import get_db
+
+    if not args.no_seed:
+        started = time.perf_counter()
+        seed(get_db(), args.students, args.attendance)
+        print(f"seeded {args.students} students, {args.attendance} attendance rows in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        from werkzeug.serving import make_server
+
+        from app import create_app
+
+        server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+        host, port = "127.0.0.1", server.server_port
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    workloads = build_workloads(args.students, _auto_image(args.auto_image))
+    try:
+        report = run_load(host, port, workloads, parse_mix(args.mix, workloads), args.concurrency, args.duration)
+    finally:
+        if server is not None:
+            server.shutdown()
+    report.update({"concurrency": args.concurrency, "students": args.students, "attendanceRows": args.attendance})
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
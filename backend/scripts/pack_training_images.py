@@ -0,0 +1,60 @@
+"""
+Pack the TrainingImage/ folder (and archived samples) into the SQLite face store.
+Source files are left in place; set FACE_STORE_BACKEND=sqlite once the pack looks right.
+
+Usage (from backend/):
+  python -m scripts.pack_training_images [--source TrainingImage] [--db FaceStore.sqlite3]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from app.config import Config
+from app.services.face_store import SqliteFaceStore, parse_sample_filename
+
+
+def pack(source: str, archive: str, store: SqliteFaceStore) -> dict:
+    totals = {"packed": 0, "archived": 0, "skipped": 0, "bytes": 0}
+    for root, archived in ((source, False), (archive, True)):
+        if not os.path.isdir(root):
+            continue
+        refs = []
+        for f in sorted(os.listdir(root)):
+            parsed = parse_sample_filename(f)
+            if parsed is None:
+                totals["skipped"] += 1
+                continue
+            name, enrollment, sample_num = parsed
+            with open(os.path.join(root, f), "rb") as fh:
+                data = fh.read()
+            store.put(enrollment, name, sample_num, data)
+            totals["bytes"] += len(data)
+            if archived:
+                refs.append((enrollment, sample_num))
+            else:
+                totals["packed"] += 1
+        if refs:
+            totals["archived"] += store.archive(refs)
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack TrainingImage/ files into the SQLite face store")
+    parser.add_argument("--source", default=Config.TRAINING_IMAGE_PATH, help="Folder of Name.enrollment.N.jpg files")
+    parser.add_argument("--archive", default=Config.TRAINING_ARCHIVE_PATH, help="Folder of archived samples")
+    parser.add_argument("--db", default=Config.FACE_STORE_DB_PATH, help="SQLite face store path")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    report = pack(args.source, args.archive, SqliteFaceStore(args.db))
+    report["db"] = args.db
+    report["dbBytes"] = os.path.getsize(args.db)
+    report["seconds"] = round(time.perf_counter() - started, 2)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+Export Trainner.yml to the memory-mapped lbph_histograms.npy (LBPH_SHARED_MODEL) before the
+server starts, so worker processes only map the file instead of each parsing Trainner.yml.
+
+Usage (from backend/), e.g. in the start command:
+  python -m scripts.prepare_shared_model && hypercorn asgi:app --bind 0.0.0.0:5001 --workers 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from app.config import Config
+from app.services.recognizers import LBPHEngine, prepare_shared_model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export LBPH histograms for shared memory-mapped serving")
+    parser.add_argument("--label-path", default=Config.TRAINING_LABEL_PATH)
+    args = parser.parse_args(argv)
+
+    engine = LBPHEngine(args.label_path, shared=True)
+    if not engine.is_trained():
+        print(f"No model at {engine.model_path}; train first", file=sys.stderr)
+        return 1
+    started = time.perf_counter()
+    exported = prepare_shared_model(args.label_path)
+    print(json.dumps({
+        "exported": exported,
+        "path": engine.shared_path,
+        "bytes": os.path.getsize(engine.shared_path),
+        "seconds": round(time.perf_counter() - started, 2),
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Startup profile of the backend: time to import the app, build it with create_app(), and
+(with --warm-up) run each warm-up step, plus per-module import times (cumulative and self,
+like `python -X importtime`) and which heavy dependencies were loaded at startup.
+
+Usage (from backend/):
+  python run.py --profile-startup [--warm-up] [--top 25]
+  python -m scripts.profile_startup --warm-up
+"""
+import argparse
+import builtins
+import importlib.util
+import json
+import os
+import sys
+import time
+
+# Loaded lazily by the subsystems that need them (recognition, training, uploads, backup);
+# none should appear in "heavyModulesLoaded" after create_app()
+HEAVY_MODULES = ("cv2", "numpy", "PIL", "pandas", "cloudinary")
+
+
+class ImportTimer:
+    """Wraps builtins.__import__ to time every module the first time it is imported."""
+
+    def __init__(self):
+        self.modules = {}  # name -> {"cumulativeMs", "selfMs"}
+        self._stack = []  # child time accumulated per active import
+        self._original = None
+
+    def __enter__(self):
+        self._original = builtins.__import__
+        builtins.__import__ = self._import
+        return self
+
+    def __exit__(self, *exc):
+        builtins.__import__ = self._original
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        try:
+            full = importlib.util.resolve_name("." * level + name, (globals or {}).get("__package__")) if level else name
+        except (ImportError, ValueError):
+            full = name
+        if full in sys.modules:
+            return self._original(name, globals, locals, fromlist, level)
+        self._stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.modules[full] = {
+                "cumulativeMs": round(elapsed * 1000, 2),
+                "selfMs": round((elapsed - children) * 1000, 2),
+            }
+
+    def report(self, top: int) -> dict:
+        by_package = {}
+        for name, t in self.modules.items():
+            package = name.split(".")[0]
+            by_package[package] = by_package.get(package, 0.0) + t["selfMs"]
+        slowest = sorted(self.modules.items(), key=lambda kv: kv[1]["cumulativeMs"], reverse=True)[:top]
+        return {
+            "modulesImported": len(self.modules),
+            "slowestImports": [{"module": name, **t} for name, t in slowest],
+            "selfMsByPackage": dict(sorted(
+                ((p, round(ms, 2)) for p, ms in by_package.items()), key=lambda kv: kv[1], reverse=True
+            )[:top]),
+        }
+
+
+def profile_startup(warm_up: bool = False, top: int = 25) -> dict:
+    """Import and build the app (optionally warm it up) in this process and return the timings."""
+    os.environ["WARMUP_ON_STARTUP"] = "false"  # measured separately below
+    phases = {}
+    with ImportTimer() as timer:
+        started = time.perf_counter()
+        from app import create_app
+        phases["importApp"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        create_app()
+        phases["createApp"] = time.perf_counter() - started
+        loaded_after_create = [m for m in HEAVY_MODULES if m in sys.modules]
+
+        warm_up_steps = None
+        if warm_up:
+            from app.services.warmup_service import warm_up as run_warm_up
+
+            started = time.perf_counter()
+            warm_up_steps = run_warm_up()["components"]
+            phases["warmUp"] = time.perf_counter() - started
+
+    return {
+        "totalMs": round(sum(phases.values()) * 1000, 1),
+        "phasesMs": {k: round(v * 1000, 1) for k, v in phases.items()},
+        "heavyModulesLoaded": loaded_after_create,
+        "warmUpSteps": warm_up_steps,
+        **timer.report(top),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Break down backend startup time")
+    parser.add_argument("--profile-startup", action="store_true", help=argparse.SUPPRESS)  # when run via run.py
+    parser.add_argument("--warm-up", action="store_true", help="Also run the warm-up steps (needs MongoDB)")
+    parser.add_argument("--top", type=int, default=25, help="Slowest modules / packages to list")
+    args = parser.parse_args(argv)
+    print(json.dumps(profile_startup(args.warm_up, args.top), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Shared fixtures. The suite runs against mongomock (MONGODB_URI=mongomock://) with warm-up
+and the recognition / write-behind pools off; every data path points into a temp dir.
+
+Run from backend/: python -m pytest -q
+"""
+import os
+import sys
+import tempfile
+
+_DATA_DIR = tempfile.mkdtemp(prefix="attendance-tests-")
+os.environ.update({
+    "MONGODB_URI": "mongomock://",
+    "DATABASE_NAME": "attendance_test",
+    "WARMUP_ON_STARTUP": "false",
+    "RECOGNITION_WORKERS": "0",
+    "WRITE_BEHIND_ENABLED": "false",
+    "TRAINING_IMAGE_PATH": os.path.join(_DATA_DIR, "TrainingImage"),
+    "TRAINING_LABEL_PATH": os.path.join(_DATA_DIR, "TrainingImageLabel"),
+    "TRAINING_ARCHIVE_PATH": os.path.join(_DATA_DIR, "TrainingImageArchive"),
+    "PERSIST_SPOOL_PATH": os.path.join(_DATA_DIR, "PersistSpool"),
+    "FACE_STORE_DB_PATH": os.path.join(_DATA_DIR, "FaceStore.sqlite3"),
+    "DETECTOR_PROFILE_PATH": os.path.join(_DATA_DIR, "detector_profile.json"),
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """A fresh in-memory database per test (indexes included)."""
+    from app import database
+
+    database._client = database._db = None
+    database._indexes_checked = False
+    database._index_error = None
+    yield database.get_db()
+    database._client.drop_database(database.Config.DATABASE_NAME)
+    database._client = database._db = None
+    database._indexes_checked = False
+
+
+@pytest.fixture
+def fresh_caches():
+    """Reset the per-process collection-version and response-body caches."""
+    from app.services import collection_versions
+
+    collection_versions._versions.clear()
+    collection_versions._bodies = None
+    yield
+    collection_versions._versions.clear()
+    collection_versions._bodies = None
@@ -0,0 +1,31 @@
+from app.services.face_store import DirectoryFaceStore, parse_sample_filename, sample_filename
+
+
+def test_parse_sample_filename_handles_dotted_names():
+    assert parse_sample_filename("Ada.E1.3.jpg") == ("Ada", "E1", 3)
+    assert parse_sample_filename("J.R.R. Tolkien.E2.12.png") == ("J.R.R. Tolkien", "E2", 12)
+    assert parse_sample_filename("Ada.E1.x.jpg") is None
+    assert parse_sample_filename("Ada.E1.3.txt") is None
+    assert parse_sample_filename("E1.3.jpg") is None
+
+
+def test_sample_filename_round_trips():
+    assert parse_sample_filename(sample_filename("Ada", "E1", 7))[1:] == ("E1", 7)
+
+
+def test_sample_numbers_are_shared_between_processes(db, tmp_path):
+    # two store instances stand in for two server processes
+    a = DirectoryFaceStore(str(tmp_path / "active"), str(tmp_path / "archive"))
+    b = DirectoryFaceStore(str(tmp_path / "active"), str(tmp_path / "archive"))
+    numbers = [a.next_sample_num("E1"), b.next_sample_num("E1"), a.next_sample_num("E1"), b.next_sample_num("E1")]
+    assert numbers == [1, 2, 3, 4]
+    assert a.next_sample_num("E2") == 1
+
+
+def test_numbering_continues_after_archived_samples(db, tmp_path):
+    store = DirectoryFaceStore(str(tmp_path / "active"), str(tmp_path / "archive"))
+    store.put("E1", "Ada", 1, b"x")
+    store.put("E1", "Ada", 5, b"x")
+    store.archive([str(tmp_path / "active" / sample_filename("Ada", "E1", 5))])
+    assert store.next_sample_num("E1") == 6
+    assert store.delete_student("E1") == 2
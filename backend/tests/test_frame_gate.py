@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from app.services import attendance_service, frame_gate
+from app.services.attendance_service import UnrecognizedFrameError
+from app.services.frame_gate import FrameGate, change_score
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    monkeypatch.setattr(frame_gate, "_gate", None)
+    monkeypatch.setattr(frame_gate.Config, "FRAME_GATE_ENABLED", True)
+    # Thumbnails come from the "image" string itself: same string, same scene
+    monkeypatch.setattr(frame_gate, "thumbnail", lambda image: np.full((24, 32), len(image), np.int16))
+    return frame_gate.get_frame_gate()
+
+
+def _recognizer(monkeypatch, *outcomes):
+    """Replace recognition with a script of outcomes (results or exceptions); returns the call log."""
+    calls = []
+
+    def recognize(image, subject):
+        outcome = outcomes[min(len(calls), len(outcomes) - 1)]
+        calls.append(image)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(attendance_service, "_recognize_and_record", recognize)
+    return calls
+
+
+def test_change_score_is_mean_absolute_difference():
+    a = np.zeros((24, 32), np.int16)
+    assert change_score(a, a) == 0
+    assert change_score(a, a + 10) == 10
+
+
+def test_lookup_hits_only_similar_fresh_frames(monkeypatch):
+    g = FrameGate(threshold=4, max_age=30)
+    ref = np.zeros((24, 32), np.int16)
+    g.store("cam", ref, ("ok", {"count": 1}))
+    assert g.lookup("cam", ref + 3) == ("ok", {"count": 1})
+    assert g.lookup("cam", ref + 10) is None
+    assert g.lookup("other", ref) is None
+    assert g.stats() == {"hits": 1, "misses": 2, "cameras": 1}
+
+    now = frame_gate.time.monotonic()
+    monkeypatch.setattr(frame_gate.time, "monotonic", lambda: now + 31)
+    assert g.lookup("cam", ref) is None  # expired
+
+
+def test_lru_bound():
+    g = FrameGate(threshold=4, max_age=30, max_keys=2)
+    thumb = np.zeros((24, 32), np.int16)
+    for key in ("a", "b", "c"):
+        g.store(key, thumb, ("ok", {}))
+    assert g.lookup("a", thumb) is None
+    assert g.lookup("c", thumb) is not None
+
+
+def test_success_is_cached_per_camera(gate, monkeypatch):
+    calls = _recognizer(monkeypatch, {"records": [], "count": 1})
+    first = attendance_service._recognize_gated("frame", "Math", camera="kiosk-1")
+    again = attendance_service._recognize_gated("frame", "Math", camera="kiosk-1")
+    assert "cached" not in first and again["cached"] is True
+    assert len(calls) == 1
+    attendance_service._recognize_gated("frame", "Math", camera="kiosk-2")
+    assert len(calls) == 2
+
+
+def test_scene_outcomes_are_cached(gate, monkeypatch):
+    calls = _recognizer(monkeypatch, UnrecognizedFrameError("No face detected"))
+    for _ in range(3):
+        with pytest.raises(UnrecognizedFrameError, match="No face detected"):
+            attendance_service._recognize_gated("frame", "Math", camera="kiosk")
+    assert len(calls) == 1
+
+
+def test_model_errors_are_not_cached(gate, monkeypatch):
+    # Regression: "Model not found" used to be replayed after POST /api/train
+    calls = _recognizer(
+        monkeypatch,
+        ValueError("Model not found. Train the model first via POST /api/train"),
+        {"records": [], "count": 1},
+    )
+    with pytest.raises(ValueError, match="Model not found"):
+        attendance_service._recognize_gated("frame", "Math", camera="kiosk")
+    assert attendance_service._recognize_gated("frame", "Math", camera="kiosk") == {"records": [], "count": 1}
+    assert len(calls) == 2
+
+
+def test_no_camera_id_bypasses_the_gate(gate, monkeypatch):
+    calls = _recognizer(monkeypatch, {"records": [], "count": 1})
+    attendance_service._recognize_gated("frame", "Math", camera=None)
+    attendance_service._recognize_gated("frame", "Math", camera=None)
+    assert len(calls) == 2
+    assert gate.stats()["cameras"] == 0
@@ -0,0 +1,114 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from app import create_app
+from app.utils import http_cache
+from app.utils.http_cache import accepts_gzip, not_modified_etag
+
+
+@pytest.fixture
+def client(db, fresh_caches):
+    return create_app().test_client()
+
+
+@pytest.fixture
+def compress_everything(monkeypatch):
+    monkeypatch.setattr(http_cache.Config, "COMPRESS_MIN_BYTES", 1)
+
+
+def test_accepts_gzip():
+    assert accepts_gzip({"Accept-Encoding": "br, gzip"})
+    assert accepts_gzip({"Accept-Encoding": "*"})
+    assert not accepts_gzip({"Accept-Encoding": "gzip;q=0"})
+    assert not accepts_gzip({})
+
+
+def test_not_modified_etag_matches_either_encoding():
+    etag = '"subjects-3-abc"'
+    assert not_modified_etag({"If-None-Match": etag}, etag) == etag
+    assert not_modified_etag({"If-None-Match": 'W/"x", "subjects-3-abc-gzip"'}, etag) == '"subjects-3-abc-gzip"'
+    assert not_modified_etag({"If-None-Match": "*"}, etag) == etag
+    assert not_modified_etag({"If-None-Match": '"subjects-2-abc"'}, etag) is None
+    assert not_modified_etag({}, etag) is None
+
+
+def test_conditional_get_follows_the_collection_version(client):
+    first = client.get("/api/subjects")
+    assert first.status_code == 200 and first.get_json() == {"subjects": []}
+    etag = first.headers["ETag"]
+    assert "Last-Modified" not in first.headers
+
+    cached = client.get("/api/subjects", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.headers["ETag"] == etag and cached.data == b""
+
+    assert client.post("/api/subjects", json={"name": "Math"}).status_code == 201
+    changed = client.get("/api/subjects", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert [s["name"] for s in changed.get_json()["subjects"]] == ["Math"]
+
+
+def test_same_second_writes_are_never_a_304(client):
+    # Regression: Last-Modified has one-second resolution, so it used to answer with a stale 304
+    etag = client.get("/api/subjects").headers["ETag"]
+    client.post("/api/subjects", json={"name": "Math"})
+    after_first = client.get("/api/subjects").headers["ETag"]
+    client.post("/api/subjects", json={"name": "Physics"})
+    response = client.get("/api/subjects", headers={"If-None-Match": after_first})
+    assert response.status_code == 200 and len({etag, after_first, response.headers["ETag"]}) == 3
+
+
+def test_gzip_list_has_its_own_etag(client, compress_everything):
+    client.post("/api/subjects", json={"name": "Math"})
+    plain = client.get("/api/subjects")
+    zipped = client.get("/api/subjects", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert zipped.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+    assert "Accept-Encoding" in zipped.headers["Vary"]
+    assert json.loads(gzip.decompress(zipped.data)) == plain.get_json()
+
+    revalidated = client.get("/api/subjects", headers={"If-None-Match": zipped.headers["ETag"], "Accept-Encoding": "gzip"})
+    assert revalidated.status_code == 304 and revalidated.headers["ETag"] == zipped.headers["ETag"]
+
+
+def test_small_bodies_are_not_compressed(client):
+    response = client.get("/api/subjects", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_other_json_responses_are_compressed_by_the_hook(client, compress_everything):
+    response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "message" in json.loads(gzip.decompress(response.data))
+
+
+def test_async_hook_compresses_bodies_and_passes_streams_through(compress_everything):
+    # Regression: Quart responses have no is_streamed; streamed exports used to fail in the hook
+    from quart import Quart, Response
+
+    app = Quart(__name__)
+    app.after_request(http_cache.compress_response_async)
+
+    @app.route("/json")
+    async def body():
+        return {"items": list(range(100))}
+
+    @app.route("/stream")
+    async def stream():
+        async def chunks():
+            yield b"a,b\n"
+            yield b"1,2\n"
+        return Response(chunks(), mimetype="text/csv")
+
+    async def run():
+        client = app.test_client()
+        zipped = await client.get("/json", headers={"Accept-Encoding": "gzip"})
+        streamed = await client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        return zipped, await zipped.get_data(), streamed, await streamed.get_data()
+
+    zipped, zipped_body, streamed, streamed_body = asyncio.run(run())
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(zipped_body)) == {"items": list(range(100))}
+    assert "Content-Encoding" not in streamed.headers and streamed_body == b"a,b\n1,2\n"
@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+from app.services import attendance_service
+from app.services.attendance_service import UnrecognizedFrameError, _run_once
+from app.utils import cache as cache_module
+from app.utils.cache import TTLCache
+
+
+def test_ttl_cache_expiry_and_lru(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    c = TTLCache(max_size=2, ttl=10)
+    c.set("a", 1)
+    c.set("b", 2)
+    assert c.get("a") == 1  # "a" is now most recently used
+    c.set("c", 3)
+    assert c.get("b") is None and len(c) == 2
+    now[0] += 11
+    assert c.get("a") is None and c.get("c", "gone") == "gone"
+
+
+def test_ttl_cache_pop_and_clear():
+    c = TTLCache(max_size=4, ttl=60)
+    c.set("a", 1)
+    assert c.pop("a") == 1 and c.pop("a", "missing") == "missing"
+    c.set("b", 2)
+    c.clear()
+    assert len(c) == 0
+
+
+def _counting(outcome):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return compute, calls
+
+
+def test_success_is_replayed():
+    cache = TTLCache(16, 60)
+    compute, calls = _counting({"count": 1})
+    assert _run_once(cache, "k", "fp", compute) == {"count": 1}
+    assert _run_once(cache, "k", "fp", compute) == {"count": 1, "replayed": True}
+    assert len(calls) == 1
+
+
+def test_scene_outcome_is_replayed():
+    cache = TTLCache(16, 60)
+    compute, calls = _counting(UnrecognizedFrameError("No face recognized"))
+    for _ in range(2):
+        with pytest.raises(UnrecognizedFrameError):
+            _run_once(cache, "k", "fp", compute)
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("error", [
+    ValueError("Model not found. Train the model first via POST /api/train"),
+    ValueError("Invalid base64 image"),
+    RuntimeError("Recognition timed out"),
+])
+def test_other_errors_are_not_cached(error):
+    cache = TTLCache(16, 60)
+    compute, calls = _counting(error)
+    for _ in range(2):
+        with pytest.raises(type(error)):
+            _run_once(cache, "k", "fp", compute)
+    assert len(calls) == 2
+    assert len(cache) == 0
+
+
+def test_key_reuse_with_other_payload_is_rejected():
+    cache = TTLCache(16, 60)
+    _run_once(cache, "k", "fp-1", lambda: {"count": 1})
+    with pytest.raises(ValueError, match="different image"):
+        _run_once(cache, "k", "fp-2", lambda: {"count": 1})
+
+
+def test_concurrent_retry_waits_for_the_first(monkeypatch):
+    monkeypatch.setattr(attendance_service.Config, "RECOGNITION_TIMEOUT_SECONDS", 5)
+    cache = TTLCache(16, 60)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"count": 1}
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(_run_once(cache, "k", "fp", slow)))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=lambda: results.append(_run_once(cache, "k", "fp", slow)))
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert len(calls) == 1
+    assert {"count": 1, "replayed": True} in results
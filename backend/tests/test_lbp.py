@@ -0,0 +1,38 @@
+import numpy as np
+
+from app.services.lbp import describe, lbp_codes, uniform_bins, uniform_mapping
+
+
+def test_uniform_mapping_has_59_bins_for_8_neighbours():
+    table = uniform_mapping(8)
+    assert uniform_bins(8) == 59
+    assert len(table) == 256 and set(table.tolist()) == set(range(59))
+    # the 58 uniform codes get their own bin; the other 198 share the last one
+    assert int((table == 58).sum()) == 256 - 58
+    assert table[0] != table[255] != 58
+    assert table[0b01010101] == 58
+
+
+def test_flat_image_is_all_ones_code():
+    # every neighbour equals the centre, which counts as "greater or equal"
+    codes = lbp_codes(np.full((10, 10), 128, np.uint8), radius=1, neighbors=8)
+    assert codes.shape == (8, 8)
+    assert (codes == 255).all()
+
+
+def test_describe_counts_every_interior_pixel():
+    rng = np.random.default_rng(0)
+    gray = rng.integers(0, 256, (102, 82), dtype=np.uint8)
+    hist = describe(gray, radius=1, neighbors=8, grid_x=8, grid_y=10)
+    assert hist.shape == (80, 59) and hist.dtype == np.uint16
+    # 100x80 interior split into 10x8 cells of 10x10 pixels
+    assert (hist.sum(axis=1) == 100).all()
+
+
+def test_describe_distinguishes_textures():
+    flat = np.full((66, 66), 100, np.uint8)
+    stripes = np.tile(np.array([0, 255], np.uint8), (66, 33))
+    a = describe(flat, 1, 8, 8, 8).astype(np.int32)
+    b = describe(stripes, 1, 8, 8, 8).astype(np.int32)
+    assert np.abs(a - b).sum() > 0
+    assert (describe(flat, 1, 8, 8, 8) == a).all()  # deterministic
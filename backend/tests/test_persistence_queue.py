@@ -0,0 +1,134 @@
+import json
+import os
+
+import pytest
+
+from app.services import persistence_queue
+from app.services.persistence_queue import CloudBackup, PersistenceQueue
+
+SAMPLE = {"enrollment": "E1", "name": "Ada", "sampleNum": 1}
+
+
+class FlakyStore:
+    """Stand-in for the face store that fails the first `failures` writes."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+        self.stored = []
+
+    def __call__(self, sample, data):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise OSError("disk busy")
+        self.stored.append((sample["sampleNum"], data))
+
+
+class RecordingBackup(CloudBackup):
+    name = "test"
+
+    def __init__(self):
+        self.uploads = []
+
+    def upload(self, key, data):
+        self.uploads.append(key)
+
+
+def _queue(tmp_path, **kwargs):
+    options = {"maxsize": 8, "spool_path": str(tmp_path), "max_retries": 2, "retry_base": 0.01}
+    options.update(kwargs)
+    return PersistenceQueue(**options)
+
+
+def _spooled(tmp_path, suffix=persistence_queue.SPOOL_SUFFIX):
+    return sorted(f for f in os.listdir(tmp_path) if f.endswith(suffix))
+
+
+def test_write_then_backup(tmp_path, monkeypatch):
+    store, backup = FlakyStore(), RecordingBackup()
+    monkeypatch.setattr(persistence_queue, "_store_sample", store)
+    q = _queue(tmp_path, backup=backup)
+    q.start()
+    q.write_sample(SAMPLE, b"png", backup_key="E1.1.png")
+    assert q.flush(timeout=5, kinds=("write", "backup"))
+    assert store.stored == [(1, b"png")]
+    assert backup.uploads == ["E1.1.png"]
+
+
+def test_failed_write_is_retried_with_backoff(tmp_path, monkeypatch):
+    store = FlakyStore(failures=2)
+    monkeypatch.setattr(persistence_queue, "_store_sample", store)
+    q = _queue(tmp_path)
+    q.start()
+    q.write_sample(SAMPLE, b"png")
+    assert q.flush(timeout=5)
+    assert store.calls == 3 and store.stored == [(1, b"png")]
+    assert _spooled(tmp_path) == []
+
+
+def test_exhausted_retries_spool_the_job(tmp_path, monkeypatch):
+    monkeypatch.setattr(persistence_queue, "_store_sample", FlakyStore(failures=100))
+    q = _queue(tmp_path, max_retries=1)
+    q.start()
+    q.write_sample(SAMPLE, b"png")
+    assert q.flush(timeout=5)
+    (name,) = _spooled(tmp_path)
+    with open(os.path.join(tmp_path, name), "rb") as f:
+        header, data = f.read().split(b"\n", 1)
+    assert json.loads(header)["sample"] == SAMPLE and data == b"png"
+
+
+def test_overflow_is_spooled_and_replayed(tmp_path, monkeypatch):
+    store = FlakyStore()
+    monkeypatch.setattr(persistence_queue, "_store_sample", store)
+    q = _queue(tmp_path, maxsize=1)  # not started: nothing drains the queue yet
+    q.write_sample({**SAMPLE, "sampleNum": 1}, b"a")
+    q.write_sample({**SAMPLE, "sampleNum": 2}, b"b")
+    assert q.stats()["spooled"] == 1
+
+    q.start()
+    assert q.flush(timeout=5)
+    q._replay_spool()
+    assert q.flush(timeout=5)
+    assert sorted(store.stored) == [(1, b"a"), (2, b"b")]
+    assert _spooled(tmp_path) == []
+
+
+def test_spool_failure_is_reported(tmp_path, monkeypatch):
+    q = _queue(tmp_path, maxsize=1)
+    q.write_sample(SAMPLE, b"a")
+    monkeypatch.setattr(q, "_spool", lambda job, data: (_ for _ in ()).throw(OSError("disk full")))
+    with pytest.raises(RuntimeError, match="Could not queue write"):
+        q.write_sample(SAMPLE, b"b")
+    assert q.stats()["pending"]["write"] == 1  # only the queued job
+
+
+def test_poison_job_stops_after_max_replays(tmp_path, monkeypatch):
+    # Regression: a job that always fails used to cycle retry -> spool -> replay forever
+    store = FlakyStore(failures=1000)
+    monkeypatch.setattr(persistence_queue, "_store_sample", store)
+    q = _queue(tmp_path, max_retries=0, max_replays=2)
+    q.start()
+    q.write_sample(SAMPLE, b"png")
+    assert q.flush(timeout=5)
+    for _ in range(5):
+        q._replay_spool()
+        assert q.flush(timeout=5)
+    assert store.calls == 3  # the original attempt + 2 replays
+    assert _spooled(tmp_path) == []
+    assert len(_spooled(tmp_path, ".job.bad")) == 1
+
+
+def test_unreadable_spool_file_is_set_aside(tmp_path):
+    with open(os.path.join(tmp_path, "0-broken.job"), "wb") as f:
+        f.write(b"not json")
+    q = _queue(tmp_path)
+    q._replay_spool()
+    assert os.listdir(tmp_path) == ["0-broken.job.bad"]
+
+
+def test_stop_spools_pending_jobs(tmp_path):
+    q = _queue(tmp_path)  # not started
+    q.write_sample(SAMPLE, b"a")
+    q.stop()
+    assert len(_spooled(tmp_path)) == 1
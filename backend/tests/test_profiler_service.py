@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from app.services import profiler_service
+from app.services.profiler_service import ProfilerBusyError, profile, to_collapsed
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(profiler_service.Config, "PROFILER_ENABLED", True)
+    monkeypatch.setattr(profiler_service.Config, "PROFILER_MAX_SECONDS", 5)
+
+
+def _busy_worker(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_samples_other_threads():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_worker, args=(stop,))
+    worker.start()
+    try:
+        result = profile(0.3, interval_ms=5)
+    finally:
+        stop.set()
+        worker.join()
+    assert result["samples"] > 0
+    assert any("_busy_worker (test_profiler_service.py" in stack for stack, _ in result["stacks"])
+    assert not any(stack.split(";")[-1].startswith("run (profiler_service.py") for stack, _ in result["stacks"])
+
+
+def test_request_limit_ends_the_session_early():
+    def requests():
+        time.sleep(0.1)
+        profiler_service.note_request("/health")  # filtered out by path_prefix
+        for _ in range(2):
+            profiler_service.note_request("/api/attendance/recognize")
+
+    threading.Thread(target=requests).start()
+    result = profile(5, max_requests=2, path_prefix="/api/attendance")
+    assert result["requests"] == 2
+    assert result["seconds"] < 4
+
+
+def test_one_session_per_process():
+    started = threading.Event()
+    outcome = {}
+
+    def first():
+        started.set()
+        outcome["first"] = profile(0.5)
+
+    thread = threading.Thread(target=first)
+    thread.start()
+    started.wait()
+    time.sleep(0.05)
+    with pytest.raises(ProfilerBusyError):
+        profile(0.1)
+    thread.join()
+    assert outcome["first"]["samples"] > 0
+    assert profile(0.05)["seconds"] >= 0  # the lock is released afterwards
+
+
+def test_limits(monkeypatch):
+    with pytest.raises(ValueError):
+        profile(0)
+    with pytest.raises(ValueError):
+        profile(6)
+    with pytest.raises(ValueError):
+        profile(1, max_requests=-1)
+    with pytest.raises(ValueError):
+        profile(1, interval_ms=0.5)
+    monkeypatch.setattr(profiler_service.Config, "PROFILER_ENABLED", False)
+    with pytest.raises(RuntimeError, match="disabled"):
+        profile(1)
+
+
+def test_note_request_without_session_is_a_no_op():
+    profiler_service.note_request("/api/students")
+
+
+def test_collapsed_format():
+    assert to_collapsed([("a;b;c (x.py:3)", 4), ("a;d", 1)]) == "a;b;c (x.py:3) 4\na;d 1\n"
@@ -0,0 +1,29 @@
+import numpy as np
+
+from app.services.train_service import select_diverse
+
+
+def _faces(distinct: int, total: int):
+    rng = np.random.default_rng(7)
+    bases = [rng.integers(0, 256, (64, 64), dtype=np.uint8) for _ in range(distinct)]
+    return [bases[i % distinct].copy() for i in range(total)]
+
+
+def test_returns_everything_within_budget():
+    faces = _faces(3, 5)
+    assert select_diverse(faces, 10) == [0, 1, 2, 3, 4]
+    assert select_diverse(faces, 0) == [0, 1, 2, 3, 4]  # 0 = unlimited
+
+
+def test_indices_are_unique_when_faces_repeat():
+    # 30 crops of only 5 distinct faces: every pick must still be a different sample
+    chosen = select_diverse(_faces(5, 30), 20)
+    assert len(chosen) == 20
+    assert len(set(chosen)) == 20
+    assert chosen == sorted(chosen)
+
+
+def test_covers_every_distinct_face_first():
+    faces = _faces(5, 30)
+    chosen = select_diverse(faces, 5)
+    assert sorted(i % 5 for i in chosen) == [0, 1, 2, 3, 4]
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from app.services.vector_index import FlatIndex, IVFIndex, build_index, load_index, save_index
+
+
+def _embeddings(people=20, per_person=10, dim=32, seed=3):
+    """Tight clusters around one random direction per person, L2-normalised."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(people, dim))
+    vectors = np.repeat(centers, per_person, axis=0) + rng.normal(scale=0.05, size=(people * per_person, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    labels = np.repeat(np.arange(people), per_person)
+    return vectors.astype(np.float32), labels, centers
+
+
+def _query(center):
+    return (center / np.linalg.norm(center)).astype(np.float32)
+
+
+def test_flat_search_is_exact_and_ordered():
+    vectors, labels, centers = _embeddings()
+    index = FlatIndex(vectors, labels)
+    results = index.search(_query(centers[4]), k=5)
+    assert [label for label, _ in results] == [4] * 5
+    scores = [score for _, score in results]
+    assert scores == sorted(scores, reverse=True)
+    assert index.search(_query(centers[4]), k=10_000)[0][0] == 4
+    assert len(index.search(_query(centers[4]), k=10_000)) == len(index)
+
+
+def test_ivf_finds_the_same_person():
+    vectors, labels, centers = _embeddings()
+    index = IVFIndex.build(vectors, labels)
+    assert len(index.centroids) == int(np.sqrt(len(vectors)))
+    assert index.offsets[-1] == len(index)
+    for person in range(len(centers)):
+        assert index.search(_query(centers[person]), k=1)[0][0] == person
+
+
+def test_build_index_kinds(monkeypatch):
+    vectors, labels, _ = _embeddings(people=4, per_person=5)
+    assert isinstance(build_index(vectors, labels, "flat"), FlatIndex)
+    assert isinstance(build_index(vectors, labels, "IVF"), IVFIndex)
+    monkeypatch.setattr("app.services.vector_index.Config.VECTOR_INDEX_IVF_MIN_SAMPLES", 1000)
+    assert isinstance(build_index(vectors, labels, "auto"), FlatIndex)
+    with pytest.raises(ValueError, match="Unknown VECTOR_INDEX"):
+        build_index(vectors, labels, "hnsw")
+
+
+@pytest.mark.parametrize("kind", ["flat", "ivf"])
+def test_save_and_load_round_trip(tmp_path, kind):
+    vectors, labels, centers = _embeddings()
+    index = build_index(vectors, labels, kind)
+    path = str(tmp_path / "index.npz")
+    save_index(path, index)
+    loaded = load_index(path)
+    assert type(loaded) is type(index) and len(loaded) == len(index)
+    assert loaded.search(_query(centers[7]), k=3) == index.search(_query(centers[7]), k=3)
+    assert [p.name for p in tmp_path.iterdir()] == ["index.npz"]  # no temp file left behind
@@ -188,11 +188,22 @@ export async function createSubject(name: string) {
 }
 
 // Attendance
+// Stable id for this browser's camera: the backend only change-gates frames that carry one
+function getCameraId(): string | undefined {
+  if (typeof window === "undefined") return undefined;
+  let id = localStorage.getItem("camera_id");
+  if (!id) {
+    id = crypto.randomUUID();
+    localStorage.setItem("camera_id", id);
+  }
+  return id;
+}
+
 export async function recordAutoAttendance(imageBase64: string, subject: string) {
   const res = await fetch(`${API_BASE}/api/attendance/auto`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ image: imageBase64, subject }),
+    body: JSON.stringify({ image: imageBase64, subject, cameraId: getCameraId() }),
   });
   if (!res.ok) {
     const err = await res.json().catch(() => ({}));
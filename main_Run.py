@@ -9,6 +9,8 @@ import pandas as pd
 import datetime
 import time
 
+from attendance_pipeline import RollCallPipeline, append_attendance_rows, load_student_names
+
 print("Starting Attendance Management System...")
 print("GUI window should open. If you don't see it, check the Dock or other desktops.")
 
@@ -375,58 +377,24 @@ def subjectchoose():
 
                 harcascadePath = "haarcascade_frontalface_default.xml"
                 faceCascade = cv2.CascadeClassifier(harcascadePath)
-                df = pd.read_csv(r"StudentDetails\StudentDetails.csv")
+                # Enrollment -> name, read once instead of scanning the DataFrame per face
+                names = load_student_names(r"StudentDetails\StudentDetails.csv")
                 cam = cv2.VideoCapture(0)
-                font = cv2.FONT_HERSHEY_SIMPLEX
                 col_names = ['Enrollment', 'Name', 'Date', 'Time']
-                attendance = pd.DataFrame(columns=col_names)
-                while True:
-                    ret, im = cam.read()
-                    gray = cv2.cvtColor(im, cv2.COLOR_BGR2GRAY)
-                    faces = faceCascade.detectMultiScale(gray, 1.2, 5)
-                    for (x, y, w, h) in faces:
-                        global Id
-
-                        Id, conf = recognizer.predict(gray[y:y + h, x:x + w])
-                        if (conf < 70):
-                            print(conf)
-                            global Subject
-                            global aa
-                            global date
-                            global timeStamp
-                            Subject = tx.get()
-                            ts = time.time()
-                            date = datetime.datetime.fromtimestamp(
-                                ts).strftime('%Y-%m-%d')
-                            timeStamp = datetime.datetime.fromtimestamp(
-                                ts).strftime('%H:%M:%S')
-                            aa = df.loc[df['Enrollment'] == Id]['Name'].values
-                            global tt
-                            tt = str(Id) + "-" + aa
-                            En = '15624031' + str(Id)
-                            attendance.loc[len(attendance)] = [
-                                Id, aa, date, timeStamp]
-                            cv2.rectangle(
-                                im, (x, y), (x + w, y + h), (0, 260, 0), 7)
-                            cv2.putText(im, str(tt), (x + h, y),
-                                        font, 1, (255, 255, 0,), 4)
-
-                        else:
-                            Id = 'Unknown'
-                            tt = str(Id)
-                            cv2.rectangle(
-                                im, (x, y), (x + w, y + h), (0, 25, 255), 7)
-                            cv2.putText(im, str(tt), (x + h, y),
-                                        font, 1, (0, 25, 255), 4)
-                    if time.time() > future:
-                        break
-
-                    attendance = attendance.drop_duplicates(
-                        ['Enrollment'], keep='first')
-                    cv2.imshow('Filling attedance..', im)
-                    key = cv2.waitKey(30) & 0xff
-                    if key == 27:
-                        break
+                global Id, aa, Subject, date, timeStamp
+                Subject = sub
+
+                # Capture, recognition and display run concurrently (see attendance_pipeline.py)
+                pipeline = RollCallPipeline(cam, recognizer, faceCascade, names, threshold=70)
+                pipeline.start()
+                try:
+                    pipeline.run_ui('Filling attedance..', future)
+                finally:
+                    pipeline.stop()
+
+                rows = pipeline.rows()
+                attendance = pd.DataFrame(rows, columns=col_names)
+                Id, aa = (rows[-1][0], rows[-1][1]) if rows else ('Unknown', '')
 
                 ts = time.time()
                 date = datetime.datetime.fromtimestamp(ts).strftime('%Y-%m-%d')  # Current date (optional if needed)
@@ -437,27 +405,10 @@ def subjectchoose():
                 # Construct the file path
                 fileName = os.path.join(base_path, f"{Subject}.csv")
 
-                # Check if the file exists
-                if os.path.exists(fileName):
-                    # If file exists, load the existing data
-                    existing_attendance = pd.read_csv(fileName)
-                    
-                    # Append new attendance data
-                    updated_attendance = pd.concat([existing_attendance, attendance], ignore_index=True)
-                    
-                    # Drop duplicates based on 'Enrollment'
-                    # updated_attendance = updated_attendance.drop_duplicates(['Enrollment'], keep='first')
-                    
-                    # Save the updated attendance back to the same file
-                    updated_attendance.to_csv(fileName, index=False)
-                    
-
-                    print(f"Updated existing file: {fileName}")
-                else:
-                    # If file doesn't exist, save the new attendance as a new file
-                    attendance = attendance.drop_duplicates(['Enrollment'], keep='first')
-                    attendance.to_csv(fileName, index=False)
-                    print(f"Created new file: {fileName}")
+                # Append this session's rows; the existing file is never re-read or rewritten
+                existed = os.path.exists(fileName)
+                written = append_attendance_rows(fileName, rows)
+                print(f"{'Updated existing' if existed else 'Created new'} file: {fileName} ({written} rows)")
 
                 # Create table for Attendance
                 current_time = datetime.datetime.now()